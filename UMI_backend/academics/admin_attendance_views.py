@@ -2,162 +2,177 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count
-from .models import Attendance, Department, Semester, Course, Timetable
-from students.models import Student
-from instructors.models import Instructor
+import json
+from datetime import date as date_cls
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from .services.admin_attendance import (InvalidCursor, attendance_for_page, attendance_stats, filtered_students,
+                                        group_page, iter_pages, student_page)
+from .services.attendance_archive import archived_terms
+from .services.attendance_compliance import compliance_report
+from .services.attendance_register import csv_stream, month_range, register_rows, xlsx_stream
+from .services.attendance_stats import department_stats
 
 
 class AdminAttendanceView(APIView):
     """
     GET /api/academics/admin/attendance/
-    Professional attendance management with proper filtering
+    Professional attendance management with proper filtering.
+
+    Students come back one keyset page at a time (``page_size``, ``cursor``),
+    grouped by department and semester; statistics are sent with the first
+    page. ``stream=true`` streams every page as newline-delimited JSON
+    followed by a statistics line, holding one page in memory at a time.
     """
     permission_classes = [IsAuthenticated]
+    DEFAULT_PAGE_SIZE = 200
+    MAX_PAGE_SIZE = 1000
 
     def get(self, request):
         try:
-            date_filter = request.query_params.get('date')
+            date_param = request.query_params.get('date')
             department_id = request.query_params.get('department_id')
             semester_id = request.query_params.get('semester_id')
-
-            # Get filtered students first
-            students_query = Student.objects.select_related('department', 'semester')
-            
-            if department_id:
-                students_query = students_query.filter(department__department_id=department_id)
-            if semester_id:
-                students_query = students_query.filter(semester__semester_id=semester_id)
-            
-            students = students_query.order_by('department__name', 'semester__name', 'name')
+            cursor = request.query_params.get('cursor')
             
-            # Get attendance records for filtered students with course info
-            attendance_query = Attendance.objects.select_related(
-                'student', 'instructor', 'timetable__course'
-            )
-            if date_filter:
-                attendance_query = attendance_query.filter(date=date_filter)
+            date_filter = None
+            if date_param:
+                try:
+                    date_filter = date_cls.fromisoformat(date_param)
+                except ValueError:
+                    return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                page_size = min(int(request.query_params.get('page_size', self.DEFAULT_PAGE_SIZE)), self.MAX_PAGE_SIZE)
+            except ValueError:
+                return Response({'error': 'page_size must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            page_size = max(page_size, 1)
             
-            attendance_records = attendance_query.filter(student__in=students)
+            students = filtered_students(department_id, semester_id)
+            filters = {'date': date_param, 'department_id': department_id, 'semester_id': semester_id}
             
-            # Create attendance lookup
-            attendance_lookup = {}
-            for att in attendance_records:
-                key = f"{att.student.student_id}_{att.date}"
-                attendance_lookup[key] = att
+            if request.query_params.get('stream') in ('1', 'true'):
+                return self._stream(students, date_filter, page_size, filters)
             
-            # Organize students by department and semester
-            organized_data = {}
-            for student in students:
-                dept_name = student.department.name if student.department else "No Department"
-                sem_name = student.semester.name if student.semester else "No Semester"
-                
-                if dept_name not in organized_data:
-                    organized_data[dept_name] = {}
-                if sem_name not in organized_data[dept_name]:
-                    organized_data[dept_name][sem_name] = []
-                
-                # Get attendance for this student on the filtered date
-                attendance_key = f"{student.student_id}_{date_filter}" if date_filter else None
-                attendance = attendance_lookup.get(attendance_key) if attendance_key else None
-                
-                student_data = {
-                    'student_id': student.student_id,
-                    'student_name': student.name,
-                    'email': student.email,
-                    'phone': getattr(student, 'phone', 'N/A'),
-                    'attendance': {
-                        'id': attendance.attendance_id if attendance else None,
-                        'status': attendance.status if attendance else 'Not Marked',
-                        'instructor': attendance.instructor.name if attendance and attendance.instructor else 'N/A',
-                        'course': {
-                            'name': attendance.timetable.course.name if attendance and attendance.timetable and attendance.timetable.course else 'N/A',
-                            'code': attendance.timetable.course.code if attendance and attendance.timetable and attendance.timetable.course else 'N/A'
-                        } if attendance and attendance.timetable else {'name': 'N/A', 'code': 'N/A'},
-                        'time_slot': f"{attendance.timetable.start_time} - {attendance.timetable.end_time}" if attendance and attendance.timetable else 'N/A',
-                        'room': attendance.timetable.room if attendance and attendance.timetable else 'N/A',
-                        'marked_at': attendance.marked_at if attendance else None,
-                        'is_submitted': attendance.is_submitted if attendance else False,
-                        'can_edit': attendance.can_edit if attendance else True
-                    } if date_filter else None
-                }
-                
-                organized_data[dept_name][sem_name].append(student_data)
-            
-            # Calculate statistics
-            stats = {
-                'total_students': students.count(),
-                'total_records': attendance_records.count(),
-                'present': attendance_records.filter(status='Present').count(),
-                'absent': attendance_records.filter(status='Absent').count(),
-                'late': attendance_records.filter(status='Late').count()
-            }
+            # Archived terms are only read when the requested date falls inside one
+            terms = archived_terms(date_filter, date_filter) if date_filter else []
+            rows, next_cursor = student_page(students, date=date_filter, cursor=cursor, page_size=page_size)
+            records = attendance_for_page(rows, date_filter, terms) if date_filter else {}
             
             return Response({
-                'organized_data': organized_data,
-                'statistics': stats,
-                'filters': {
-                    'date': date_filter,
-                    'department_id': department_id,
-                    'semester_id': semester_id
-                }
+                'organized_data': group_page(rows, records, date_filter),
+                'statistics': None if cursor else attendance_stats(students, date_filter, terms),
+                'filters': filters,
+                'next_cursor': next_cursor,
+                'page_size': page_size
             }, status=status.HTTP_200_OK)
 
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _stream(self, students, date_filter, page_size, filters):
+        def lines():
+            for page in iter_pages(students, date=date_filter, page_size=page_size):
+                yield json.dumps({'organized_data': page}, cls=DjangoJSONEncoder) + '\n'
+            terms = archived_terms(date_filter, date_filter) if date_filter else []
+            yield json.dumps({'statistics': attendance_stats(students, date_filter, terms), 'filters': filters},
+                             cls=DjangoJSONEncoder) + '\n'
+        
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
 
 class AdminAttendanceStatsView(APIView):
     """
     GET /api/academics/admin/attendance/stats/
-    Get attendance statistics by department and semester
+    Get attendance statistics by department and semester.
+    Optional ``date_from``/``date_to`` (YYYY-MM-DD) limit the counts to a window.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         try:
-            # Get all departments with their attendance stats
-            departments = Department.objects.all()
-            stats = []
-
-            for dept in departments:
-                semesters = Semester.objects.filter(department=dept)
-                dept_stats = {
-                    'department_id': dept.department_id,
-                    'department_name': dept.name,
-                    'department_code': dept.code,
-                    'semesters': []
-                }
-
-                for sem in semesters:
-                    students = Student.objects.filter(department=dept, semester=sem)
-                    total_students = students.count()
-                    
-                    # Get attendance stats for this semester
-                    attendances = Attendance.objects.filter(student__in=students)
-                    total_records = attendances.count()
-                    present_count = attendances.filter(status='Present').count()
-                    absent_count = attendances.filter(status='Absent').count()
-                    late_count = attendances.filter(status='Late').count()
-
-                    sem_stats = {
-                        'semester_id': sem.semester_id,
-                        'semester_name': sem.name,
-                        'semester_code': sem.semester_code,
-                        'total_students': total_students,
-                        'attendance_stats': {
-                            'total_records': total_records,
-                            'present': present_count,
-                            'absent': absent_count,
-                            'late': late_count,
-                            'attendance_rate': round((present_count / total_records * 100), 2) if total_records > 0 else 0
-                        }
-                    }
-                    dept_stats['semesters'].append(sem_stats)
-
-                stats.append(dept_stats)
-
+            window = {}
+            for param in ('date_from', 'date_to'):
+                value = request.query_params.get(param)
+                if value:
+                    try:
+                        window[param] = date_cls.fromisoformat(value)
+                    except ValueError:
+                        return Response({'error': f'Invalid {param}. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            stats = department_stats(**window)
             return Response({'department_stats': stats}, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AdminAttendanceComplianceView(APIView):
+    """
+    GET /api/academics/admin/attendance/compliance/
+    Timetable slots scheduled on ``date`` (default today) whose attendance
+    was not submitted, grouped by department and instructor. Cached briefly
+    so the dashboard can poll it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            day = None
+            date_param = request.query_params.get('date')
+            if date_param:
+                try:
+                    day = date_cls.fromisoformat(date_param)
+                except ValueError:
+                    return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response(compliance_report(day), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AdminAttendanceRegisterExportView(APIView):
+    """
+    GET /api/academics/admin/attendance/register/export/
+    Stream a month's student x date attendance register as CSV (default) or
+    XLSX (``file_type=xlsx``). Takes ``year`` and ``month`` plus the optional
+    ``department_id``/``semester_id`` filters of the other admin views.
+    """
+    permission_classes = [IsAuthenticated]
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    def get(self, request):
+        try:
+            year = request.query_params.get('year')
+            month = request.query_params.get('month')
+            department_id = request.query_params.get('department_id')
+            semester_id = request.query_params.get('semester_id')
+            file_type = request.query_params.get('file_type', 'csv')
+            
+            if not year or not month:
+                return Response({'error': 'year and month are required'}, status=status.HTTP_400_BAD_REQUEST)
+            if file_type not in self.CONTENT_TYPES:
+                return Response({'error': 'file_type must be csv or xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                first, _ = month_range(year, month)
+            except ValueError:
+                return Response({'error': 'Invalid year or month'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            rows = register_rows(year, month, department_id=department_id, semester_id=semester_id)
+            stream = xlsx_stream(rows, sheet_name=f"{first:%B %Y}") if file_type == 'xlsx' else csv_stream(rows)
+            
+            response = StreamingHttpResponse(stream, content_type=self.CONTENT_TYPES[file_type])
+            scope = '-'.join(part for part in (f"dept{department_id}" if department_id else '',
+                                               f"sem{semester_id}" if semester_id else '') if part)
+            filename = f"attendance-register-{first:%Y-%m}{'-' + scope if scope else ''}.{file_type}"
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -4,10 +4,18 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import datetime, time
-from .models import Timetable, Attendance, AttendanceEditPermission
-from students.models import Student
+from .models import Timetable, Attendance, AttendanceEditPermission, AttendanceIngestBatch
 from instructors.models import Instructor
 from .serializers import AttendanceSerializer
+from .services.attendance import finalize_attendance, submit_attendance, write_attendance
+from .services.attendance_drafts import clear_draft, draft_marks, drafts_enabled, get_draft, save_draft
+from .services.attendance_sync import sync_batches
+from .services.attendance_ingest import enqueue_marks, enqueue_submit, has_queued_marks, ingest_enabled
+from .services.slot_index import slot_status
+from .services.rosters import semester_roster
+from .services.session_attendance import session_statuses, slot_submitted
+from .services.self_checkin import flush_checkins
+from .services.class_sessions import marking_open, open_entries, scheduled_on
 
 class TimetableBasedAttendanceView(APIView):
     """
@@ -19,48 +27,34 @@ class TimetableBasedAttendanceView(APIView):
             if not instructor_id:
                 return Response({'error': 'Instructor ID required'}, status=status.HTTP_400_BAD_REQUEST)
             
-            instructor = Instructor.objects.get(instructor_id=instructor_id)
-            current_time = timezone.now().time()
-            current_day = timezone.now().strftime('%A').lower()
-            today = timezone.now().date()
+            instructor = Instructor.objects.only('pk').get(pk=instructor_id)
+            now = timezone.now()
+            current_time = now.time()
+            current_day = now.strftime('%A').lower()
+            today = now.date()
             
-            # STRICT: Only get slots that are currently active (within time window)
-            active_slots = Timetable.objects.filter(
-                instructor=instructor,
-                day=current_day,
-                start_time__lte=current_time,
-                end_time__gte=current_time
-            )
+            # STRICT: Only slots that are currently active (within time window): today's generated
+            # class sessions, or the in-memory index for semesters without them
+            active_slots = open_entries(now, instructor_id=instructor.pk)
+            # Roster sizes from the roster cache, submission flags for every active slot in one query
+            statuses = slot_status(active_slots, today)
             
             slots_data = []
             for slot in active_slots:
-                # Get students enrolled in this course/semester
-                students = Student.objects.filter(
-                    semester=slot.course.semester,
-                    is_active=True
-                )
-                
-                # Check if attendance already submitted for today
-                submitted_count = Attendance.objects.filter(
-                    timetable=slot,
-                    date=today,
-                    is_submitted=True
-                ).count()
-                
-                is_already_submitted = submitted_count > 0
+                students_count, is_already_submitted = statuses.get(slot.timetable_id, (0, False))
                 
                 slots_data.append({
                     'timetable_id': slot.timetable_id,
                     'course': {
-                        'id': slot.course.course_id,
-                        'name': slot.course.name,
-                        'code': slot.course.code
+                        'id': slot.course_id,
+                        'name': slot.course_name,
+                        'code': slot.course_code
                     },
-                    'department': slot.course.semester.department.name if slot.course.semester else 'N/A',
-                    'semester': slot.course.semester.name if slot.course.semester else 'N/A',
+                    'department': slot.department_name if slot.semester_id else 'N/A',
+                    'semester': slot.semester_name if slot.semester_id else 'N/A',
                     'time_slot': f"{slot.start_time.strftime('%H:%M')} - {slot.end_time.strftime('%H:%M')}",
                     'room': slot.room,
-                    'students_count': students.count(),
+                    'students_count': students_count,
                     'can_mark_attendance': not is_already_submitted,
                     'is_submitted': is_already_submitted,
                     'time_remaining': self._calculate_time_remaining(slot.end_time, current_time)
@@ -99,8 +93,8 @@ class MarkTimetableAttendanceView(APIView):
             if not all([timetable_id, attendance_data, instructor_id]):
                 return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
             
-            timetable = Timetable.objects.get(timetable_id=timetable_id)
-            instructor = Instructor.objects.get(instructor_id=instructor_id)
+            timetable = Timetable.objects.select_related('course__semester').get(timetable_id=timetable_id)
+            instructor = Instructor.objects.get(pk=instructor_id)
             
             # STRICT: Verify instructor is authorized for this timetable
             if timetable.instructor != instructor:
@@ -108,70 +102,62 @@ class MarkTimetableAttendanceView(APIView):
                     'error': 'Unauthorized: You can only mark attendance for your assigned classes'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            # STRICT: Check if within time slot and correct day
-            current_time = timezone.now().time()
-            current_day = timezone.now().strftime('%A').lower()
-            today = timezone.now().date()
+            # STRICT: Check if within time slot and correct day (generated class sessions when present)
+            now = timezone.now()
+            today = now.date()
             
-            if timetable.day != current_day:
+            if not scheduled_on(timetable, today):
                 return Response({
                     'error': f'Attendance can only be marked on {timetable.day.title()}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            if not (timetable.start_time <= current_time <= timetable.end_time):
+            if not marking_open(timetable, now):
                 return Response({
                     'error': f'Attendance can only be marked between {timetable.start_time.strftime("%H:%M")} - {timetable.end_time.strftime("%H:%M")}'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # STRICT: Check if already submitted for today
-            if Attendance.objects.filter(timetable=timetable, date=today, is_submitted=True).exists():
+            if slot_submitted(timetable, today):
                 return Response({
                     'error': 'Attendance already submitted for today. Request admin permission to edit.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            marked_count = 0
-            errors = []
-            
-            for attendance_item in attendance_data:
-                student_id = attendance_item.get('student_id')
-                status_value = attendance_item.get('status')
-                
-                try:
-                    student = Student.objects.get(student_id=student_id)
-                    
-                    # Verify student is enrolled in the course's semester
-                    if student.semester != timetable.course.semester:
-                        errors.append(f'Student {student.name} not enrolled in {timetable.course.semester.name}')
-                        continue
-                    
-                    # Create or update attendance
-                    attendance, created = Attendance.objects.get_or_create(
-                        student=student,
-                        course=timetable.course,
-                        instructor=instructor,
-                        timetable=timetable,
-                        date=today,
-                        defaults={
-                            'status': status_value,
-                            'marked_by': instructor,
-                            'can_edit': True,
-                            'is_submitted': False
-                        }
-                    )
-                    
-                    if not created and attendance.is_editable():
-                        attendance.status = status_value
-                        attendance.marked_by = instructor
-                        attendance.save()
-                    elif not created and not attendance.is_editable():
-                        errors.append(f'Cannot edit attendance for {student.name} - already submitted')
-                        continue
-                    
-                    marked_count += 1
-                    
-                except Student.DoesNotExist:
-                    errors.append(f'Student with ID {student_id} not found')
-                    continue
+            # Draft mode: keep the marks in the draft table until the slot is submitted
+            if drafts_enabled():
+                result = save_draft(attendance_data, timetable=timetable, date=today)
+                response_data = {
+                    'message': f'Draft saved for {result.marked_count} students',
+                    'draft': True,
+                    'timetable_id': timetable_id,
+                    'course': timetable.course.name,
+                    'date': today.isoformat(),
+                }
+                warnings = result.warnings(timetable.course.semester.name if timetable.course.semester else None)
+                if warnings:
+                    response_data['warnings'] = warnings
+                return Response(response_data)
+            
+            # Ingest mode: acknowledge now, the ingest worker applies the batch
+            if ingest_enabled():
+                batch = enqueue_marks(attendance_data, timetable=timetable, instructor=instructor, date=today)
+                return Response({
+                    'message': f'Attendance for {len(batch.payload)} students queued',
+                    'batch_id': batch.batch_id,
+                    'status': batch.status,
+                    'timetable_id': timetable_id,
+                    'course': timetable.course.name,
+                    'date': today.isoformat(),
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            result = write_attendance(
+                attendance_data,
+                date=today,
+                instructor=instructor,
+                timetable=timetable,
+                semester=timetable.course.semester,
+            )
+            marked_count = result.marked_count
+            errors = result.warnings(timetable.course.semester.name if timetable.course.semester else None)
             
             response_data = {
                 'message': f'Attendance marked for {marked_count} students',
@@ -203,8 +189,8 @@ class SubmitAttendanceView(APIView):
             if not all([timetable_id, instructor_id]):
                 return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
             
-            timetable = Timetable.objects.get(timetable_id=timetable_id)
-            instructor = Instructor.objects.get(instructor_id=instructor_id)
+            timetable = Timetable.objects.select_related('course__semester').get(timetable_id=timetable_id)
+            instructor = Instructor.objects.get(pk=instructor_id)
             today = timezone.now().date()
             
             # Verify instructor authorization
@@ -213,29 +199,50 @@ class SubmitAttendanceView(APIView):
                     'error': 'Unauthorized: You can only submit attendance for your assigned classes'
                 }, status=status.HTTP_403_FORBIDDEN)
             
+            # Student check-ins still buffered for this slot are written before it locks
+            flush_checkins(timetable_ids=[timetable.pk])
+            
             # Get all attendance records for this slot today
             attendances = Attendance.objects.filter(
                 timetable=timetable,
                 date=today
             )
             
-            if not attendances.exists():
+            draft = get_draft(timetable, today) if drafts_enabled() else {}
+            queued = ingest_enabled() and has_queued_marks(timetable, today)
+            if not draft and not queued and not attendances.exists():
                 return Response({
                     'error': 'No attendance records found to submit'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if already submitted
-            if attendances.filter(is_submitted=True).exists():
+            if slot_submitted(timetable, today):
                 return Response({
                     'error': 'Attendance already submitted for this class today'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Submit all attendance records
-            submitted_count = attendances.update(
-                is_submitted=True,
-                can_edit=False,
-                admin_approved_edit=False
-            )
+            # Ingest mode: the submit is applied after any marks queued before it
+            if ingest_enabled():
+                batch = enqueue_submit(timetable=timetable, instructor=instructor, date=today,
+                                       marks=draft_marks(draft))
+                clear_draft(timetable, today)
+                return Response({
+                    'message': 'Attendance submission queued',
+                    'batch_id': batch.batch_id,
+                    'status': batch.status,
+                    'course': timetable.course.name,
+                    'date': today,
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            # Submit all attendance records; a draft is written once, already submitted
+            if draft:
+                _, submitted_count = finalize_attendance(
+                    draft_marks(draft), timetable=timetable, instructor=instructor, date=today,
+                    semester=timetable.course.semester,
+                )
+                clear_draft(timetable, today)
+            else:
+                submitted_count = submit_attendance(timetable, today)
             
             return Response({
                 'message': f'Attendance finalized for {submitted_count} students. Further edits require admin approval.',
@@ -424,31 +431,38 @@ class TimetableStudentsView(APIView):
     
     def get(self, request, timetable_id):
         try:
-            timetable = Timetable.objects.get(timetable_id=timetable_id)
+            timetable = Timetable.objects.select_related('course').get(timetable_id=timetable_id)
             today = timezone.now().date()
             
-            # Get students enrolled in the course's semester
-            students = Student.objects.filter(
-                semester=timetable.course.semester,
-                is_active=True
-            ).order_by('name')
+            # Students enrolled in the course's semester, from the roster cache
+            roster = semester_roster(timetable.course.semester_id)
+            
+            # Attendance already marked for today, for the whole slot at once
+            marked = {
+                row.student_id: row
+                for row in Attendance.objects.filter(timetable=timetable, date=today).order_by()
+            }
+            # Marks kept only in a compact session record
+            compact = session_statuses(timetable, today)
+            # Unsubmitted draft marks take precedence over persisted ones
+            draft = get_draft(timetable, today) if drafts_enabled() else {}
             
             students_data = []
-            for student in students:
-                # Check if attendance already marked for today
-                attendance = Attendance.objects.filter(
-                    student=student,
-                    timetable=timetable,
-                    date=today
-                ).first()
+            for student in roster:
+                attendance = marked.get(student.student_id)
+                stored = attendance.status if attendance else compact.get(student.student_id)
+                can_edit = attendance.is_editable() if attendance else True
+                drafted = draft.get(student.student_id) if can_edit else None
                 
                 students_data.append({
                     'student_id': student.student_id,
                     'name': student.name,
-                    'email': student.user.email if student.user else 'N/A',
-                    'current_status': attendance.status if attendance else 'Present',
-                    'is_marked': attendance is not None,
-                    'can_edit': attendance.is_editable() if attendance else True
+                    'email': student.email or 'N/A',
+                    'image': student.image,
+                    'current_status': drafted or stored or 'Present',
+                    'is_marked': stored is not None or drafted is not None,
+                    'is_draft': drafted is not None,
+                    'can_edit': can_edit
                 })
             
             return Response({
@@ -471,4 +485,73 @@ class TimetableStudentsView(APIView):
         except Timetable.DoesNotExist:
             return Response({'error': 'Timetable not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class AttendanceIngestStatusView(APIView):
+    """
+    Report whether a queued mark/submit batch has been applied yet
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, batch_id):
+        try:
+            batch = AttendanceIngestBatch.objects.get(batch_id=batch_id)
+            
+            # Only the instructor who queued the batch, or an admin, may see it
+            instructor = getattr(request.user, 'instructor_profile', None)
+            is_admin = request.user.is_staff or request.user.is_superuser
+            if not is_admin and (instructor is None or batch.instructor_id != instructor.pk):
+                return Response({'error': 'You can only view your own batches'}, status=status.HTTP_403_FORBIDDEN)
+            
+            return Response({
+                'batch_id': batch.batch_id,
+                'kind': batch.kind,
+                'status': batch.status,
+                'timetable_id': batch.timetable_id,
+                'date': batch.date,
+                'queued_at': batch.queued_at,
+                'applied_at': batch.applied_at,
+                # Batches still queued ahead of this one
+                'position': (
+                    AttendanceIngestBatch.objects.filter(
+                        status=AttendanceIngestBatch.QUEUED, batch_id__lt=batch.batch_id
+                    ).count()
+                    if batch.status == AttendanceIngestBatch.QUEUED else 0
+                ),
+                'result': batch.result,
+                'error': batch.error or None,
+            })
+            
+        except AttendanceIngestBatch.DoesNotExist:
+            return Response({'error': 'Batch not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class AttendanceSyncView(APIView):
+    """
+    Apply offline attendance batches, each identified by a client idempotency key
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        try:
+            instructor = getattr(request.user, 'instructor_profile', None)
+            if not instructor:
+                return Response({'error': 'User is not an instructor'}, status=status.HTTP_403_FORBIDDEN)
+            
+            batches = request.data.get('batches')
+            if not isinstance(batches, list) or not batches:
+                return Response({'error': 'batches must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+            if not all(isinstance(batch, dict) for batch in batches):
+                return Response({'error': 'Each batch must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            results = sync_batches(batches, instructor)
+            return Response({
+                'results': results,
+                'applied': sum(1 for r in results if r['status'] == 'applied'),
+                'replayed': sum(1 for r in results if r['status'] == 'replayed'),
+                'failed': sum(1 for r in results if r['status'] == 'error'),
+            })
+            
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,73 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from .services.self_checkin import CheckInError, check_in, issue_token, open_slot, student_for_user
+
+
+class CheckInTokenView(APIView):
+    """
+    GET /api/academics/attendance/checkin/token/?timetable_id=
+    Short-lived signed token the instructor displays for students to check in
+    with. Only issued during the slot's marking window; the display should
+    fetch a fresh one before ``expires_at``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            instructor = getattr(request.user, 'instructor_profile', None)
+            if not instructor:
+                return Response({'error': 'User is not an instructor'}, status=status.HTTP_403_FORBIDDEN)
+            try:
+                timetable_id = int(request.query_params.get('timetable_id'))
+            except (TypeError, ValueError):
+                return Response({'error': 'timetable_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+            entry = open_slot(timetable_id, instructor.pk)
+            if entry is None:
+                return Response({
+                    'error': 'Check-in is only open from 15 minutes before to 30 minutes after your class'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            token, expires_at = issue_token(entry)
+            return Response({
+                'token': token,
+                'expires_at': expires_at,
+                'timetable_id': entry.timetable_id,
+                'course': entry.course_name
+            })
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class StudentCheckInView(APIView):
+    """
+    POST /api/academics/attendance/checkin/  {"token": "..."}
+    Student self check-in. The check-in is buffered and written into
+    Attendance by the next flush, hence 202.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            token = request.data.get('token')
+            if not token:
+                return Response({'error': 'token is required'}, status=status.HTTP_400_BAD_REQUEST)
+            student_id = student_for_user(request.user)
+            if not student_id:
+                return Response({'error': 'User is not a student'}, status=status.HTTP_403_FORBIDDEN)
+
+            timetable_id, day, status_value = check_in(token, student_id)
+            return Response({
+                'message': 'Checked in',
+                'timetable_id': timetable_id,
+                'date': day,
+                'status': status_value
+            }, status=status.HTTP_202_ACCEPTED)
+
+        except CheckInError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from .models import Attendance, AttendanceEditPermission
 from instructors.models import Instructor
+from .services.edit_permissions import pending_request
 
 
 class InstructorSubmittedAttendanceView(APIView):
@@ -23,7 +24,9 @@ class InstructorSubmittedAttendanceView(APIView):
             submitted_records = Attendance.objects.filter(
                 instructor=instructor,
                 is_submitted=True
-            ).select_related('student').order_by('-date', '-marked_at')
+            ).select_related('student').annotate(
+                has_pending_request=pending_request()
+            ).order_by('-date', '-marked_at')
 
             records = []
             for record in submitted_records:
@@ -34,10 +37,7 @@ class InstructorSubmittedAttendanceView(APIView):
                     'date': record.date,
                     'current_status': record.status,
                     'marked_at': record.marked_at,
-                    'can_request_edit': not AttendanceEditPermission.objects.filter(
-                        attendance=record,
-                        status='pending'
-                    ).exists()
+                    'can_request_edit': not record.has_pending_request
                 })
 
             return Response({'records': records}, status=status.HTTP_200_OK)
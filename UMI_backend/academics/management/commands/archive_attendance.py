@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import ArchivedTerm
+from academics.services.attendance_archive import archive_term, closed_terms
+
+
+class Command(BaseCommand):
+    help = 'Move attendance of closed terms out of the live Attendance table into cold storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            help='Archive attendance dated before this day (YYYY-MM-DD), per semester; '
+                 'defaults to ATTENDANCE_ARCHIVE_AFTER_DAYS ago',
+        )
+        parser.add_argument(
+            '--semester',
+            type=int,
+            action='append',
+            dest='semesters',
+            help='Only consider this semester id (repeatable)',
+        )
+        parser.add_argument(
+            '--storage',
+            choices=[ArchivedTerm.TABLE, ArchivedTerm.FILE],
+            default=ArchivedTerm.TABLE,
+            help='Archive table, or one compressed file per term under ATTENDANCE_ARCHIVE_DIR',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows moved per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the terms and row counts that would be archived without moving anything',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = date.fromisoformat(options['before']) if options['before'] else None
+        except ValueError:
+            raise CommandError(f'Invalid --before date "{options["before"]}"')
+
+        terms = closed_terms(before=before, semester_ids=options['semesters'])
+        if not terms:
+            self.stdout.write('No closed terms to archive.')
+            return
+
+        total = 0
+        for semester, span in terms:
+            label = f'{semester.name} ({semester.semester_code}) {span["first_date"]}..{span["last_date"]}'
+            moved = archive_term(
+                semester, before=before, storage=options['storage'], batch_size=options['batch_size'], dry_run=options['dry_run']
+            )
+            total += moved
+            verb = 'would move' if options['dry_run'] else 'moved'
+            self.stdout.write(f'{label}: {verb} {moved} rows')
+
+        if options['dry_run']:
+            self.stdout.write(f'Dry run: {total} rows in {len(terms)} terms would be archived.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Archived {total} rows from {len(terms)} terms.'))
@@ -0,0 +1,150 @@
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import Attendance, AttendanceCheckIn, Course, Department, Semester, Timetable
+from academics.services.self_checkin import flush_checkins, issue_token, open_slot
+from academics.services.slot_index import WEEKDAYS, invalidate_slot_index
+from instructors.models import Instructor
+from register.models import User
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test student self check-in: seed classes running now, post one check-in per student '
+        'through the API from concurrent workers, flush the buffer, report throughput, then clean up'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=20, help='Concurrent classes to seed')
+        parser.add_argument('--students', type=int, default=150, help='Students per class')
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent client threads')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded data afterwards')
+
+    def handle(self, *args, **options):
+        # The workers use their own connections, so the seed has to be committed
+        fixtures = self._seed(options['classes'], options['students'])
+        try:
+            latencies, elapsed, failures = self._run(fixtures, options['workers'])
+            started = time.perf_counter()
+            written = flush_checkins()
+            flush_seconds = time.perf_counter() - started
+            stored = Attendance.objects.filter(timetable__in=fixtures['timetables']).count()
+            self._report(fixtures, options['workers'], latencies, elapsed, failures, written, flush_seconds, stored)
+        finally:
+            if not options['keep']:
+                self._cleanup(fixtures)
+
+    # ---------- seeding ----------
+    def _seed(self, class_count, per_class):
+        self.stdout.write(f'Seeding {class_count} classes x {per_class} students running now...')
+        now = timezone.now()
+        start = (now - timedelta(minutes=5)).time().replace(second=0, microsecond=0)
+        end = (datetime.combine(now.date(), start) + timedelta(hours=1)).time()
+        if end < start:
+            raise SystemExit('Run the benchmark outside the hour before midnight (slots cannot span days).')
+
+        department = Department.objects.create(name='Check-in Benchmark', code='CHKBENCH')
+        semesters = Semester.objects.bulk_create([
+            Semester(name=f'Semester {i}', semester_code=f'CHKBENCH-S{i}', program='BENCH', department=department)
+            for i in range(class_count)
+        ])
+        courses = Course.objects.bulk_create([
+            Course(name=f'Check-in Course {i}', code=f'CHK{i}', semester=semester)
+            for i, semester in enumerate(semesters)
+        ])
+        instructor_users = User.objects.bulk_create([
+            User(username=f'chkbench-instructor-{i}', role='instructor', password='!') for i in range(class_count)
+        ])
+        instructors = Instructor.objects.bulk_create([
+            Instructor(user=user, name=user.username, phone='0', specialization='Benchmark')
+            for user in instructor_users
+        ])
+        timetables = Timetable.objects.bulk_create([
+            Timetable(course=course, instructor=instructor, day=WEEKDAYS[now.weekday()],
+                      start_time=start, end_time=end)
+            for course, instructor in zip(courses, instructors)
+        ])
+        student_users = User.objects.bulk_create([
+            User(username=f'chkbench-student-{i}', role='student', password='!')
+            for i in range(class_count * per_class)
+        ], batch_size=1000)
+        students = Student.objects.bulk_create([
+            Student(student_id=f'chk{i:06d}', name=f'Student {i}', email=f'chk{i}@example.com', user=user,
+                    department=department, semester=semesters[i // per_class])
+            for i, user in enumerate(student_users)
+        ], batch_size=1000)
+        # bulk_create skips the signals that normally refresh the slot index
+        invalidate_slot_index()
+
+        tokens = []
+        for timetable, instructor in zip(timetables, instructors):
+            entry = open_slot(timetable.pk, instructor.pk)
+            tokens.append(issue_token(entry)[0])
+        jobs = [(student_users[i], tokens[i // per_class]) for i in range(len(students))]
+        return {
+            'department': department, 'timetables': timetables, 'jobs': jobs,
+            'users': instructor_users + student_users, 'students': students,
+        }
+
+    # ---------- load ----------
+    def _run(self, fixtures, worker_count):
+        jobs = fixtures['jobs']
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            client = APIClient()
+            timings, errors = [], []
+            try:
+                for user, token in chunk:
+                    client.force_authenticate(user)
+                    started = time.perf_counter()
+                    response = client.post('/api/academics/attendance/checkin/', {'token': token}, format='json')
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 202:
+                        errors.append(response.status_code)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(timings)
+                failures.extend(errors)
+
+        threads = [threading.Thread(target=worker, args=(jobs[i::worker_count],)) for i in range(worker_count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, time.perf_counter() - started, failures
+
+    def _report(self, fixtures, worker_count, latencies, elapsed, failures, written, flush_seconds, stored):
+        total = len(fixtures['jobs'])
+        latencies.sort()
+        self.stdout.write('')
+        self.stdout.write(f'{total} check-ins across {len(fixtures["timetables"])} classes '
+                          f'from {worker_count} workers ({connection.vendor})')
+        self.stdout.write(f'throughput: {total / elapsed * 60:,.0f} check-ins/min ({elapsed:.2f}s)')
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f'latency: median {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms')
+        self.stdout.write(f'failed requests: {len(failures)}')
+        self.stdout.write(f'flush: {written} attendance rows written in {flush_seconds:.2f}s; {stored} rows stored')
+        style = self.style.SUCCESS if stored == total and not failures else self.style.ERROR
+        self.stdout.write(style('All check-ins stored.' if stored == total else 'Some check-ins were not stored.'))
+
+    def _cleanup(self, fixtures):
+        AttendanceCheckIn.objects.filter(timetable__in=fixtures['timetables']).delete()
+        Student.objects.filter(pk__in=[s.pk for s in fixtures['students']]).delete()
+        User.objects.filter(pk__in=[u.pk for u in fixtures['users']]).delete()
+        fixtures['department'].delete()
+        invalidate_slot_index()
+        self.stdout.write('Seeded benchmark data removed.')
@@ -0,0 +1,193 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from academics.models import (
+    Attendance, AttendanceEditPermission, Course, Department, Result, Semester, Timetable,
+)
+from instructors.models import Instructor
+from register.models import User
+from students.models import Student
+
+# The indexes added for the hot queries, per model
+HOT_INDEXES = {
+    Attendance: [
+        'attendance_slot_day_idx', 'attendance_instructor_day_idx',
+        'attendance_student_day_idx', 'attendance_student_course_idx',
+    ],
+    Result: ['result_student_date_idx', 'result_course_grade_idx'],
+    AttendanceEditPermission: ['edit_perm_pending_queue_idx', 'edit_perm_pending_attn_idx'],
+}
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large synthetic dataset inside a transaction, run the hot attendance/result '
+        'queries with and without their indexes, report plans and timings, then roll back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000, help='Number of students to seed')
+        parser.add_argument('--days', type=int, default=60, help='Number of class days of attendance to seed')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per query (median is reported)')
+        parser.add_argument('--no-plans', action='store_true', help='Only report timings')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                fixtures = self._seed(options['students'], options['days'])
+                self._analyze()
+                queries = self._queries(fixtures)
+
+                after = self._measure(queries, options)
+                self._drop_indexes()
+                self._analyze()
+                before = self._measure(queries, options)
+
+                self._report(queries, before, after, show_plans=not options['no_plans'])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS('Benchmark finished; seeded data and index changes rolled back.'))
+
+    # ---------- seeding ----------
+    def _seed(self, student_count, day_count):
+        self.stdout.write(f'Seeding {student_count} students x {day_count} days of attendance...')
+        department = Department.objects.create(name='Benchmark Department', code='BENCH')
+        semester = Semester.objects.create(
+            name='Semester 1', semester_code='BENCH-S1', program='BENCH', department=department
+        )
+        courses = Course.objects.bulk_create([
+            Course(name=f'Benchmark Course {i}', code=f'BENCH{i}', semester=semester) for i in range(len(DAYS))
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'bench-instructor-{i}', role='instructor', password='!') for i in range(len(DAYS))
+        ])
+        instructors = Instructor.objects.bulk_create([
+            Instructor(user=user, name=user.username, phone='0', specialization='Benchmark') for user in users
+        ])
+        timetables = Timetable.objects.bulk_create([
+            Timetable(course=course, instructor=instructor, day=day, start_time='09:00', end_time='10:00')
+            for course, instructor, day in zip(courses, instructors, DAYS)
+        ])
+
+        students = Student.objects.bulk_create([
+            Student(student_id=f'bench{i:06d}', name=f'Student {i}', email=f'bench{i}@example.com',
+                    department=department, semester=semester)
+            for i in range(student_count)
+        ], batch_size=1000)
+
+        start = date(2025, 1, 6)  # a monday
+        statuses = [Attendance.PRESENT, Attendance.PRESENT, Attendance.PRESENT, Attendance.LATE, Attendance.ABSENT]
+        rows = []
+        for offset in range(day_count):
+            slot = timetables[offset % len(timetables)]
+            day = start + timedelta(days=(offset // len(timetables)) * 7 + offset % len(timetables))
+            for i, student in enumerate(students):
+                rows.append(Attendance(
+                    student=student, course_id=slot.course_id, instructor_id=slot.instructor_id,
+                    timetable=slot, date=day, status=statuses[(i + offset) % len(statuses)],
+                    is_submitted=offset < day_count - 1,
+                ))
+            if len(rows) >= 5000:
+                Attendance.objects.bulk_create(rows, batch_size=1000)
+                rows = []
+        Attendance.objects.bulk_create(rows, batch_size=1000)
+
+        grades = ['A', 'B', 'C', 'D', 'F']
+        Result.objects.bulk_create([
+            Result(student=student, course=course, exam_type='Final', total_marks=100,
+                   obtained_marks=40 + (i * 7) % 60, grade=grades[(i + j) % len(grades)],
+                   exam_date=start + timedelta(days=j * 7))
+            for i, student in enumerate(students)
+            for j, course in enumerate(courses)
+        ], batch_size=1000)
+
+        attendance_ids = list(
+            Attendance.objects.filter(student__in=students[: max(1, student_count // 20)])
+            .values_list('attendance_id', 'instructor_id')[: max(1, student_count // 2)]
+        )
+        AttendanceEditPermission.objects.bulk_create([
+            AttendanceEditPermission(
+                instructor_id=instructor_id, attendance_id=attendance_id, reason='benchmark',
+                status='pending' if i % 10 == 0 else 'approved',
+            )
+            for i, (attendance_id, instructor_id) in enumerate(attendance_ids)
+        ], batch_size=1000)
+
+        return {
+            'timetable': timetables[0],
+            'instructor': instructors[0],
+            'student': students[len(students) // 2],
+            'course': courses[0],
+            'date': start,
+        }
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            for model in HOT_INDEXES:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    def _drop_indexes(self):
+        # The backend's own DROP INDEX statement, run inside the surrounding transaction so the rollback restores it
+        template = connection.schema_editor().sql_delete_index
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for model, names in HOT_INDEXES.items():
+                for name in names:
+                    cursor.execute(template % {'name': quote(name), 'table': quote(model._meta.db_table)})
+
+    # ---------- queries ----------
+    def _queries(self, f):
+        since = f['date'] - timedelta(days=30)
+        return [
+            ('slot submitted today', lambda: Attendance.objects.filter(
+                timetable=f['timetable'], date=f['date'], is_submitted=True)),
+            ('instructor day', lambda: Attendance.objects.filter(
+                instructor=f['instructor'], date=f['date'])),
+            ('student date window', lambda: Attendance.objects.filter(
+                student=f['student'], date__gte=since)),
+            ('student course history', lambda: Attendance.objects.filter(
+                student=f['student'], course=f['course'])),
+            ('student results by date', lambda: Result.objects.filter(
+                student=f['student']).order_by('-exam_date')),
+            ('course failures', lambda: Result.objects.filter(course=f['course'], grade='F')),
+            ('pending edit queue', lambda: AttendanceEditPermission.objects.filter(
+                status='pending').order_by('-requested_at')[:50]),
+            ('pending edit for attendance', lambda: AttendanceEditPermission.objects.filter(
+                attendance__student=f['student'], status='pending')),
+        ]
+
+    def _measure(self, queries, options):
+        results = {}
+        for label, build in queries:
+            list(build())  # warm-up, not timed
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                list(build())
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = None if options['no_plans'] else build().explain()
+            results[label] = (statistics.median(timings), plan)
+        return results
+
+    def _report(self, queries, before, after, show_plans):
+        self.stdout.write('')
+        self.stdout.write(f'{"query":<30} {"before ms":>10} {"after ms":>10} {"speedup":>8}')
+        for label, _ in queries:
+            before_ms, before_plan = before[label]
+            after_ms, after_plan = after[label]
+            speedup = before_ms / after_ms if after_ms else float('inf')
+            self.stdout.write(f'{label:<30} {before_ms:>10.2f} {after_ms:>10.2f} {speedup:>7.1f}x')
+            if show_plans:
+                self.stdout.write(f'  before: {" | ".join(before_plan.splitlines())}')
+                self.stdout.write(f'  after:  {" | ".join(after_plan.splitlines())}')
+        self.stdout.write(f'(measured at {timezone.now():%Y-%m-%d %H:%M}, backend {connection.vendor})')
@@ -0,0 +1,142 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from academics.models import Attendance, Course, Department, SessionAttendance, Semester, Timetable
+from academics.services.session_attendance import convert_attendance, session_statuses, student_records
+from instructors.models import Instructor
+from register.models import User
+from students.models import Student
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic attendance inside a transaction, compare row-per-student storage with '
+        'compact session records (size and read times), then roll back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Number of students to seed')
+        parser.add_argument('--days', type=int, default=40, help='Number of class days of attendance to seed')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per query (median is reported)')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                fixtures = self._seed(options['students'], options['days'])
+                queries = self._queries(fixtures)
+
+                row_size = self._size(Attendance)
+                row_times = self._measure(queries, options['runs'])
+                written, converted = convert_attendance(timezone.now().date(), delete_rows=True)
+                session_size = self._size(SessionAttendance)
+                session_times = self._measure(queries, options['runs'])
+
+                self._report(converted, written, row_size, session_size, queries, row_times, session_times)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS('Benchmark finished; seeded data rolled back.'))
+
+    # ---------- seeding ----------
+    def _seed(self, student_count, day_count):
+        self.stdout.write(f'Seeding {student_count} students x {day_count} days of attendance...')
+        department = Department.objects.create(name='Benchmark Department', code='BENCH')
+        semester = Semester.objects.create(
+            name='Semester 1', semester_code='BENCH-S1', program='BENCH', department=department
+        )
+        courses = Course.objects.bulk_create([
+            Course(name=f'Benchmark Course {i}', code=f'BENCH{i}', semester=semester) for i in range(len(DAYS))
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'bench-instructor-{i}', role='instructor', password='!') for i in range(len(DAYS))
+        ])
+        instructors = Instructor.objects.bulk_create([
+            Instructor(user=user, name=user.username, phone='0', specialization='Benchmark') for user in users
+        ])
+        timetables = Timetable.objects.bulk_create([
+            Timetable(course=course, instructor=instructor, day=day, start_time='09:00', end_time='10:00')
+            for course, instructor, day in zip(courses, instructors, DAYS)
+        ])
+        students = Student.objects.bulk_create([
+            Student(student_id=f'bench{i:06d}', name=f'Student {i}', email=f'bench{i}@example.com',
+                    department=department, semester=semester)
+            for i in range(student_count)
+        ], batch_size=1000)
+
+        start = date(2025, 1, 6)  # a monday
+        statuses = [Attendance.PRESENT, Attendance.PRESENT, Attendance.PRESENT, Attendance.LATE, Attendance.ABSENT]
+        rows = []
+        for offset in range(day_count):
+            slot = timetables[offset % len(timetables)]
+            day = start + timedelta(days=(offset // len(timetables)) * 7 + offset % len(timetables))
+            for i, student in enumerate(students):
+                rows.append(Attendance(
+                    student=student, course_id=slot.course_id, instructor_id=slot.instructor_id,
+                    timetable=slot, date=day, status=statuses[(i + offset) % len(statuses)], is_submitted=True,
+                ))
+            if len(rows) >= 5000:
+                Attendance.objects.bulk_create(rows, batch_size=1000)
+                rows = []
+        Attendance.objects.bulk_create(rows, batch_size=1000)
+
+        return {'timetable': timetables[0], 'student': students[len(students) // 2], 'date': start}
+
+    # ---------- measuring ----------
+    def _size(self, model):
+        """Bytes on disk on PostgreSQL; elsewhere an estimate from the stored payload."""
+        table = model._meta.db_table
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                return cursor.fetchone()[0]
+        if model is Attendance:
+            # student id, date, status, three FKs, two booleans and the timestamp per row
+            return sum(
+                len(student_id) + 10 + len(status_value) + 3 * 8 + 2 + 26
+                for student_id, status_value in Attendance.objects.values_list('student_id', 'status').iterator()
+            )
+        return sum(
+            len(roster) + len(present) + len(late) + len(absent) + 10 + 3 * 8 + 2 + 26
+            for roster, present, late, absent in SessionAttendance.objects.values_list(
+                'roster', 'present_bits', 'late_bits', 'absent_bits'
+            ).iterator()
+        )
+
+    def _queries(self, f):
+        return [
+            ('one session roster', lambda: session_statuses(f['timetable'], f['date'])
+                or dict(Attendance.objects.filter(timetable=f['timetable'], date=f['date'])
+                        .values_list('student_id', 'status'))),
+            ('one student history', lambda: student_records(f['student'].student_id)),
+        ]
+
+    def _measure(self, queries, runs):
+        results = {}
+        for label, run in queries:
+            run()  # warm-up, not timed
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = statistics.median(timings)
+        return results
+
+    def _report(self, converted, written, row_size, session_size, queries, before, after):
+        self.stdout.write('')
+        self.stdout.write(f'{converted} attendance rows -> {written} session records ({connection.vendor})')
+        ratio = row_size / session_size if session_size else float('inf')
+        self.stdout.write(f'storage: {row_size / 1024:.1f} KiB -> {session_size / 1024:.1f} KiB ({ratio:.1f}x smaller)')
+        self.stdout.write(f'{"query":<24} {"rows ms":>10} {"sessions ms":>12}')
+        for label, _ in queries:
+            self.stdout.write(f'{label:<24} {before[label]:>10.2f} {after[label]:>12.2f}')
@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.services.attendance_compliance import compliance_report
+
+
+class Command(BaseCommand):
+    help = 'List timetable slots scheduled on a day whose attendance was never submitted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Day to check (YYYY-MM-DD); defaults to today',
+        )
+        parser.add_argument(
+            '--overdue-only',
+            action='store_true',
+            help='Only list slots whose marking window has already closed',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError(f'Invalid --date "{options["date"]}"')
+
+        report = compliance_report(day)
+        totals = report['totals']
+        self.stdout.write(
+            f"{report['date']}: {totals['scheduled']} slots scheduled, {totals['submitted']} submitted, "
+            f"{totals['not_submitted']} marked but not submitted, {totals['not_marked']} not marked "
+            f"({totals['overdue']} overdue)"
+        )
+        for department in report['departments']:
+            lines = []
+            for instructor in department['instructors']:
+                for slot in instructor['slots']:
+                    if options['overdue_only'] and not slot['overdue']:
+                        continue
+                    lines.append(
+                        f"    {instructor['instructor_name']}: {slot['course_code']} "
+                        f"{slot['start_time']}-{slot['end_time']} {slot['status'].replace('_', ' ')}"
+                        f"{' (overdue)' if slot['overdue'] else ''}"
+                    )
+            if lines:
+                self.stdout.write(department['department_name'])
+                self.stdout.write('\n'.join(lines))
+
+        if totals['scheduled'] and totals['submitted'] == totals['scheduled']:
+            self.stdout.write(self.style.SUCCESS('All scheduled slots have submitted attendance.'))
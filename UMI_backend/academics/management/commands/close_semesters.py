@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from academics.services.semester_results import close_department, close_departments, department_chunks
+
+
+class Command(BaseCommand):
+    help = (
+        'Close semesters in bulk: record the semester GPA, CGPA and academic history of every student '
+        'with all finals in, and promote those who passed. Work is split per department.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--department',
+            type=int,
+            action='append',
+            dest='departments',
+            help='Only close this department id (repeatable)',
+        )
+        parser.add_argument(
+            '--semester',
+            type=int,
+            action='append',
+            dest='semesters',
+            help='Only close this semester id (repeatable)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Departments closed in parallel worker processes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk UPDATE/INSERT',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many students would complete and be promoted',
+        )
+
+    def _report(self, summary, done, total):
+        self.stdout.write(
+            f"[{done}/{total}] department {summary['department_id']}: {summary['completed']} of "
+            f"{summary['students']} students completed, {summary['promoted']} promoted"
+        )
+
+    def handle(self, *args, **options):
+        chunks = department_chunks(options['departments'], options['semesters'])
+        if not chunks:
+            raise CommandError('No semesters match the given department/semester ids')
+
+        started = time.perf_counter()
+        kwargs = {'dry_run': options['dry_run'], 'batch_size': options['batch_size']}
+        workers = min(options['workers'], len(chunks))
+        if workers > 1:
+            # Forked workers must open their own database connections
+            connections.close_all()
+            summaries = []
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                futures = [
+                    pool.submit(close_department, department_id, semester_ids, **kwargs)
+                    for department_id, semester_ids in chunks.items()
+                ]
+                for future in as_completed(futures):
+                    summaries.append(future.result())
+                    self._report(summaries[-1], len(summaries), len(chunks))
+        else:
+            summaries = close_departments(chunks, progress=self._report, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        verb = 'Would complete' if options['dry_run'] else 'Completed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {sum(s['completed'] for s in summaries)} students in "
+            f"{sum(s['semesters'] for s in summaries)} semesters across {len(summaries)} departments "
+            f"in {elapsed:.2f}s; {sum(s['promoted'] for s in summaries)} promoted."
+        ))
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from academics.services.session_attendance import convert_attendance, convertible_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold historical per-student Attendance rows of submitted slots into compact per-session '
+        'records. Compacted sessions are read-only history.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            required=True,
+            help='Only convert attendance dated before this day (YYYY-MM-DD, not after today)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of sessions converted per transaction',
+        )
+        parser.add_argument(
+            '--timetable',
+            type=int,
+            action='append',
+            dest='timetables',
+            help='Only convert this timetable slot (repeatable)',
+        )
+        parser.add_argument(
+            '--delete-rows',
+            action='store_true',
+            help='Delete the converted Attendance rows and let the sessions count on their own',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows and sessions would be converted without writing',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = date.fromisoformat(options['before'])
+        except ValueError:
+            raise CommandError(f'Invalid --before date "{options["before"]}"')
+        if before > timezone.now().date():
+            raise CommandError('--before cannot be later than today')
+
+        if options['dry_run']:
+            rows = convertible_rows(before, options['timetables'])
+            sessions = rows.values('timetable_id', 'date').annotate(n=Count('attendance_id')).order_by()
+            self.stdout.write(
+                f'Would convert {rows.count()} attendance rows into {sessions.count()} sessions.'
+            )
+            return
+
+        written, converted = convert_attendance(
+            before,
+            batch_size=options['batch_size'],
+            delete_rows=options['delete_rows'],
+            timetable_ids=options['timetables'],
+        )
+        action = 'converted and removed' if options['delete_rows'] else 'converted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{converted} attendance rows {action} into {written} sessions.'
+        ))
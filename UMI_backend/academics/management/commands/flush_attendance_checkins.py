@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from academics.services.self_checkin import flush_checkins
+
+
+class Command(BaseCommand):
+    help = 'Write buffered student self check-ins into Attendance in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of buffered check-ins written per transaction',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the buffer instead of exiting once it is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep between polls in --loop mode',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_checkins(batch_size=options['batch_size'])
+            if written:
+                self.stdout.write(self.style.SUCCESS(f'Wrote {written} check-ins into attendance.'))
+            if not options['loop']:
+                if not written:
+                    self.stdout.write('No buffered check-ins to write.')
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from academics.services.attendance_ingest import flush_ingest_queue
+
+
+class Command(BaseCommand):
+    help = 'Apply queued attendance mark/submit batches in large transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of queued requests applied per transaction',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue instead of exiting once it is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep between polls in --loop mode',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = flush_ingest_queue(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'Applied {processed} queued attendance batches.'))
+            if not options['loop']:
+                if not processed:
+                    self.stdout.write('Attendance ingest queue is empty.')
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from academics.services.class_sessions import generate_class_sessions
+
+
+class Command(BaseCommand):
+    help = 'Expand the weekly timetable into dated class sessions for a term'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            help='First day to generate (YYYY-MM-DD); defaults to today',
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            help='Last day to generate (YYYY-MM-DD); defaults to --weeks after --from',
+        )
+        parser.add_argument(
+            '--weeks',
+            type=int,
+            default=16,
+            help='Length of the term in weeks when --to is not given',
+        )
+        parser.add_argument(
+            '--semester',
+            type=int,
+            action='append',
+            dest='semesters',
+            help='Only generate sessions for this semester id (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of sessions written per insert',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else timezone.now().date()
+            date_to = (
+                date.fromisoformat(options['date_to']) if options['date_to']
+                else date_from + timedelta(weeks=options['weeks'], days=-1)
+            )
+        except ValueError:
+            raise CommandError('Dates must be YYYY-MM-DD')
+        if date_to < date_from:
+            raise CommandError('--to must not be before --from')
+
+        written, removed = generate_class_sessions(
+            date_from, date_to, semester_ids=options['semesters'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {written} class sessions from {date_from} to {date_to}'
+            + (f'; removed {removed} that no longer match the timetable.' if removed else '.')
+        ))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.services.marks_import import MarksImportError, import_marks
+from instructors.models import Instructor
+
+
+class Command(BaseCommand):
+    help = 'Import result marks from a CSV (student_id, course, exam_type and component mark columns)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument(
+            '--instructor',
+            type=int,
+            help='Only accept courses taught by this instructor id',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without writing anything',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk INSERT/UPDATE',
+        )
+
+    def handle(self, *args, **options):
+        instructor = None
+        if options['instructor']:
+            instructor = Instructor.objects.filter(pk=options['instructor']).first()
+            if instructor is None:
+                raise CommandError(f"Instructor {options['instructor']} does not exist")
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as source:
+                summary = import_marks(source, instructor=instructor, dry_run=options['dry_run'],
+                                       batch_size=options['batch_size'])
+        except (OSError, MarksImportError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f"line {error['line']}: {error['error']}"))
+        if summary['errors']:
+            raise CommandError(f"{len(summary['errors'])} of {summary['rows']} rows are invalid; nothing was imported.")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['rows']} rows in {elapsed:.2f}s: {summary['created']} created, "
+            f"{summary['updated']} updated, {summary['students']} students."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from academics.services.attendance_drafts import purge_expired_drafts
+
+
+class Command(BaseCommand):
+    help = 'Delete attendance drafts last saved more than ATTENDANCE_DRAFT_TTL seconds ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of draft marks deleted per statement',
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_drafts(batch_size=options['batch_size'])
+        if deleted:
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired draft marks.'))
+        else:
+            self.stdout.write('No expired drafts to delete.')
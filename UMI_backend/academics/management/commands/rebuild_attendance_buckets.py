@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from academics.services.attendance_stats import invalidate_attendance_stats, rebuild_buckets, refresh_buckets
+
+
+class Command(BaseCommand):
+    help = 'Re-aggregate the daily department/semester attendance buckets behind the admin stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recount every day with attendance, e.g. after students changed department or semester',
+        )
+        parser.add_argument(
+            '--batch-days',
+            type=int,
+            default=60,
+            help='Number of days re-aggregated per transaction with --all',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            refreshed = rebuild_buckets(batch_days=options['batch_days'])
+        else:
+            refreshed = refresh_buckets()
+        invalidate_attendance_stats()
+        self.stdout.write(self.style.SUCCESS(f'Re-aggregated {refreshed} days of attendance buckets.'))
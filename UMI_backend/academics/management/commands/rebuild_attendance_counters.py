@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from students.models import Student
+from academics.services.attendance_counters import rebuild_all_counters
+from academics.services.student_metrics import refresh_students
+
+
+class Command(BaseCommand):
+    help = 'Recount per-student and per-course attendance counters from the Attendance table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            action='append',
+            dest='students',
+            help='Only reconcile this student id (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of students reconciled per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        student_ids = options['students'] or list(
+            Student.objects.order_by('student_id').values_list('student_id', flat=True)
+        )
+
+        written = 0
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            written += rebuild_all_counters(batch)
+            refresh_students(batch, batch_size=batch_size)
+            self.stdout.write(f'Reconciled {min(start + batch_size, len(student_ids))}/{len(student_ids)} students')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} attendance counters for {len(student_ids)} students.'
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from students.models import Student
+from academics.models import DirtyStudent
+from academics.services.student_metrics import drain_queue, refresh_students
+
+
+class Command(BaseCommand):
+    help = 'Drain the dirty-student queue, or rebuild attendance_percentage/gpa for every student'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute every student instead of only the queued ones',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of students recomputed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if not options['rebuild']:
+            queued = DirtyStudent.objects.count()
+            self.stdout.write(f'{queued} students queued for recompute.')
+            drained = drain_queue(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Recomputed {drained} queued students.'))
+            return
+
+        student_ids = list(Student.objects.order_by('student_id').values_list('student_id', flat=True))
+        refreshed = 0
+        for start in range(0, len(student_ids), batch_size):
+            refreshed += refresh_students(student_ids[start:start + batch_size], batch_size=batch_size)
+            self.stdout.write(f'Recomputed {refreshed}/{len(student_ids)} students')
+        DirtyStudent.objects.all().delete()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt metrics for {refreshed} students.'))
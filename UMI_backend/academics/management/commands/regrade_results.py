@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from academics.models import Result
+from academics.services.grade_totals import regrade_results
+from academics.services.grading import active_scheme
+from academics.services.student_metrics import refresh_students
+from academics.services.transcripts import mark_transcripts_stale
+
+
+class Command(BaseCommand):
+    help = (
+        'Regrade results under the active grading scheme with set-based UPDATEs, '
+        'then rebuild the grade totals and GPAs of the students involved'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            action='append',
+            dest='students',
+            help='Only regrade this student id (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of students regraded per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report which grades would change',
+        )
+
+    def handle(self, *args, **options):
+        scheme = active_scheme()
+        results = Result.objects.all()
+        if options['students']:
+            results = results.filter(student_id__in=options['students'])
+
+        if options['dry_run']:
+            changes = (
+                results.annotate(new_grade=scheme.grade_expression()).exclude(grade=F('new_grade'))
+                .values('grade', 'new_grade').annotate(n=Count('result_id')).order_by('grade', 'new_grade')
+            )
+            total = 0
+            for row in changes:
+                total += row['n']
+                self.stdout.write(f"{row['grade'] or '-'} -> {row['new_grade']}: {row['n']}")
+            self.stdout.write(self.style.SUCCESS(f'{total} results would be regraded under "{scheme.name}".'))
+            return
+
+        batch_size = options['batch_size']
+        student_ids = list(results.order_by('student_id').values_list('student_id', flat=True).distinct())
+        regraded = 0
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            regraded += regrade_results(batch)
+            refresh_students(batch, batch_size=batch_size)
+            mark_transcripts_stale(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Regraded {regraded} results under "{scheme.name}"; '
+            f'rebuilt totals for {len(student_ids)} students.'
+        ))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from students.models import Student
+from academics.services.grade_totals import rebuild_all_totals, verify_totals
+from academics.services.student_metrics import refresh_students
+from academics.services.transcripts import mark_transcripts_stale
+
+
+class Command(BaseCommand):
+    help = 'Check the running GPA totals against a full recompute from the Result table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            action='append',
+            dest='students',
+            help='Only check this student id (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of students checked per batch',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild the totals of students that do not match',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        student_ids = options['students'] or list(
+            Student.objects.order_by('student_id').values_list('student_id', flat=True)
+        )
+
+        mismatched = set()
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            for student_id, semester_id, stored, expected in verify_totals(batch):
+                mismatched.add(student_id)
+                scope = f'semester {semester_id}' if semester_id else 'overall'
+                self.stdout.write(self.style.WARNING(
+                    f'{student_id} ({scope}): stored {stored}, expected {expected}'
+                ))
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS(
+                f'Grade totals match a full recompute for {len(student_ids)} students.'
+            ))
+            return
+
+        if options['fix']:
+            ids = sorted(mismatched)
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                rebuild_all_totals(batch)
+                refresh_students(batch, batch_size=batch_size)
+                mark_transcripts_stale(batch)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt grade totals for {len(ids)} students.'))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f'{len(mismatched)} students have drifted totals; rerun with --fix to rebuild them.'
+            ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_attendance_admin_approved_edit_attendance_can_edit_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyStudent',
+            fields=[
+                ('student_id', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('queued_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['queued_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_attendance_counters'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeTotals',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='grade_totals', serialize=False, to='students.student')),
+                ('grade_points', models.FloatField(default=0)),
+                ('result_count', models.IntegerField(default=0)),
+                ('credit_points', models.FloatField(default=0)),
+                ('credits', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SemesterGradeTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade_points', models.FloatField(default=0)),
+                ('result_count', models.IntegerField(default=0)),
+                ('credit_points', models.FloatField(default=0)),
+                ('credits', models.IntegerField(default=0)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_totals', to='academics.semester')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_grade_totals', to='students.student')),
+            ],
+            options={
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+    ]
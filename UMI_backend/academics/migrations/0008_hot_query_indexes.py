@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_grade_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['timetable', 'date', 'is_submitted'], name='attendance_slot_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['instructor', 'date'], name='attendance_instructor_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'date'], name='attendance_student_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'course'], name='attendance_student_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceeditpermission',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-requested_at'], name='edit_perm_pending_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceeditpermission',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['attendance'], name='edit_perm_pending_attn_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['student', 'exam_date'], name='result_student_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['course', 'grade'], name='result_course_grade_idx'),
+        ),
+    ]
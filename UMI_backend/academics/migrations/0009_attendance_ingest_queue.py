@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_hot_query_indexes'),
+        ('instructors', '0002_delete_hod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceIngestBatch',
+            fields=[
+                ('batch_id', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('mark', 'Mark'), ('submit', 'Submit')], max_length=10)),
+                ('date', models.DateField()),
+                ('payload', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('applied', 'Applied'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_batches', to='instructors.instructor')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_batches', to='academics.timetable')),
+            ],
+            options={
+                'ordering': ['batch_id'],
+                'indexes': [models.Index(fields=['status', 'batch_id'], name='ingest_status_batch_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0009_attendance_ingest_queue'),
+        ('instructors', '0002_delete_hod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSyncRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_records', to='instructors.instructor')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_records', to='academics.timetable')),
+            ],
+            options={
+                'unique_together': {('instructor', 'idempotency_key')},
+            },
+        ),
+    ]
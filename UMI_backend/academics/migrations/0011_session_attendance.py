@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0010_attendance_sync_record'),
+        ('instructors', '0002_delete_hod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionAttendance',
+            fields=[
+                ('session_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('roster', models.TextField(default=',')),
+                ('present_bits', models.BinaryField(default=b'')),
+                ('late_bits', models.BinaryField(default=b'')),
+                ('absent_bits', models.BinaryField(default=b'')),
+                ('is_submitted', models.BooleanField(default=False)),
+                ('compacted', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sessions', to='academics.course')),
+                ('instructor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_sessions', to='instructors.instructor')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='academics.timetable')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['course', 'date'], name='session_course_date_idx')],
+                'unique_together': {('timetable', 'date')},
+            },
+        ),
+    ]
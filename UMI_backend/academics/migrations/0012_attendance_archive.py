@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0011_session_attendance'),
+        ('instructors', '0002_delete_hod'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTerm',
+            fields=[
+                ('semester', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_archive', serialize=False, to='academics.semester')),
+                ('storage', models.CharField(choices=[('table', 'Archive table'), ('file', 'Compressed file')], default='table', max_length=10)),
+                ('path', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('archiving', 'Archiving'), ('archived', 'Archived')], default='archiving', max_length=10)),
+                ('row_count', models.IntegerField(default=0)),
+                ('max_attendance_id', models.IntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttendanceTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance_tallies', to='academics.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance_tallies', to='students.student')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='academics.archivedterm')),
+            ],
+            options={
+                'unique_together': {('term', 'student', 'course')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('attendance_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Late', 'Late')], max_length=10)),
+                ('is_submitted', models.BooleanField(default=True)),
+                ('marked_at', models.DateTimeField(blank=True, null=True)),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendances', to='academics.course')),
+                ('instructor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendances', to='instructors.instructor')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='students.student')),
+                ('timetable', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendances', to='academics.timetable')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='academics.archivedterm')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='archived_attendance_date_idx'), models.Index(fields=['student', 'date'], name='archived_attn_student_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def queue_existing_days(apps, schema_editor):
+    """Queue every day that already has attendance so the first windowed read aggregates it."""
+    Attendance = apps.get_model('academics', 'Attendance')
+    AttendanceStatsDirtyDay = apps.get_model('academics', 'AttendanceStatsDirtyDay')
+    now = timezone.now()
+    days = Attendance.objects.order_by('date').values_list('date', flat=True).distinct()
+    AttendanceStatsDirtyDay.objects.bulk_create(
+        [AttendanceStatsDirtyDay(date=day, queued_at=now) for day in days], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0012_attendance_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceStatsDirtyDay',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('queued_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AttendanceDailyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_buckets', to='academics.department')),
+                ('semester', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_buckets', to='academics.semester')),
+            ],
+            options={
+                'unique_together': {('date', 'department', 'semester')},
+            },
+        ),
+        migrations.RunPython(queue_existing_days, migrations.RunPython.noop),
+    ]
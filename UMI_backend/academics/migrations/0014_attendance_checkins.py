@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0013_attendance_daily_buckets'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceCheckIn',
+            fields=[
+                ('checkin_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Late', 'Late')], max_length=10)),
+                ('checked_in_at', models.DateTimeField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkins', to='students.student')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkins', to='academics.timetable')),
+            ],
+            options={
+                'unique_together': {('timetable', 'date', 'student')},
+            },
+        ),
+    ]
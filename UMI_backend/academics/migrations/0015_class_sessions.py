@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0014_attendance_checkins'),
+        ('instructors', '0002_delete_hod'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSession',
+            fields=[
+                ('class_session_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('room', models.CharField(blank=True, max_length=50)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_sessions', to='academics.course')),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_sessions', to='instructors.instructor')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_sessions', to='academics.timetable')),
+            ],
+            options={
+                'ordering': ['starts_at'],
+                'indexes': [models.Index(fields=['starts_at', 'ends_at'], name='class_session_window_idx'), models.Index(fields=['instructor', 'starts_at'], name='class_session_instructor_idx'), models.Index(fields=['date', 'starts_at'], name='class_session_day_idx')],
+                'unique_together': {('timetable', 'date')},
+            },
+        ),
+    ]
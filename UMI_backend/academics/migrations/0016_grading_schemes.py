@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+DEFAULT_BANDS = (
+    ('A+', 90, 4.0), ('A', 85, 4.0), ('A-', 80, 3.5),
+    ('B+', 75, 3.5), ('B', 70, 3.0), ('B-', 65, 3.0),
+    ('C+', 60, 2.5), ('C', 55, 2.5), ('C-', 50, 2.0),
+    ('D+', 45, 0.0), ('D', 40, 0.0), ('F', 0, 0.0),
+)
+
+
+def create_default_scheme(apps, schema_editor):
+    """The grade ladder Result.save used to hard-code, with the points the GPA totals counted."""
+    GradingScheme = apps.get_model('academics', 'GradingScheme')
+    GradeBand = apps.get_model('academics', 'GradeBand')
+    scheme = GradingScheme.objects.create(name='Default', is_active=True)
+    GradeBand.objects.bulk_create([
+        GradeBand(scheme=scheme, grade=grade, min_percentage=minimum, points=points)
+        for grade, minimum, points in DEFAULT_BANDS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0015_class_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('scheme_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='grading_scheme_one_active')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBand',
+            fields=[
+                ('band_id', models.AutoField(primary_key=True, serialize=False)),
+                ('grade', models.CharField(max_length=2)),
+                ('min_percentage', models.FloatField()),
+                ('points', models.FloatField()),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='academics.gradingscheme')),
+            ],
+            options={
+                'ordering': ['scheme', '-min_percentage'],
+                'unique_together': {('scheme', 'grade'), ('scheme', 'min_percentage')},
+            },
+        ),
+        migrations.RunPython(create_default_scheme, migrations.RunPython.noop),
+    ]
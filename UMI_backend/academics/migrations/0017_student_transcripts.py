@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0016_grading_schemes'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTranscript',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='transcript', serialize=False, to='students.student')),
+                ('semesters', models.JSONField(default=list)),
+                ('cgpa', models.FloatField(default=0)),
+                ('total_credits', models.IntegerField(default=0)),
+                ('credit_points', models.FloatField(default=0)),
+                ('promotion', models.JSONField(default=dict)),
+                ('generation', models.PositiveIntegerField(default=0)),
+                ('built_generation', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
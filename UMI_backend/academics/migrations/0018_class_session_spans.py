@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0017_student_transcripts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSessionSpan',
+            fields=[
+                ('span_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date_from', models.DateField()),
+                ('date_to', models.DateField()),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_session_spans', to='academics.semester')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date_from', 'date_to'], name='class_session_span_idx')],
+                'unique_together': {('semester', 'date_from', 'date_to')},
+            },
+        ),
+    ]
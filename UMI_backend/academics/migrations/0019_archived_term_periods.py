@@ -0,0 +1,131 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:31
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_terms(apps, schema_editor):
+    """
+    One new term per semester archive, cut off the day after its last row;
+    tallies and rows follow their term.
+    """
+    LegacyArchivedTerm = apps.get_model('academics', 'LegacyArchivedTerm')
+    ArchivedTerm = apps.get_model('academics', 'ArchivedTerm')
+    ArchivedAttendanceTally = apps.get_model('academics', 'ArchivedAttendanceTally')
+    ArchivedAttendance = apps.get_model('academics', 'ArchivedAttendance')
+    for legacy in LegacyArchivedTerm.objects.all():
+        term = ArchivedTerm.objects.create(
+            semester_id=legacy.semester_id, cutoff=legacy.last_date and legacy.last_date + timedelta(days=1),
+            storage=legacy.storage, path=legacy.path, status=legacy.status,
+            row_count=legacy.row_count, max_attendance_id=legacy.max_attendance_id,
+            first_date=legacy.first_date, last_date=legacy.last_date, completed_at=legacy.completed_at,
+        )
+        ArchivedTerm.objects.filter(pk=term.pk).update(started_at=legacy.started_at)
+        ArchivedAttendanceTally.objects.filter(term_id=legacy.pk).update(period=term)
+        ArchivedAttendance.objects.filter(term_id=legacy.pk).update(period=term)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0018_class_session_spans'),
+        ('instructors', '0002_delete_hod'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='ArchivedTerm',
+            new_name='LegacyArchivedTerm',
+        ),
+        migrations.CreateModel(
+            name='ArchivedTerm',
+            fields=[
+                ('term_id', models.AutoField(primary_key=True, serialize=False)),
+                ('cutoff', models.DateField(blank=True, null=True)),
+                ('storage', models.CharField(choices=[('table', 'Archive table'), ('file', 'Compressed file')], default='table', max_length=10)),
+                ('path', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('archiving', 'Archiving'), ('archived', 'Archived')], default='archiving', max_length=10)),
+                ('row_count', models.IntegerField(default=0)),
+                ('max_attendance_id', models.IntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='academics.semester')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedattendancetally',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='archivedattendancetally',
+            name='period',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academics.archivedterm'),
+        ),
+        migrations.AddField(
+            model_name='archivedattendance',
+            name='period',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academics.archivedterm'),
+        ),
+        migrations.RunPython(copy_terms, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='archivedattendancetally',
+            name='term',
+        ),
+        migrations.RemoveField(
+            model_name='archivedattendance',
+            name='term',
+        ),
+        migrations.RenameField(
+            model_name='archivedattendancetally',
+            old_name='period',
+            new_name='term',
+        ),
+        migrations.RenameField(
+            model_name='archivedattendance',
+            old_name='period',
+            new_name='term',
+        ),
+        migrations.AlterField(
+            model_name='archivedattendancetally',
+            name='term',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='academics.archivedterm'),
+        ),
+        migrations.AlterField(
+            model_name='archivedattendance',
+            name='term',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='academics.archivedterm'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedattendancetally',
+            unique_together={('term', 'student', 'course')},
+        ),
+        migrations.DeleteModel(
+            name='LegacyArchivedTerm',
+        ),
+        migrations.CreateModel(
+            name='ArchivedEditPermission',
+            fields=[
+                ('permission_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('attendance_id', models.IntegerField()),
+                ('reason', models.TextField()),
+                ('proposed_status', models.CharField(blank=True, choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Late', 'Late')], max_length=10, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=10)),
+                ('requested_at', models.DateTimeField()),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('admin_notes', models.TextField(blank=True)),
+                ('instructor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_edit_requests', to='instructors.instructor')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reviewed_permissions', to=settings.AUTH_USER_MODEL)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='edit_permissions', to='academics.archivedterm')),
+            ],
+            options={
+                'ordering': ['-requested_at'],
+                'indexes': [models.Index(fields=['attendance_id'], name='archived_edit_perm_attn_idx')],
+            },
+        ),
+    ]
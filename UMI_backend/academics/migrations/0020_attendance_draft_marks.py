@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0019_archived_term_periods'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDraftMark',
+            fields=[
+                ('draft_mark_id', models.AutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Late', 'Late')], max_length=10)),
+                ('updated_at', models.DateTimeField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_drafts', to='students.student')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_marks', to='academics.timetable')),
+            ],
+            options={
+                'unique_together': {('timetable', 'date', 'student')},
+            },
+        ),
+    ]
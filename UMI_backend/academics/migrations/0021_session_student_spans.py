@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_spans(apps, schema_editor):
+    """Index the students of sessions compacted before the spans existed."""
+    SessionAttendance = apps.get_model('academics', 'SessionAttendance')
+    SessionStudentSpan = apps.get_model('academics', 'SessionStudentSpan')
+    Student = apps.get_model('students', 'Student')
+    students = set(Student.objects.values_list('student_id', flat=True))
+    spans = {}
+    for timetable_id, day, roster in SessionAttendance.objects.filter(compacted=True).values_list(
+        'timetable_id', 'date', 'roster'
+    ).iterator(chunk_size=500):
+        for student_id in filter(students.__contains__, roster.split(',')):
+            lo, hi = spans.get((student_id, timetable_id), (day, day))
+            spans[(student_id, timetable_id)] = (min(lo, day), max(hi, day))
+    SessionStudentSpan.objects.bulk_create([
+        SessionStudentSpan(student_id=student_id, timetable_id=timetable_id, first_date=lo, last_date=hi)
+        for (student_id, timetable_id), (lo, hi) in spans.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0020_attendance_draft_marks'),
+        ('students', '0002_alter_student_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivededitpermission',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='edit_permissions', to='academics.sessionattendance'),
+        ),
+        migrations.AlterField(
+            model_name='archivededitpermission',
+            name='term',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='edit_permissions', to='academics.archivedterm'),
+        ),
+        migrations.CreateModel(
+            name='SessionStudentSpan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_spans', to='students.student')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_spans', to='academics.timetable')),
+            ],
+            options={
+                'unique_together': {('student', 'timetable')},
+            },
+        ),
+        migrations.RunPython(build_spans, migrations.RunPython.noop),
+    ]
@@ -116,6 +116,12 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ("student", "timetable", "date")
         ordering = ["-date", "-marked_at"]
+        indexes = [
+            models.Index(fields=["timetable", "date", "is_submitted"], name="attendance_slot_day_idx"),
+            models.Index(fields=["instructor", "date"], name="attendance_instructor_day_idx"),
+            models.Index(fields=["student", "date"], name="attendance_student_day_idx"),
+            models.Index(fields=["student", "course"], name="attendance_student_course_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.name} - {self.timetable.course.name} - {self.date} ({self.status})"
@@ -157,6 +163,11 @@ class AttendanceEditPermission(models.Model):
     class Meta:
         ordering = ['-requested_at']
         unique_together = ['instructor', 'attendance', 'status']
+        indexes = [
+            # Only the pending queue is filtered hot; partial where the backend supports it
+            models.Index(fields=['-requested_at'], condition=models.Q(status='pending'), name='edit_perm_pending_queue_idx'),
+            models.Index(fields=['attendance'], condition=models.Q(status='pending'), name='edit_perm_pending_attn_idx'),
+        ]
     
     def __str__(self):
         return f"Edit request by {self.instructor.name} for {self.attendance.student.name} - {self.status}"
@@ -186,6 +197,10 @@ class Result(models.Model):
 
     class Meta:
         ordering = ["-exam_date"]
+        indexes = [
+            models.Index(fields=["student", "exam_date"], name="result_student_date_idx"),
+            models.Index(fields=["course", "grade"], name="result_course_grade_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.name} - {self.course.name}"
@@ -194,27 +209,27 @@ class Result(models.Model):
     def percentage(self):
         return (self.obtained_marks / self.total_marks) * 100 if self.total_marks else 0
 
-    def save(self, *args, **kwargs):
-        # Calculate total_marks and obtained_marks based on exam_type
+    def compute_marks(self):
+        """(total_marks, obtained_marks) for this result's exam_type."""
         exam_type_lower = self.exam_type.lower() if self.exam_type else ''
 
         if 'quiz' in exam_type_lower:
-            self.total_marks = 5
+            total_marks = 5
             # For quiz, determine which quiz slot to use
             if '1' in exam_type_lower or self.quiz1_marks == 0:
-                self.obtained_marks = self.quiz1_marks
+                obtained_marks = self.quiz1_marks
             else:
-                self.obtained_marks = self.quiz2_marks
+                obtained_marks = self.quiz2_marks
         elif 'assignment' in exam_type_lower:
-            self.total_marks = 5
+            total_marks = 5
             # For assignment, determine which assignment slot to use
             if '1' in exam_type_lower or self.assignment1_marks == 0:
-                self.obtained_marks = self.assignment1_marks
+                obtained_marks = self.assignment1_marks
             else:
-                self.obtained_marks = self.assignment2_marks
+                obtained_marks = self.assignment2_marks
         elif 'mid' in exam_type_lower:
-            self.total_marks = 25
-            self.obtained_marks = self.mid_term_marks
+            total_marks = 25
+            obtained_marks = self.mid_term_marks
         elif 'final' in exam_type_lower:
             # Final grade is calculated from all assessments
             # Total: 2 quizzes (5 each) + 2 assignments (5 each) + mid (25) + final (60) = 100
@@ -224,40 +239,20 @@ class Result(models.Model):
                 self.mid_term_marks +  # 25 marks
                 self.final_marks  # 60 marks
             )
-            self.total_marks = 100
-            self.obtained_marks = total_assessments
+            total_marks = 100
+            obtained_marks = total_assessments
         else:
             # Default to mid-term if exam_type not recognized
-            self.total_marks = 25
-            self.obtained_marks = self.mid_term_marks
-
-        # Calculate grade based on percentage
-        percentage = (self.obtained_marks / self.total_marks) * 100 if self.total_marks > 0 else 0
-
-        if percentage >= 90:
-            self.grade = 'A+'
-        elif percentage >= 85:
-            self.grade = 'A'
-        elif percentage >= 80:
-            self.grade = 'A-'
-        elif percentage >= 75:
-            self.grade = 'B+'
-        elif percentage >= 70:
-            self.grade = 'B'
-        elif percentage >= 65:
-            self.grade = 'B-'
-        elif percentage >= 60:
-            self.grade = 'C+'
-        elif percentage >= 55:
-            self.grade = 'C'
-        elif percentage >= 50:
-            self.grade = 'C-'
-        elif percentage >= 45:
-            self.grade = 'D+'
-        elif percentage >= 40:
-            self.grade = 'D'
-        else:
-            self.grade = 'F'
+            total_marks = 25
+            obtained_marks = self.mid_term_marks
+        return total_marks, obtained_marks
+
+    def save(self, *args, **kwargs):
+        self.total_marks, self.obtained_marks = self.compute_marks()
+
+        # Grade from the active grading scheme
+        from academics.services.grading import grade_for
+        self.grade = grade_for(self.obtained_marks, self.total_marks)
 
         super().save(*args, **kwargs)
 
@@ -292,3 +287,479 @@ class StudentAcademicHistory(models.Model):
 
     def __str__(self):
         return f"{self.student.name} - {self.semester.name} - GPA: {self.gpa}, CGPA: {self.cgpa}"
+
+
+# ---------- Student Metrics Queue ----------
+class DirtyStudent(models.Model):
+    """
+    Students whose attendance_percentage / gpa must be recomputed.
+    Filled by the Attendance/Result signals, drained by `refresh_student_metrics`.
+    """
+    student_id = models.CharField(max_length=20, primary_key=True)
+    queued_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["queued_at"]
+
+    def __str__(self):
+        return f"{self.student_id} (queued {self.queued_at})"
+
+
+# ---------- Attendance Counters ----------
+class AttendanceCounter(models.Model):
+    """Running attendance totals per student, maintained by status-transition deltas."""
+    student = models.OneToOneField("students.Student", on_delete=models.CASCADE, primary_key=True, related_name="attendance_counter")
+    total = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.student_id}: {self.present}/{self.total} present"
+
+    @property
+    def attendance_rate(self):
+        return round((self.present / self.total) * 100, 2) if self.total else 0.0
+
+
+class CourseAttendanceCounter(models.Model):
+    """Running attendance totals per student and course."""
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="course_attendance_counters")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="attendance_counters")
+    total = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "course")
+
+    def __str__(self):
+        return f"{self.student_id} / {self.course_id}: {self.present}/{self.total} present"
+
+    @property
+    def attendance_rate(self):
+        return round((self.present / self.total) * 100, 2) if self.total else 0.0
+
+
+# ---------- Grade Totals ----------
+class GradeTotals(models.Model):
+    """Running grade-point sums per student, maintained incrementally from Result writes."""
+    student = models.OneToOneField("students.Student", on_delete=models.CASCADE, primary_key=True, related_name="grade_totals")
+    grade_points = models.FloatField(default=0)   # sum of per-result grade points
+    result_count = models.IntegerField(default=0)
+    credit_points = models.FloatField(default=0)  # sum of grade points x course credits
+    credits = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.student_id}: GPA {self.gpa}, CGPA {self.cgpa}"
+
+    @property
+    def gpa(self):
+        return round(self.grade_points / self.result_count, 2) if self.result_count else 0.0
+
+    @property
+    def cgpa(self):
+        return round(self.credit_points / self.credits, 2) if self.credits else 0.0
+
+
+class SemesterGradeTotals(models.Model):
+    """Running grade-point sums per student and semester."""
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="semester_grade_totals")
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="grade_totals")
+    grade_points = models.FloatField(default=0)
+    result_count = models.IntegerField(default=0)
+    credit_points = models.FloatField(default=0)
+    credits = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "semester")
+
+    def __str__(self):
+        return f"{self.student_id} / {self.semester_id}: GPA {self.gpa}"
+
+    @property
+    def gpa(self):
+        return round(self.grade_points / self.result_count, 2) if self.result_count else 0.0
+
+    @property
+    def cgpa(self):
+        return round(self.credit_points / self.credits, 2) if self.credits else 0.0
+
+
+
+# ---------- Student Transcripts ----------
+class StudentTranscript(models.Model):
+    """
+    A student's result-page summary (per-semester GPA, CGPA, credits and
+    promotion status) built from the grade totals. Writers bump
+    ``generation``; the row is fresh while ``built_generation`` matches it.
+    """
+    student = models.OneToOneField("students.Student", on_delete=models.CASCADE, primary_key=True, related_name="transcript")
+    semesters = models.JSONField(default=list)   # [{semester_id, name, gpa, cgpa, credits, result_count}]
+    cgpa = models.FloatField(default=0)
+    total_credits = models.IntegerField(default=0)
+    credit_points = models.FloatField(default=0)
+    promotion = models.JSONField(default=dict)
+    generation = models.PositiveIntegerField(default=0)
+    built_generation = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student_id}: CGPA {self.cgpa}"
+
+    @property
+    def is_stale(self):
+        return self.built_generation != self.generation
+
+# ---------- Attendance Ingest Queue ----------
+class AttendanceIngestBatch(models.Model):
+    """A validated mark/submit request waiting for the ingest worker to apply it."""
+    MARK = "mark"
+    SUBMIT = "submit"
+    KIND_CHOICES = [(MARK, "Mark"), (SUBMIT, "Submit")]
+
+    QUEUED = "queued"
+    APPLIED = "applied"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (APPLIED, "Applied"), (FAILED, "Failed")]
+
+    batch_id = models.AutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="ingest_batches")
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.CASCADE, related_name="ingest_batches")
+    date = models.DateField()
+    payload = models.JSONField(default=list, blank=True)  # [{"student_id": ..., "status": ...}]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)      # marked/submitted counts and warnings
+    error = models.TextField(blank=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+    applied_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["batch_id"]
+        indexes = [
+            models.Index(fields=["status", "batch_id"], name="ingest_status_batch_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} batch {self.batch_id} for timetable {self.timetable_id} ({self.status})"
+
+
+# ---------- Attendance Sync Deduplication ----------
+class AttendanceSyncRecord(models.Model):
+    """The stored outcome of one client sync batch, so a retried batch is answered from here."""
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.CASCADE, related_name="sync_records")
+    idempotency_key = models.CharField(max_length=100)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="sync_records")
+    date = models.DateField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("instructor", "idempotency_key")
+
+    def __str__(self):
+        return f"Sync {self.idempotency_key} by instructor {self.instructor_id}"
+
+
+# ---------- Compact Session Attendance ----------
+class SessionAttendance(models.Model):
+    """
+    One class session's attendance in compact form: the ordered roster
+    snapshot plus one packed bitset per status, bit i standing for the i-th
+    roster entry. ``compacted`` is set once no per-student Attendance rows
+    exist for the session, i.e. this record is the only copy.
+    """
+    session_id = models.AutoField(primary_key=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="sessions")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="attendance_sessions", null=True, blank=True)
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.SET_NULL, null=True, blank=True, related_name="attendance_sessions")
+    date = models.DateField()
+    roster = models.TextField(default=",")  # ",cs001,cs002," so one student can be matched with a LIKE
+    present_bits = models.BinaryField(default=b"")
+    late_bits = models.BinaryField(default=b"")
+    absent_bits = models.BinaryField(default=b"")
+    is_submitted = models.BooleanField(default=False)
+    compacted = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("timetable", "date")
+        ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["course", "date"], name="session_course_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"Session {self.timetable_id} on {self.date}"
+
+
+class SessionStudentSpan(models.Model):
+    """
+    The first and last date of one student's compacted sessions in one slot,
+    so a student's compact history is found through the (timetable, date)
+    index instead of matching every roster.
+    """
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="session_spans")
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="student_spans")
+    first_date = models.DateField()
+    last_date = models.DateField()
+
+    class Meta:
+        unique_together = ("student", "timetable")
+
+    def __str__(self):
+        return f"{self.student_id} in timetable {self.timetable_id} {self.first_date}..{self.last_date}"
+
+
+# ---------- Attendance Archive ----------
+class ArchivedTerm(models.Model):
+    """
+    One archival run of a semester: its Attendance rows dated before
+    ``cutoff`` moved out of the live table. Semesters are reused from year to
+    year, so a semester collects one term per academic period archived.
+    ``max_attendance_id`` bounds the rows captured in the tallies, so a run
+    that is interrupted and resumed never moves rows it has not counted.
+    """
+    TABLE = "table"
+    FILE = "file"
+    STORAGE_CHOICES = [(TABLE, "Archive table"), (FILE, "Compressed file")]
+    ARCHIVING = "archiving"
+    ARCHIVED = "archived"
+    STATUS_CHOICES = [(ARCHIVING, "Archiving"), (ARCHIVED, "Archived")]
+
+    term_id = models.AutoField(primary_key=True)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="attendance_archives")
+    cutoff = models.DateField(null=True, blank=True)
+    storage = models.CharField(max_length=10, choices=STORAGE_CHOICES, default=TABLE)
+    path = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ARCHIVING)
+    row_count = models.IntegerField(default=0)
+    max_attendance_id = models.IntegerField(default=0)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.semester} attendance {self.first_date}..{self.last_date} ({self.status}, {self.storage})"
+
+
+class ArchivedAttendanceTally(models.Model):
+    """Per student and course rollup of an archived term, captured before its rows are moved."""
+    term = models.ForeignKey(ArchivedTerm, on_delete=models.CASCADE, related_name="tallies")
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="archived_attendance_tallies")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="archived_attendance_tallies", null=True, blank=True)
+    total = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("term", "student", "course")
+
+
+class ArchivedAttendance(models.Model):
+    """An Attendance row moved to cold storage; keeps its original id."""
+    attendance_id = models.IntegerField(primary_key=True)
+    term = models.ForeignKey(ArchivedTerm, on_delete=models.CASCADE, related_name="rows")
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="archived_attendances")
+    course = models.ForeignKey(Course, on_delete=models.SET_NULL, related_name="archived_attendances", null=True, blank=True)
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.SET_NULL, related_name="archived_attendances", null=True, blank=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.SET_NULL, related_name="archived_attendances", null=True, blank=True)
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    is_submitted = models.BooleanField(default=True)
+    marked_at = models.DateTimeField(null=True, blank=True)
+
+    # Archived rows are read-only
+    can_edit = False
+
+    class Meta:
+        ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["date"], name="archived_attendance_date_idx"),
+            models.Index(fields=["student", "date"], name="archived_attn_student_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.date} ({self.status}, archived)"
+
+    def is_editable(self):
+        return False
+
+
+class ArchivedEditPermission(models.Model):
+    """
+    An AttendanceEditPermission of a row that left the live table, kept as
+    audit history with its original id: ``term`` is set for archived rows,
+    ``session`` for rows folded into a compacted session.
+    """
+    permission_id = models.IntegerField(primary_key=True)
+    term = models.ForeignKey(ArchivedTerm, on_delete=models.CASCADE, related_name="edit_permissions", null=True, blank=True)
+    session = models.ForeignKey(SessionAttendance, on_delete=models.CASCADE, related_name="edit_permissions", null=True, blank=True)
+    attendance_id = models.IntegerField()
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.SET_NULL, related_name="archived_edit_requests", null=True, blank=True)
+    reason = models.TextField()
+    proposed_status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=AttendanceEditPermission.STATUS_CHOICES)
+    requested_at = models.DateTimeField()
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey("register.User", on_delete=models.SET_NULL, null=True, blank=True, related_name="archived_reviewed_permissions")
+    admin_notes = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-requested_at"]
+        indexes = [models.Index(fields=["attendance_id"], name="archived_edit_perm_attn_idx")]
+
+    def __str__(self):
+        return f"Edit request {self.permission_id} for archived attendance {self.attendance_id} - {self.status}"
+
+
+# ---------- Attendance Statistics ----------
+class AttendanceDailyBucket(models.Model):
+    """One day's attendance counts per department and semester, by student placement when aggregated."""
+    date = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="attendance_buckets", null=True, blank=True)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="attendance_buckets", null=True, blank=True)
+    total = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("date", "department", "semester")
+
+    def __str__(self):
+        return f"{self.date} {self.department_id}/{self.semester_id}: {self.present}/{self.total}"
+
+
+class AttendanceStatsDirtyDay(models.Model):
+    """A day whose buckets must be re-aggregated before they are read."""
+    date = models.DateField(primary_key=True)
+    queued_at = models.DateTimeField()
+
+
+# ---------- Student Self Check-in ----------
+class AttendanceCheckIn(models.Model):
+    """A student's self check-in for a slot, buffered until the flush writes it into Attendance."""
+    checkin_id = models.AutoField(primary_key=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="checkins")
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="checkins")
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    checked_in_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("timetable", "date", "student")
+
+    def __str__(self):
+        return f"{self.student_id} checked in to timetable {self.timetable_id} on {self.date}"
+
+
+class AttendanceDraftMark(models.Model):
+    """
+    One drafted mark of a slot, held until the slot is submitted. Drafts
+    live in the database so every worker process sees the same draft and
+    concurrent saves merge row by row.
+    """
+    draft_mark_id = models.AutoField(primary_key=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="draft_marks")
+    student = models.ForeignKey("students.Student", on_delete=models.CASCADE, related_name="attendance_drafts")
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("timetable", "date", "student")
+
+    def __str__(self):
+        return f"Draft {self.status} for {self.student_id} in timetable {self.timetable_id} on {self.date}"
+
+
+# ---------- Class Sessions ----------
+class ClassSession(models.Model):
+    """
+    One dated occurrence of a weekly Timetable slot, generated ahead of time
+    so schedule lookups are indexed range queries on ``starts_at``/``ends_at``.
+    ``weekday`` follows ``date.weekday()`` (monday == 0).
+    """
+    class_session_id = models.AutoField(primary_key=True)
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="class_sessions")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="class_sessions")
+    instructor = models.ForeignKey("instructors.Instructor", on_delete=models.CASCADE, related_name="class_sessions")
+    date = models.DateField()
+    weekday = models.PositiveSmallIntegerField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    room = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        unique_together = ("timetable", "date")
+        ordering = ["starts_at"]
+        indexes = [
+            models.Index(fields=["starts_at", "ends_at"], name="class_session_window_idx"),
+            models.Index(fields=["instructor", "starts_at"], name="class_session_instructor_idx"),
+            models.Index(fields=["date", "starts_at"], name="class_session_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"Timetable {self.timetable_id} on {self.date} {self.starts_at:%H:%M}-{self.ends_at:%H:%M}"
+
+
+class ClassSessionSpan(models.Model):
+    """
+    A date range class sessions were generated for in one semester. Inside
+    one of its spans a semester's sessions are its schedule (a day without a
+    session has no class); outside them its slots follow the weekly timetable.
+    """
+    span_id = models.AutoField(primary_key=True)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name="class_session_spans")
+    date_from = models.DateField()
+    date_to = models.DateField()
+
+    class Meta:
+        unique_together = ("semester", "date_from", "date_to")
+        indexes = [models.Index(fields=["date_from", "date_to"], name="class_session_span_idx")]
+
+    def __str__(self):
+        return f"Semester {self.semester_id} sessions {self.date_from} to {self.date_to}"
+
+
+# ---------- Grading Schemes ----------
+class GradingScheme(models.Model):
+    """
+    A percentage -> letter grade -> grade point table. The active scheme
+    grades every Result and feeds the GPA totals; at most one is active.
+    """
+    scheme_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=100, unique=True)
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["is_active"], condition=models.Q(is_active=True),
+                                    name="grading_scheme_one_active"),
+        ]
+
+    def __str__(self):
+        return f"{self.name}{' (active)' if self.is_active else ''}"
+
+
+class GradeBand(models.Model):
+    """One grade of a scheme: awarded from ``min_percentage`` up to the next band."""
+    band_id = models.AutoField(primary_key=True)
+    scheme = models.ForeignKey(GradingScheme, on_delete=models.CASCADE, related_name="bands")
+    grade = models.CharField(max_length=2)
+    min_percentage = models.FloatField()
+    points = models.FloatField()
+
+    class Meta:
+        ordering = ["scheme", "-min_percentage"]
+        unique_together = [("scheme", "grade"), ("scheme", "min_percentage")]
+
+    def __str__(self):
+        return f"{self.grade} >= {self.min_percentage}% ({self.points})"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Attendance, Result, Scholarship, Department, Semester, Course
+from .services.grading import active_scheme
 
 
 # ===========================
@@ -220,13 +221,7 @@ class ResultSerializer(serializers.ModelSerializer):
         return obj.course.name if obj.course else (f"{obj.exam_type} Exam" if obj.exam_type else 'General Result')
 
     def get_gpa(self, obj):
-        grade_map = {
-            'A+': 4.0, 'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0, 'F': 0.0
-        }
-        return grade_map.get(obj.grade.upper(), 0.0) if obj.grade else 0.0
+        return active_scheme().points_for_grade(obj.grade)
 
     def get_marks(self, obj):
         return f"{obj.obtained_marks}/{obj.total_marks}"
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from academics.models import ArchivedAttendanceTally, Attendance
+from academics.services.attendance_archive import archived_attendance, archived_terms
+from students.models import Student
+
+# Sort key of the admin listing: department name, semester name, student name, id
+PAGE_KEYS = ("dept_key", "sem_key", "name", "student_id")
+STUDENT_FIELDS = ("student_id", "name", "email", "phone", "dept_key", "sem_key")
+NO_DEPARTMENT = "No Department"
+NO_SEMESTER = "No Semester"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    return base64.urlsafe_b64encode(json.dumps([row[key] for key in PAGE_KEYS]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(PAGE_KEYS):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def _after(values):
+    """Keyset condition: rows strictly after ``values`` in PAGE_KEYS order."""
+    condition = Q()
+    for i, key in enumerate(PAGE_KEYS):
+        condition |= Q(**{k: v for k, v in zip(PAGE_KEYS[:i], values)}, **{f"{key}__gt": values[i]})
+    return condition
+
+
+def filtered_students(department_id=None, semester_id=None):
+    students = Student.objects.all()
+    if department_id:
+        students = students.filter(department_id=department_id)
+    if semester_id:
+        students = students.filter(semester_id=semester_id)
+    return students
+
+
+def student_page(students, date=None, cursor=None, page_size=200):
+    """
+    One keyset page of students in listing order, each with the id of its
+    attendance row on ``date`` picked in the same SQL statement.
+    Returns (rows, next cursor or None).
+    """
+    page = students.annotate(
+        dept_key=Coalesce("department__name", Value(NO_DEPARTMENT)),
+        sem_key=Coalesce("semester__name", Value(NO_SEMESTER)),
+    )
+    fields = list(STUDENT_FIELDS)
+    if date:
+        page = page.annotate(attendance_pk=Subquery(
+            Attendance.objects.filter(student=OuterRef("pk"), date=date)
+            .order_by("-marked_at").values("attendance_id")[:1]
+        ))
+        fields.append("attendance_pk")
+    if cursor:
+        page = page.filter(_after(decode_cursor(cursor)))
+    rows = list(page.order_by(*PAGE_KEYS).values(*fields)[: page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def attendance_for_page(rows, date, terms=()):
+    """{student_id: attendance} for a page: live rows by id, archived rows for archived terms."""
+    ids = [row["attendance_pk"] for row in rows if row.get("attendance_pk")]
+    records = {}
+    if ids:
+        for att in Attendance.objects.select_related("instructor", "timetable__course").filter(attendance_id__in=ids):
+            records[att.student_id] = att
+    if terms:
+        for att in archived_attendance(date, date, student_ids=[row["student_id"] for row in rows], terms=terms):
+            records.setdefault(att.student_id, att)
+    return records
+
+
+def _attendance_entry(attendance):
+    if attendance is None:
+        return {
+            'id': None, 'status': 'Not Marked', 'instructor': 'N/A', 'course': {'name': 'N/A', 'code': 'N/A'},
+            'time_slot': 'N/A', 'room': 'N/A', 'marked_at': None, 'is_submitted': False, 'can_edit': True,
+        }
+    timetable = attendance.timetable
+    course = timetable.course if timetable else None
+    return {
+        'id': attendance.attendance_id,
+        'status': attendance.status,
+        'instructor': attendance.instructor.name if attendance.instructor else 'N/A',
+        'course': {'name': course.name, 'code': course.code} if course else {'name': 'N/A', 'code': 'N/A'},
+        'time_slot': f"{timetable.start_time} - {timetable.end_time}" if timetable else 'N/A',
+        'room': timetable.room if timetable else 'N/A',
+        'marked_at': attendance.marked_at,
+        'is_submitted': attendance.is_submitted,
+        'can_edit': attendance.can_edit,
+    }
+
+
+def group_page(rows, records, date):
+    """Nest one page into {department: {semester: [student entries]}} in listing order."""
+    organized = {}
+    for row in rows:
+        organized.setdefault(row["dept_key"], {}).setdefault(row["sem_key"], []).append({
+            'student_id': row["student_id"],
+            'student_name': row["name"],
+            'email': row["email"],
+            'phone': row["phone"] or 'N/A',
+            'attendance': _attendance_entry(records.get(row["student_id"])) if date else None,
+        })
+    return organized
+
+
+def attendance_stats(students, date=None, terms=()):
+    """Student count plus present/absent/late totals from one conditional aggregate over Attendance."""
+    rows = Attendance.objects.filter(student__in=students.values("pk"))
+    if date:
+        rows = rows.filter(date=date)
+    counts = rows.aggregate(
+        total_records=Count("attendance_id"),
+        present=Count("attendance_id", filter=Q(status=Attendance.PRESENT)),
+        absent=Count("attendance_id", filter=Q(status=Attendance.ABSENT)),
+        late=Count("attendance_id", filter=Q(status=Attendance.LATE)),
+    )
+    if date and terms:
+        archived = archived_attendance(date, date, terms=terms)
+        wanted = set(students.filter(pk__in={att.student_id for att in archived}).values_list("pk", flat=True))
+        for att in archived:
+            if att.student_id in wanted:
+                counts['total_records'] += 1
+                counts[att.status.lower()] += 1
+    elif not date:
+        # The whole history is asked for; archived terms count through their rollups
+        archived = ArchivedAttendanceTally.objects.filter(student__in=students.values("pk")).aggregate(
+            total_records=Sum("total"), present=Sum("present"), absent=Sum("absent"), late=Sum("late")
+        )
+        for key, value in archived.items():
+            counts[key] += value or 0
+    return {'total_students': students.count(), **counts}
+
+
+def iter_pages(students, date=None, page_size=500):
+    """Yield grouped pages one at a time; only one page is held in memory."""
+    terms = archived_terms(date, date) if date else []
+    cursor = None
+    while True:
+        rows, cursor = student_page(students, date=date, cursor=cursor, page_size=page_size)
+        if rows:
+            yield group_page(rows, attendance_for_page(rows, date, terms) if date else {}, date)
+        if cursor is None:
+            return
@@ -0,0 +1,208 @@
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import Attendance, Timetable
+from academics.services.attendance_counters import CounterDeltas, apply_deltas
+from academics.services.session_attendance import is_compacted
+from academics.services.student_metrics import mark_students_dirty
+from students.models import Student
+
+VALID_STATUSES = {choice for choice, _ in Attendance.STATUS_CHOICES}
+
+
+class AttendanceWriteResult:
+    """Outcome of a bulk attendance write, consumed by the marking views."""
+
+    def __init__(self):
+        self.created = []       # student_ids inserted
+        self.updated = []       # student_ids whose row was changed
+        self.rows = []          # per-student summary in payload order
+        self.missing = []       # student_ids not found
+        self.not_enrolled = []  # (student_id, name) outside the required semester
+        self.locked = []        # (student_id, name) already submitted
+        self.invalid = []       # (student_id, status) with an unknown status
+
+    @property
+    def marked_count(self):
+        return len(self.created) + len(self.updated)
+
+    def warnings(self, semester_name=None):
+        messages = [f'Student with ID {sid} not found' for sid in self.missing]
+        messages += [
+            f'Student {name} not enrolled in {semester_name or "this semester"}'
+            for _, name in self.not_enrolled
+        ]
+        messages += [f'Cannot edit attendance for {name} - already submitted' for _, name in self.locked]
+        messages += [f'Invalid status "{value}" for student {sid}' for sid, value in self.invalid]
+        return messages
+
+
+def normalise_marks(marks):
+    """Collapse the payload into an ordered {student_id: status} map (last mark wins)."""
+    ordered = {}
+    for item in marks:
+        student_id = item.get('student_id')
+        if student_id in (None, ''):
+            continue
+        ordered[str(student_id)] = item.get('status')
+    return ordered
+
+
+def write_attendance(marks, *, date, instructor, timetable=None, course=None, semester=None,
+                     consume_approval=False, overwrite_locked=False, strict=False, submit=False):
+    """
+    Apply a whole class's attendance marks in one transaction.
+
+    The roster is loaded with one query and diffed against the existing rows for
+    (timetable, date); the changes are then written with one ``bulk_create`` and
+    one ``bulk_update``. Rows are keyed on ``(student, timetable, date)``, the
+    same key as ``Attendance``'s unique constraint, so ``timetable=None`` writes
+    the untimetabled daily rows used by the instructor bulk endpoint. A slot
+    folded into a compacted session is read-only: every mark comes back locked.
+
+    - ``semester``: reject students outside this semester.
+    - ``consume_approval``: clear ``admin_approved_edit`` once an approved edit is used.
+    - ``overwrite_locked``: update submitted rows too and reopen them (legacy bulk endpoint).
+    - ``strict``: raise ``Student.DoesNotExist`` before writing if any student is unknown.
+    - ``submit``: write the rows already finalised (``is_submitted=True``, not editable).
+    """
+    result = AttendanceWriteResult()
+    requested = normalise_marks(marks)
+    if not requested:
+        return result
+
+    course = course or (timetable.course if timetable else None)
+    students = {
+        s.student_id: s
+        for s in Student.objects.filter(student_id__in=requested.keys()).only('student_id', 'name', 'semester_id')
+    }
+
+    missing = [sid for sid in requested if sid not in students]
+    if missing and strict:
+        raise Student.DoesNotExist(f'Student with ID {missing[0]} not found')
+    result.missing = missing
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    deltas = CounterDeltas(days=[date])
+
+    with transaction.atomic():
+        if timetable is not None:
+            # Serialise concurrent submissions for the same slot on its timetable row.
+            Timetable.objects.select_for_update().filter(pk=timetable.pk).exists()
+            existing_qs = Attendance.objects.filter(timetable=timetable, date=date)
+            compacted = is_compacted(timetable, date)
+        else:
+            existing_qs = Attendance.objects.filter(timetable__isnull=True, date=date)
+            compacted = False
+        existing = {
+            row.student_id: row
+            for row in existing_qs.filter(student_id__in=students.keys()).order_by()
+        }
+
+        for student_id, status_value in requested.items():
+            student = students.get(student_id)
+            if student is None:
+                continue
+            if status_value not in VALID_STATUSES:
+                result.invalid.append((student_id, status_value))
+                continue
+            if semester is not None and student.semester_id != semester.pk:
+                result.not_enrolled.append((student_id, student.name))
+                continue
+            if compacted:
+                result.locked.append((student_id, student.name))
+                continue
+
+            row = existing.get(student_id)
+            if row is None:
+                to_create.append(Attendance(
+                    student_id=student_id,
+                    course=course,
+                    instructor=instructor,
+                    timetable=timetable,
+                    date=date,
+                    status=status_value,
+                    marked_by=instructor,
+                    is_submitted=submit,
+                    can_edit=not submit,
+                ))
+                deltas.add(student_id, course.pk if course else None, status_value)
+                result.created.append(student_id)
+                result.rows.append({
+                    'student_id': student_id,
+                    'student_name': student.name,
+                    'status': status_value,
+                    'created': True,
+                })
+                continue
+
+            if overwrite_locked:
+                row.instructor = instructor
+                row.is_submitted = False
+                row.can_edit = True
+            elif not row.is_editable():
+                result.locked.append((student_id, student.name))
+                continue
+            elif consume_approval and row.admin_approved_edit:
+                row.admin_approved_edit = False
+
+            if submit:
+                row.is_submitted = True
+                row.can_edit = False
+                row.admin_approved_edit = False
+
+            if row.status != status_value:
+                deltas.transition(student_id, row.course_id, row.status, status_value)
+            row.status = status_value
+            row.marked_by = instructor
+            row.updated_at = now
+            to_update.append(row)
+            result.updated.append(student_id)
+            result.rows.append({
+                'student_id': student_id,
+                'student_name': student.name,
+                'status': status_value,
+                'created': False,
+            })
+
+        if to_create:
+            Attendance.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            Attendance.objects.bulk_update(
+                to_update,
+                ['status', 'marked_by', 'instructor', 'is_submitted', 'can_edit',
+                 'admin_approved_edit', 'updated_at'],
+                batch_size=500,
+            )
+
+        # Bulk writes skip post_save, so apply the counter deltas and queue the
+        # recompute once for the whole class.
+        apply_deltas(deltas)
+        mark_students_dirty(result.created + result.updated)
+
+    return result
+
+
+def submit_attendance(timetable, date):
+    """Finalise a slot's attendance for ``date``; returns the number of rows locked."""
+    return Attendance.objects.filter(timetable=timetable, date=date, is_submitted=False).update(
+        is_submitted=True,
+        can_edit=False,
+        admin_approved_edit=False,
+    )
+
+
+def finalize_attendance(marks, *, timetable, instructor, date, semester=None):
+    """
+    Write a draft snapshot straight into its submitted state and lock any
+    other rows of the slot, all in one transaction. Returns the write result
+    and the total number of submitted rows.
+    """
+    with transaction.atomic():
+        result = write_attendance(
+            marks, date=date, instructor=instructor, timetable=timetable, semester=semester, submit=True
+        )
+        locked = submit_attendance(timetable, date)
+    return result, result.marked_count + locked
@@ -0,0 +1,295 @@
+import gzip
+import json
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academics.models import (
+    Attendance, AttendanceEditPermission, ArchivedAttendance, ArchivedAttendanceTally, ArchivedEditPermission,
+    ArchivedTerm, Semester,
+)
+from academics.services.attendance_counters import COUNTER_FIELDS, counters_frozen
+from academics.services.attendance_stats import refresh_buckets
+from academics.services.student_metrics import deferred_refresh
+
+ARCHIVE_AFTER_DAYS = getattr(settings, "ATTENDANCE_ARCHIVE_AFTER_DAYS", 180)
+ROW_FIELDS = (
+    "attendance_id", "student_id", "course_id", "instructor_id", "timetable_id",
+    "date", "status", "is_submitted", "marked_at",
+)
+PERMISSION_FIELDS = (
+    "permission_id", "attendance_id", "instructor_id", "reason", "proposed_status", "status",
+    "requested_at", "reviewed_at", "reviewed_by_id", "admin_notes",
+)
+
+
+def archive_dir():
+    return Path(getattr(settings, "ATTENDANCE_ARCHIVE_DIR", Path(settings.MEDIA_ROOT) / "attendance_archive"))
+
+
+def term_rows(semester_id, before):
+    """
+    Live Attendance rows of one semester dated before ``before``; rows
+    without a course fall back to their slot's course.
+    """
+    return Attendance.objects.filter(
+        Q(course__semester_id=semester_id) | Q(course__isnull=True, timetable__course__semester_id=semester_id),
+        date__lt=before,
+    )
+
+
+def _resumable():
+    """{semester_id: term} for archival runs that were interrupted."""
+    return {term.semester_id: term for term in ArchivedTerm.objects.filter(status=ArchivedTerm.ARCHIVING)}
+
+
+# ===========================
+# Selecting terms
+# ===========================
+def closed_terms(before=None, semester_ids=None):
+    """
+    [(semester, {rows, first_date, last_date})] for the semesters with live
+    attendance older than ``before`` (default: ATTENDANCE_ARCHIVE_AFTER_DAYS
+    ago) and no pending edit requests on it. Semesters are reused across
+    academic years, so a term is the rows of one semester in that date
+    range, not the semester itself. Terms whose archival was interrupted
+    are included with their own cutoff so a rerun resumes them.
+    """
+    before = before or timezone.now().date() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    resumable = _resumable()
+    rows = Attendance.objects.annotate(term=Coalesce("course__semester_id", "timetable__course__semester_id"))
+    if semester_ids:
+        rows = rows.filter(term__in=semester_ids)
+    older = Q(date__lt=before) & ~Q(term__in=list(resumable))
+    for semester_id, term in resumable.items():
+        older |= Q(term=semester_id, date__lt=term.cutoff)
+    spans = (
+        rows.filter(older).exclude(term__isnull=True).values("term")
+        .annotate(
+            rows=Count("attendance_id", distinct=True),
+            first_date=Min("date"),
+            last_date=Max("date"),
+            pending=Count("edit_permissions", filter=Q(edit_permissions__status="pending")),
+        )
+        .order_by("term")
+    )
+    eligible = {
+        span["term"]: span for span in spans
+        if not span["pending"] or span["term"] in resumable
+    }
+    semesters = Semester.objects.select_related("department").in_bulk(list(eligible))
+    return [
+        (semesters[term], {key: span[key] for key in ("rows", "first_date", "last_date")})
+        for term, span in eligible.items()
+    ]
+
+
+# ===========================
+# Archiving
+# ===========================
+def _capture(semester, before, storage):
+    """Record the term and its per student/course rollups before any row is moved."""
+    rows = term_rows(semester.pk, before)
+    span = rows.aggregate(first_date=Min("date"), last_date=Max("date"), max_id=Max("attendance_id"))
+    # Daily stats buckets must hold these days before their rows leave the table
+    refresh_buckets(span["first_date"], span["last_date"])
+    path = ""
+    if storage == ArchivedTerm.FILE and span["first_date"]:
+        path = str(archive_dir() / (
+            f"{semester.semester_code}-{span['first_date']:%Y%m%d}-{span['last_date']:%Y%m%d}.jsonl.gz"
+        ))
+    with transaction.atomic():
+        term = ArchivedTerm.objects.create(
+            semester=semester, cutoff=before, storage=storage, path=path, max_attendance_id=span["max_id"] or 0,
+            first_date=span["first_date"], last_date=span["last_date"],
+        )
+        counts = rows.filter(attendance_id__lte=term.max_attendance_id).values("student_id", "course_id").annotate(
+            total=Count("attendance_id"),
+            present=Count("attendance_id", filter=Q(status=Attendance.PRESENT)),
+            late=Count("attendance_id", filter=Q(status=Attendance.LATE)),
+            absent=Count("attendance_id", filter=Q(status=Attendance.ABSENT)),
+        ).order_by()
+        ArchivedAttendanceTally.objects.bulk_create([
+            ArchivedAttendanceTally(term=term, student_id=row["student_id"], course_id=row["course_id"],
+                                    **{f: row[f] for f in COUNTER_FIELDS})
+            for row in counts
+        ], batch_size=500)
+    return term
+
+
+def _serialise(row):
+    values = dict(zip(ROW_FIELDS, row))
+    values["date"] = values["date"].isoformat()
+    values["marked_at"] = values["marked_at"].isoformat() if values["marked_at"] else None
+    return json.dumps(values)
+
+
+def keep_edit_requests(owners):
+    """
+    Copy the edit requests of Attendance rows about to be deleted (the
+    delete would cascade to them) into ArchivedEditPermission. ``owners``
+    maps each attendance id to where its row went: ``{"term": ...}`` or
+    ``{"session": ...}``.
+    """
+    ArchivedEditPermission.objects.bulk_create(
+        [
+            ArchivedEditPermission(**owners[values[1]], **dict(zip(PERMISSION_FIELDS, values)))
+            for values in AttendanceEditPermission.objects.filter(attendance_id__in=list(owners)).values_list(
+                *PERMISSION_FIELDS
+            )
+        ],
+        ignore_conflicts=True, batch_size=500,
+    )
+
+
+def _move_chunk(term, rows):
+    if term.storage == ArchivedTerm.FILE:
+        path = Path(term.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending a gzip member per chunk keeps the file readable as one stream
+        with gzip.open(path, "at", encoding="utf-8") as handle:
+            handle.writelines(_serialise(row) + "\n" for row in rows)
+    else:
+        ArchivedAttendance.objects.bulk_create(
+            [ArchivedAttendance(term=term, **dict(zip(ROW_FIELDS, row))) for row in rows],
+            ignore_conflicts=True, batch_size=500,
+        )
+    ids = [row[0] for row in rows]
+    keep_edit_requests(dict.fromkeys(ids, {"term": term}))
+    # The counters keep counting the moved rows; the tallies hold them for rebuilds
+    with counters_frozen():
+        Attendance.objects.filter(attendance_id__in=ids).delete()
+
+
+def archive_term(semester, before=None, storage=ArchivedTerm.TABLE, batch_size=1000, dry_run=False):
+    """
+    Move one semester's Attendance rows dated before ``before`` (default:
+    ATTENDANCE_ARCHIVE_AFTER_DAYS ago) to the archive table or a gzip file
+    under ATTENDANCE_ARCHIVE_DIR, ``batch_size`` rows per transaction, and
+    keep their edit requests in ArchivedEditPermission. An interrupted run
+    is resumed with the cutoff and storage picked the first time. Returns
+    the number of rows moved (or that would be moved with ``dry_run``).
+    """
+    before = before or timezone.now().date() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    term = _resumable().get(semester.pk)
+    if dry_run:
+        if term:
+            return term_rows(semester.pk, term.cutoff).filter(attendance_id__lte=term.max_attendance_id).count()
+        return term_rows(semester.pk, before).count()
+    if term is None:
+        term = _capture(semester, before, storage)
+
+    moved = 0
+    while True:
+        with transaction.atomic(), deferred_refresh():
+            rows = list(
+                term_rows(semester.pk, term.cutoff).filter(attendance_id__lte=term.max_attendance_id)
+                .order_by("attendance_id").values_list(*ROW_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            _move_chunk(term, rows)
+        moved += len(rows)
+
+    term.status = ArchivedTerm.ARCHIVED
+    term.row_count = sum(term.tallies.values_list("total", flat=True))
+    term.completed_at = timezone.now()
+    term.save(update_fields=["status", "row_count", "completed_at"])
+    return moved
+
+
+# ===========================
+# Reading
+# ===========================
+def archived_terms(date_from=None, date_to=None):
+    """Archived terms whose date span overlaps the range; empty when the range is all live."""
+    terms = ArchivedTerm.objects.exclude(first_date__isnull=True)
+    if date_from:
+        terms = terms.filter(last_date__gte=date_from)
+    if date_to:
+        terms = terms.filter(first_date__lte=date_to)
+    return list(terms)
+
+
+def _read_file(term, date_from, date_to, student_ids):
+    seen = set()
+    path = Path(term.path)
+    if not path.exists():
+        return []
+    rows = []
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            values = json.loads(line)
+            # A chunk re-appended after an interrupted run shows up twice
+            if values["attendance_id"] in seen:
+                continue
+            seen.add(values["attendance_id"])
+            values["date"] = date_cls.fromisoformat(values["date"])
+            if date_from and values["date"] < date_from or date_to and values["date"] > date_to:
+                continue
+            if student_ids is not None and values["student_id"] not in student_ids:
+                continue
+            values["marked_at"] = parse_datetime(values["marked_at"]) if values["marked_at"] else None
+            rows.append(ArchivedAttendance(term=term, **values))
+    return rows
+
+
+def archived_attendance(date_from=None, date_to=None, student_ids=None, terms=None):
+    """
+    ArchivedAttendance instances in the range across both storages, with
+    student, course, instructor and timetable loaded. Rows read from files
+    are unsaved instances built from the file.
+    """
+    if terms is None:
+        terms = archived_terms(date_from, date_to)
+    if not terms:
+        return []
+    student_ids = {str(sid) for sid in student_ids} if student_ids is not None else None
+    related = ("student", "course", "instructor", "timetable__course")
+
+    rows = []
+    table_terms = [term.pk for term in terms if term.storage == ArchivedTerm.TABLE]
+    if table_terms:
+        query = ArchivedAttendance.objects.select_related(*related).filter(term_id__in=table_terms)
+        if date_from:
+            query = query.filter(date__gte=date_from)
+        if date_to:
+            query = query.filter(date__lte=date_to)
+        if student_ids is not None:
+            query = query.filter(student_id__in=student_ids)
+        rows.extend(query)
+
+    file_rows = []
+    for term in terms:
+        if term.storage == ArchivedTerm.FILE:
+            file_rows.extend(_read_file(term, date_from, date_to, student_ids))
+    if file_rows:
+        # Attach the related objects in one query per relation rather than per row
+        for field in ("student", "course", "instructor", "timetable"):
+            model = ArchivedAttendance._meta.get_field(field).related_model
+            query = model.objects.select_related("course") if field == "timetable" else model.objects
+            objects = query.in_bulk({getattr(row, f"{field}_id") for row in file_rows} - {None})
+            for row in file_rows:
+                if getattr(row, f"{field}_id") in objects:
+                    setattr(row, field, objects[getattr(row, f"{field}_id")])
+        rows.extend(file_rows)
+    return rows
+
+
+def archive_tallies(student_ids):
+    """{(student_id, course_id): {total, present, late, absent}} captured for archived terms."""
+    tallies = defaultdict(lambda: defaultdict(int))
+    for row in ArchivedAttendanceTally.objects.filter(student_id__in=list(student_ids)).values(
+        "student_id", "course_id", *COUNTER_FIELDS
+    ):
+        tally = tallies[(row["student_id"], row["course_id"])]
+        for field in COUNTER_FIELDS:
+            tally[field] += row[field]
+    return tallies
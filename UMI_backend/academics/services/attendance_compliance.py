@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from academics.models import Attendance, AttendanceCheckIn, SessionAttendance
+from academics.services.class_sessions import day_entries
+from academics.services.self_checkin import CLOSES_AFTER
+from academics.services.session_attendance import roster_ids
+from academics.services.slot_index import get_slot_index, minute_of_day
+from instructors.models import Instructor
+
+COMPLIANCE_TIMEOUT = getattr(settings, "ATTENDANCE_COMPLIANCE_CACHE_TIMEOUT", 60)
+NOT_MARKED = "not_marked"
+NOT_SUBMITTED = "not_submitted"
+SUBMITTED = "submitted"
+
+
+def slot_progress(timetable_ids, day):
+    """
+    {timetable_id: (marks, submitted)} for the slots that have anything on
+    ``day``: Attendance rows, compact sessions and buffered check-ins, one
+    grouped query each. Slots with nothing recorded are absent.
+    """
+    progress = defaultdict(lambda: [0, False])
+    rows = (
+        Attendance.objects.filter(timetable_id__in=timetable_ids, date=day)
+        .values("timetable_id")
+        .annotate(marks=Count("attendance_id"), submitted=Count("attendance_id", filter=Q(is_submitted=True)))
+        .order_by()
+    )
+    for row in rows:
+        progress[row["timetable_id"]][0] += row["marks"]
+        progress[row["timetable_id"]][1] |= row["submitted"] > 0
+    sessions = SessionAttendance.objects.filter(timetable_id__in=timetable_ids, date=day).values_list(
+        "timetable_id", "roster", "is_submitted"
+    )
+    for timetable_id, roster, submitted in sessions:
+        entry = progress[timetable_id]
+        entry[0] = max(entry[0], len(roster_ids(roster)))
+        entry[1] |= submitted
+    checkins = (
+        AttendanceCheckIn.objects.filter(timetable_id__in=timetable_ids, date=day)
+        .values("timetable_id").annotate(n=Count("checkin_id")).order_by()
+    )
+    for row in checkins:
+        progress[row["timetable_id"]][0] += row["n"]
+    return {timetable_id: tuple(entry) for timetable_id, entry in progress.items()}
+
+
+def _overdue(entry, day, now):
+    """The marking window (up to 30 minutes after the slot ends) has closed."""
+    if day != now.date():
+        return day < now.date()
+    return minute_of_day(now) > entry.end_minute + CLOSES_AFTER
+
+
+def compliance_report(day=None, now=None):
+    """
+    Slots scheduled on ``day`` (default today) whose attendance was never
+    submitted, grouped by department and instructor. The schedule comes from
+    the day's generated class sessions (or the in-memory slot index for
+    semesters with none generated that day) and is diffed against a
+    constant number of grouped queries. Cached for
+    ATTENDANCE_COMPLIANCE_CACHE_TIMEOUT seconds.
+    """
+    now = now or timezone.now()
+    day = day or now.date()
+    index = get_slot_index()
+    key = f"academics:attendance-compliance:{day.isoformat()}:v{index.version}"
+    report = cache.get(key)
+    if report is not None:
+        return report
+
+    # Generated class sessions are the schedule of record; the weekly index covers semesters without them
+    slots = day_entries(day, index.day_slots(day.weekday()))
+    progress = slot_progress([slot.timetable_id for slot in slots], day)
+    names = dict(Instructor.objects.filter(pk__in={slot.instructor_id for slot in slots}).values_list("id", "name"))
+
+    totals = {"scheduled": len(slots), SUBMITTED: 0, NOT_SUBMITTED: 0, NOT_MARKED: 0, "overdue": 0}
+    departments = defaultdict(lambda: defaultdict(list))
+    for slot in slots:
+        marks, submitted = progress.get(slot.timetable_id, (0, False))
+        state = SUBMITTED if submitted else NOT_SUBMITTED if marks else NOT_MARKED
+        totals[state] += 1
+        if submitted:
+            continue
+        overdue = _overdue(slot, day, now)
+        totals["overdue"] += overdue
+        departments[slot.department_name or "No Department"][slot.instructor_id].append({
+            'timetable_id': slot.timetable_id,
+            'course_name': slot.course_name,
+            'course_code': slot.course_code,
+            'semester_name': slot.semester_name,
+            'start_time': slot.start_time,
+            'end_time': slot.end_time,
+            'room': slot.room,
+            'status': state,
+            'marked_count': marks,
+            'overdue': overdue,
+        })
+
+    report = {
+        'date': day,
+        'generated_at': now,
+        'totals': totals,
+        'departments': [
+            {
+                'department_name': department,
+                'instructors': [
+                    {
+                        'instructor_id': instructor_id,
+                        'instructor_name': names.get(instructor_id, 'N/A'),
+                        'slots': missing,
+                    }
+                    for instructor_id, missing in sorted(
+                        instructors.items(), key=lambda item: names.get(item[0]) or ''
+                    )
+                ],
+            }
+            for department, instructors in sorted(departments.items())
+        ],
+    }
+    cache.set(key, report, COMPLIANCE_TIMEOUT)
+    return report
+
@@ -0,0 +1,258 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from academics.models import Attendance, AttendanceCounter, CourseAttendanceCounter
+from academics.services.attendance_stats import mark_days_dirty
+from students.models import Student
+
+COUNTER_FIELDS = ("total", "present", "late", "absent")
+STATUS_FIELDS = {
+    Attendance.PRESENT: "present",
+    Attendance.LATE: "late",
+    Attendance.ABSENT: "absent",
+}
+
+_state = threading.local()
+
+
+@contextmanager
+def counters_frozen():
+    """
+    Ignore counter deltas inside the block. Used when rows are moved to
+    another storage that still counts, so deleting them must not decrement.
+    """
+    _state.frozen = getattr(_state, "frozen", 0) + 1
+    try:
+        yield
+    finally:
+        _state.frozen -= 1
+
+
+def status_delta(status, sign=1):
+    """Counter delta for adding (sign=1) or removing (sign=-1) one row with this status."""
+    delta = {"total": sign}
+    field = STATUS_FIELDS.get(status)
+    if field:
+        delta[field] = sign
+    return delta
+
+
+class CounterDeltas:
+    """
+    Accumulates deltas per student and per (student, course) before applying
+    them; ``days`` are the attendance dates touched, for the daily stats buckets.
+    """
+
+    def __init__(self, days=()):
+        self.students = defaultdict(lambda: defaultdict(int))
+        self.courses = defaultdict(lambda: defaultdict(int))
+        self.days = {day for day in days if day}
+
+    def add(self, student_id, course_id, status, sign=1):
+        for field, value in status_delta(status, sign).items():
+            self.students[student_id][field] += value
+            if course_id is not None:
+                self.courses[(student_id, course_id)][field] += value
+
+    def transition(self, student_id, course_id, old_status, new_status):
+        self.add(student_id, course_id, old_status, -1)
+        self.add(student_id, course_id, new_status, 1)
+
+    def __bool__(self):
+        return bool(self.students)
+
+
+def _grouped(deltas):
+    """Group keys sharing an identical non-zero delta so each group is one UPDATE."""
+    groups = defaultdict(list)
+    for key, delta in deltas.items():
+        vector = tuple(delta.get(field, 0) for field in COUNTER_FIELDS)
+        if any(vector):
+            groups[vector].append(key)
+    return groups
+
+
+def _increments(vector):
+    return {field: F(field) + value for field, value in zip(COUNTER_FIELDS, vector) if value}
+
+
+def apply_deltas(deltas, create_missing=True):
+    """
+    Apply accumulated deltas with one UPDATE per distinct delta vector.
+
+    Students (or student+course pairs) without a counter row yet are rebuilt
+    from a recount instead, so counters self-initialise for legacy data. On
+    deletes ``create_missing`` is off: a missing row there means the student
+    or course is being deleted too.
+    """
+    if not deltas or getattr(_state, "frozen", 0):
+        return
+    if deltas.days:
+        mark_days_dirty(deltas.days)
+
+    student_ids = list(deltas.students)
+    known_students = set(
+        AttendanceCounter.objects.filter(student_id__in=student_ids).values_list("student_id", flat=True)
+    )
+    for vector, keys in _grouped(deltas.students).items():
+        keys = [sid for sid in keys if sid in known_students]
+        if keys:
+            AttendanceCounter.objects.filter(student_id__in=keys).update(**_increments(vector))
+
+    known_pairs = set(
+        CourseAttendanceCounter.objects.filter(student_id__in=student_ids).values_list("student_id", "course_id")
+    )
+    pair_groups = _grouped(deltas.courses)
+    for vector, keys in pair_groups.items():
+        keys = [pair for pair in keys if pair in known_pairs]
+        if not keys:
+            continue
+        match = Q()
+        for student_id, course_id in keys:
+            match |= Q(student_id=student_id, course_id=course_id)
+        CourseAttendanceCounter.objects.filter(match).update(**_increments(vector))
+
+    if create_missing:
+        missing_students = [sid for sid in student_ids if sid not in known_students]
+        missing_pairs = [pair for pair in deltas.courses if pair not in known_pairs]
+        if missing_students:
+            rebuild_student_counters(missing_students)
+        if missing_pairs:
+            rebuild_course_counters(missing_pairs)
+
+
+def _counts(queryset, keys):
+    return queryset.values(*keys).annotate(
+        total=Count("attendance_id"),
+        present=Count("attendance_id", filter=Q(status=Attendance.PRESENT)),
+        late=Count("attendance_id", filter=Q(status=Attendance.LATE)),
+        absent=Count("attendance_id", filter=Q(status=Attendance.ABSENT)),
+    ).order_by()
+
+
+def _stored_tallies(student_ids):
+    """Tallies kept outside the Attendance table: compacted sessions and archived terms."""
+    from academics.services.attendance_archive import archive_tallies
+    from academics.services.session_attendance import session_tallies
+
+    tallies = session_tallies(student_ids)
+    for pair, tally in archive_tallies(student_ids).items():
+        for field, value in tally.items():
+            tallies[pair][field] += value
+    return tallies
+
+
+def _with_stored(rows, tallies, key):
+    """Add stored tallies onto aggregated row counts, keyed by ``key(student_id, course_id)``."""
+    merged = {k: {f: row[f] for f in COUNTER_FIELDS} for k, row in rows.items()}
+    for (student_id, course_id), tally in tallies.items():
+        k = key(student_id, course_id)
+        if k is None:
+            continue
+        target = merged.setdefault(k, {f: 0 for f in COUNTER_FIELDS})
+        for f in COUNTER_FIELDS:
+            target[f] += tally.get(f, 0)
+    return merged
+
+
+def rebuild_student_counters(student_ids):
+    """Recount the per-student counters for these students from Attendance, compacted sessions and archived terms."""
+    student_ids = list(Student.objects.filter(student_id__in=student_ids).values_list("student_id", flat=True))
+    rows = {
+        row["student_id"]: row
+        for row in _counts(Attendance.objects.filter(student_id__in=student_ids), ["student_id"])
+    }
+    rows = _with_stored(rows, _stored_tallies(student_ids), lambda student_id, _: student_id)
+    counters = [
+        AttendanceCounter(student_id=sid, **{f: rows.get(sid, {}).get(f, 0) for f in COUNTER_FIELDS})
+        for sid in student_ids
+    ]
+    AttendanceCounter.objects.bulk_create(
+        counters, update_conflicts=True, unique_fields=["student"], update_fields=list(COUNTER_FIELDS), batch_size=500
+    )
+    return counters
+
+
+def rebuild_course_counters(pairs):
+    """Recount the per-course counters for these (student_id, course_id) pairs."""
+    match = Q()
+    for student_id, course_id in pairs:
+        match |= Q(student_id=student_id, course_id=course_id)
+    rows = {
+        (row["student_id"], row["course_id"]): row
+        for row in _counts(Attendance.objects.filter(match), ["student_id", "course_id"])
+    }
+    wanted = set(pairs)
+    rows = _with_stored(
+        rows, _stored_tallies({sid for sid, _ in pairs}),
+        lambda student_id, course_id: (student_id, course_id) if (student_id, course_id) in wanted else None,
+    )
+    counters = [
+        CourseAttendanceCounter(
+            student_id=student_id, course_id=course_id,
+            **{f: rows.get((student_id, course_id), {}).get(f, 0) for f in COUNTER_FIELDS}
+        )
+        for student_id, course_id in pairs
+    ]
+    CourseAttendanceCounter.objects.bulk_create(
+        counters, update_conflicts=True, unique_fields=["student", "course"],
+        update_fields=list(COUNTER_FIELDS), batch_size=500
+    )
+
+
+def rebuild_all_counters(student_ids):
+    """Reconcile both counter tables for a batch of students; returns rows written."""
+    tallies = _stored_tallies(student_ids)
+    student_rows = _with_stored(
+        {row["student_id"]: row for row in _counts(Attendance.objects.filter(student_id__in=student_ids), ["student_id"])},
+        tallies, lambda student_id, _: student_id,
+    )
+    course_rows = _with_stored(
+        {
+            (row["student_id"], row["course_id"]): row
+            for row in _counts(
+                Attendance.objects.filter(student_id__in=student_ids, course__isnull=False),
+                ["student_id", "course_id"],
+            )
+        },
+        tallies, lambda student_id, course_id: (student_id, course_id) if course_id is not None else None,
+    )
+    with transaction.atomic():
+        AttendanceCounter.objects.filter(student_id__in=student_ids).delete()
+        CourseAttendanceCounter.objects.filter(student_id__in=student_ids).delete()
+        per_student = [
+            AttendanceCounter(student_id=sid, **counts) for sid, counts in student_rows.items()
+        ]
+        per_course = [
+            CourseAttendanceCounter(student_id=sid, course_id=course_id, **counts)
+            for (sid, course_id), counts in course_rows.items()
+        ]
+        AttendanceCounter.objects.bulk_create(per_student, batch_size=500)
+        CourseAttendanceCounter.objects.bulk_create(per_course, batch_size=500)
+    return len(per_student) + len(per_course)
+
+
+def attendance_rates(student_ids):
+    """
+    {student_id: attendance percentage} read straight from the counters.
+    Students that have no counter row yet are counted once and backfilled.
+    """
+    student_ids = list(student_ids)
+    counters = {
+        student_id: (total, present)
+        for student_id, total, present in AttendanceCounter.objects.filter(
+            student_id__in=student_ids
+        ).values_list("student_id", "total", "present")
+    }
+    missing = [sid for sid in student_ids if sid not in counters]
+    if missing:
+        for counter in rebuild_student_counters(missing):
+            counters[counter.student_id] = (counter.total, counter.present)
+    return {
+        student_id: round((present / total) * 100, 2) if total else 0.0
+        for student_id, (total, present) in counters.items()
+    }
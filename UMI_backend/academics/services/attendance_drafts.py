@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from academics.models import AttendanceDraftMark
+from academics.services.attendance import VALID_STATUSES, AttendanceWriteResult, normalise_marks
+from academics.services.rosters import semester_roster
+
+DRAFT_TTL = getattr(settings, "ATTENDANCE_DRAFT_TTL", 12 * 60 * 60)
+
+
+def drafts_enabled():
+    """With ATTENDANCE_DRAFTS on, marks stay in the draft table until the slot is submitted."""
+    return getattr(settings, "ATTENDANCE_DRAFTS", False)
+
+
+def get_draft(timetable, date):
+    """
+    {student_id: status} drafted for this slot and date, in the order first
+    drafted. Empty if none, or if the draft was last saved more than
+    DRAFT_TTL seconds ago.
+    """
+    marks = list(
+        AttendanceDraftMark.objects.filter(timetable=timetable, date=date)
+        .order_by("draft_mark_id").values_list("student_id", "status", "updated_at")
+    )
+    if not marks or max(updated_at for _, _, updated_at in marks) < timezone.now() - timedelta(seconds=DRAFT_TTL):
+        return {}
+    return {student_id: status_value for student_id, status_value, _ in marks}
+
+
+def save_draft(marks, *, timetable, date):
+    """
+    Validate marks against the cached semester roster and merge them into
+    the slot's draft with one upsert, so concurrent saves from several
+    processes never drop each other's marks. Nothing is written to
+    Attendance. Returns an ``AttendanceWriteResult`` with the same warnings
+    a real write would give.
+    """
+    result = AttendanceWriteResult()
+    requested = normalise_marks(marks)
+    semester_id = timetable.course.semester_id
+    roster = {entry.student_id: entry for entry in semester_roster(semester_id)}
+
+    draft = get_draft(timetable, date)
+    accepted = {}
+    for student_id, status_value in requested.items():
+        entry = roster.get(student_id)
+        if entry is None:
+            # Unknown ids and students outside the course's semester are both rejected here
+            result.missing.append(student_id)
+            continue
+        if status_value not in VALID_STATUSES:
+            result.invalid.append((student_id, status_value))
+            continue
+        (result.updated if student_id in draft else result.created).append(student_id)
+        accepted[student_id] = status_value
+        result.rows.append({'student_id': student_id, 'student_name': entry.name, 'status': status_value})
+
+    if accepted:
+        now = timezone.now()
+        if not draft:
+            # An expired draft starts over; marks another save just wrote are newer and stay
+            AttendanceDraftMark.objects.filter(
+                timetable=timetable, date=date, updated_at__lt=now - timedelta(seconds=DRAFT_TTL)
+            ).delete()
+        AttendanceDraftMark.objects.bulk_create(
+            [
+                AttendanceDraftMark(timetable=timetable, student_id=student_id, date=date, status=status_value,
+                                    updated_at=now)
+                for student_id, status_value in accepted.items()
+            ],
+            update_conflicts=True, unique_fields=["timetable", "date", "student"],
+            update_fields=["status", "updated_at"],
+        )
+    return result
+
+
+def clear_draft(timetable, date):
+    AttendanceDraftMark.objects.filter(timetable=timetable, date=date).delete()
+
+
+def draft_marks(draft):
+    """The draft as the mark payload ``write_attendance`` expects."""
+    return [{'student_id': student_id, 'status': status_value} for student_id, status_value in draft.items()]
+
+
+def purge_expired_drafts(now=None, batch_size=1000):
+    """
+    Delete drafts last saved more than DRAFT_TTL seconds ago, a slot's
+    draft as a whole (like ``get_draft``), so abandoned slots don't keep
+    their rows until saved again. Returns rows deleted.
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=DRAFT_TTL)
+    live = AttendanceDraftMark.objects.filter(
+        timetable_id=OuterRef("timetable_id"), date=OuterRef("date"), updated_at__gte=cutoff
+    )
+    stale = AttendanceDraftMark.objects.filter(updated_at__lt=cutoff).exclude(Exists(live)).order_by()
+    deleted = 0
+    while True:
+        ids = list(stale.values_list("draft_mark_id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += AttendanceDraftMark.objects.filter(draft_mark_id__in=ids).delete()[0]
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import AttendanceIngestBatch
+from academics.services.attendance import finalize_attendance, normalise_marks, submit_attendance, write_attendance
+from academics.services.student_metrics import deferred_refresh
+
+
+def ingest_enabled():
+    """With ATTENDANCE_INGEST_QUEUE on, mark/submit requests are queued and applied by the worker."""
+    return getattr(settings, "ATTENDANCE_INGEST_QUEUE", False)
+
+
+def _payload(marks):
+    return [{"student_id": sid, "status": value} for sid, value in normalise_marks(marks).items()]
+
+
+def enqueue_marks(marks, *, timetable, instructor, date):
+    payload = _payload(marks)
+    return AttendanceIngestBatch.objects.create(
+        kind=AttendanceIngestBatch.MARK, timetable=timetable, instructor=instructor, date=date, payload=payload
+    )
+
+
+def enqueue_submit(*, timetable, instructor, date, marks=None):
+    """Queue a submit; ``marks`` carries a draft snapshot to be written already submitted."""
+    return AttendanceIngestBatch.objects.create(
+        kind=AttendanceIngestBatch.SUBMIT, timetable=timetable, instructor=instructor, date=date,
+        payload=_payload(marks or []),
+    )
+
+
+def has_queued_marks(timetable, date):
+    return AttendanceIngestBatch.objects.filter(
+        kind=AttendanceIngestBatch.MARK, timetable=timetable, date=date, status=AttendanceIngestBatch.QUEUED
+    ).exists()
+
+
+def _apply(batch):
+    semester = batch.timetable.course.semester
+    if batch.kind == AttendanceIngestBatch.SUBMIT and not batch.payload:
+        return {"submitted": submit_attendance(batch.timetable, batch.date)}
+    if batch.kind == AttendanceIngestBatch.SUBMIT:
+        result, submitted = finalize_attendance(
+            batch.payload, timetable=batch.timetable, instructor=batch.instructor, date=batch.date, semester=semester
+        )
+        return {"submitted": submitted, "warnings": result.warnings(semester.name if semester else None)}
+    result = write_attendance(
+        batch.payload,
+        date=batch.date,
+        instructor=batch.instructor,
+        timetable=batch.timetable,
+        semester=semester,
+    )
+    return {"marked": result.marked_count, "warnings": result.warnings(semester.name if semester else None)}
+
+
+def _in_slot_order(batches):
+    """
+    The claimed batches that may be applied now: a batch waits while an
+    earlier batch for the same (timetable, date) is still queued outside this
+    claim (another worker holds it), so a slot's marks and its submit are
+    always applied in the order they were queued.
+    """
+    if not batches:
+        return []
+    slots = {(batch.timetable_id, batch.date) for batch in batches}
+    claimed = {batch.batch_id for batch in batches}
+    blocked_from = {}
+    earlier = AttendanceIngestBatch.objects.filter(
+        status=AttendanceIngestBatch.QUEUED,
+        timetable_id__in={timetable_id for timetable_id, _ in slots},
+        date__in={day for _, day in slots},
+        batch_id__lt=max(claimed),
+    ).order_by("batch_id").values_list("batch_id", "timetable_id", "date")
+    for batch_id, timetable_id, day in earlier:
+        if batch_id not in claimed:
+            blocked_from.setdefault((timetable_id, day), batch_id)
+    return [
+        batch for batch in batches
+        if batch.batch_id < blocked_from.get((batch.timetable_id, batch.date), batch.batch_id + 1)
+    ]
+
+
+def flush_ingest_queue(batch_size=200):
+    """
+    Apply queued batches oldest first, ``batch_size`` per transaction.
+
+    Rows are claimed with SKIP LOCKED so several workers can drain the queue
+    side by side; a batch is only applied once every earlier batch for its
+    (timetable, date) is applied or in the same claim, so a SUBMIT never
+    overtakes the MARK batches queued before it. Each batch runs in its own
+    savepoint: a failing batch is marked failed without undoing the rest of
+    the chunk. Student metric refreshes are coalesced across the whole
+    chunk. Returns the number of batches processed.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                AttendanceIngestBatch.objects.select_for_update(skip_locked=True, of=("self",))
+                .select_related("timetable__course__semester", "instructor")
+                .filter(status=AttendanceIngestBatch.QUEUED)
+                .order_by("batch_id")[:batch_size]
+            )
+            batches = _in_slot_order(claimed)
+            if not batches:
+                # Nothing claimed, or only slots another worker is still applying
+                return processed
+
+            with deferred_refresh():
+                for batch in batches:
+                    try:
+                        with transaction.atomic():
+                            batch.result = _apply(batch)
+                        batch.status = AttendanceIngestBatch.APPLIED
+                    except Exception as e:
+                        batch.status = AttendanceIngestBatch.FAILED
+                        batch.error = str(e)
+                    batch.applied_at = timezone.now()
+
+            AttendanceIngestBatch.objects.bulk_update(batches, ["status", "result", "error", "applied_at"])
+        processed += len(batches)
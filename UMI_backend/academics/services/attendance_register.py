@@ -0,0 +1,242 @@
+import calendar
+import csv
+import zipfile
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from xml.sax.saxutils import escape
+
+from django.db.models import Count, Max
+
+from academics.models import Attendance, SessionAttendance
+from academics.services.attendance_archive import archived_attendance
+from academics.services.session_attendance import expand
+from students.models import Student
+
+STATUS_LETTERS = {Attendance.PRESENT: "P", Attendance.LATE: "L", Attendance.ABSENT: "A"}
+CHUNK_SIZE = 2000
+
+
+def month_range(year, month):
+    """(first day, last day) of a month; raises ValueError for an invalid year/month."""
+    first = date_cls(int(year), int(month), 1)
+    return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+
+def _student_filter(department_id=None, semester_id=None, prefix=""):
+    filters = {}
+    if department_id:
+        filters[f"{prefix}department_id"] = department_id
+    if semester_id:
+        filters[f"{prefix}semester_id"] = semester_id
+    return filters
+
+
+def stored_marks(first, last, department_id=None, semester_id=None):
+    """
+    {student_id: [(date, status)]} held outside the Attendance table for the
+    month: compacted sessions and archived terms. Bounded by one month.
+    """
+    marks = defaultdict(list)
+    sessions = SessionAttendance.objects.filter(compacted=True, date__gte=first, date__lte=last)
+    if semester_id:
+        sessions = sessions.filter(course__semester_id=semester_id)
+    if department_id:
+        sessions = sessions.filter(course__semester__department_id=department_id)
+    for session in sessions.order_by("date").iterator(chunk_size=200):
+        for student_id, status_value in expand(session).items():
+            marks[student_id].append((session.date, status_value))
+    for row in archived_attendance(first, last):
+        marks[row.student_id].append((row.date, row.status))
+    return marks
+
+
+def month_marks(first, last, department_id=None, semester_id=None):
+    """
+    {student_id: {date: status}} for the month across Attendance rows,
+    compacted sessions and archived terms. With several classes on one day
+    the last one marked is kept.
+    """
+    marks = defaultdict(dict)
+    rows = (
+        Attendance.objects.filter(date__gte=first, date__lte=last,
+                                  **_student_filter(department_id, semester_id, prefix="student__"))
+        .order_by("date", "marked_at").values_list("student_id", "date", "status")
+    )
+    for student_id, day, status_value in rows.iterator(chunk_size=CHUNK_SIZE):
+        marks[student_id][day] = status_value
+    for student_id, entries in stored_marks(first, last, department_id, semester_id).items():
+        for day, status_value in entries:
+            marks[student_id].setdefault(day, status_value)
+    return marks
+
+
+def register_fingerprint(first, last, department_id=None, semester_id=None):
+    """
+    Cheap change marker for a month's register: row count and latest write
+    of the month's Attendance rows and sessions, from two aggregate queries.
+    """
+    rows = Attendance.objects.filter(
+        date__gte=first, date__lte=last, **_student_filter(department_id, semester_id, prefix="student__")
+    ).aggregate(n=Count("attendance_id"), last_write=Max("updated_at"), last_id=Max("attendance_id"))
+    sessions = SessionAttendance.objects.filter(date__gte=first, date__lte=last).aggregate(
+        n=Count("session_id"), last_write=Max("updated_at")
+    )
+    return f"{rows['n']}:{rows['last_id']}:{rows['last_write']}:{sessions['n']}:{sessions['last_write']}"
+
+
+def register_rows(year, month, department_id=None, semester_id=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield the student x date register for a month: a header row, then one
+    row per student with a status cell per day (several classes on one day
+    are joined with "/") and the month's totals.
+
+    Students and their Attendance rows are read through two chunked
+    server-side cursors in the same order, so only the current student's
+    marks are held in memory.
+    """
+    first, last = month_range(year, month)
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    yield ["Student ID", "Name", *[f"{day:%d %a}" for day in days], "Present", "Late", "Absent", "Total", "Percentage"]
+
+    students = (
+        Student.objects.filter(**_student_filter(department_id, semester_id))
+        .order_by("student_id").values_list("student_id", "name")
+    )
+    rows = (
+        Attendance.objects.filter(date__gte=first, date__lte=last,
+                                  **_student_filter(department_id, semester_id, prefix="student__"))
+        .order_by("student_id", "date", "marked_at").values_list("student_id", "date", "status")
+    )
+    stored = stored_marks(first, last, department_id, semester_id)
+
+    pending = iter(rows.iterator(chunk_size=chunk_size))
+    row = next(pending, None)
+    for student_id, name in students.iterator(chunk_size=chunk_size):
+        marks = []
+        # Both cursors are ordered by student_id, so this student's rows are next
+        while row is not None and row[0] == student_id:
+            marks.append(row[1:])
+            row = next(pending, None)
+        marks.extend(stored.get(student_id, ()))
+
+        cells = defaultdict(list)
+        totals = dict.fromkeys(STATUS_LETTERS, 0)
+        for day, status_value in sorted(marks, key=lambda mark: mark[0]):
+            cells[day].append(STATUS_LETTERS.get(status_value, "?"))
+            if status_value in totals:
+                totals[status_value] += 1
+        total = len(marks)
+        present = totals[Attendance.PRESENT]
+        yield [
+            student_id, name, *["/".join(cells.get(day, ())) for day in days],
+            present, totals[Attendance.LATE], totals[Attendance.ABSENT], total,
+            round(present / total * 100, 2) if total else 0,
+        ]
+
+
+# ===========================
+# Encoders
+# ===========================
+class _Echo:
+    """File-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _Chunks:
+    """Unseekable sink for zipfile; written bytes are collected until drained."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(row):
+    cells = []
+    for value in row:
+        if isinstance(value, (int, float)):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def xlsx_stream(rows, sheet_name="Register"):
+    """
+    A single-sheet XLSX workbook written row by row into a zip that is
+    flushed to the response as it grows, using inline strings so no
+    shared-string table has to be held in memory.
+    """
+    sink = _Chunks()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31], {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        yield sink.drain()
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                data = sink.drain()
+                if data:
+                    yield data
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
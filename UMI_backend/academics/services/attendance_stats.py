@@ -0,0 +1,272 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from academics.models import (
+    ArchivedAttendanceTally, Attendance, AttendanceDailyBucket, AttendanceStatsDirtyDay, Department, Semester,
+    SessionAttendance,
+)
+from students.models import Student
+
+STATS_TIMEOUT = getattr(settings, "ATTENDANCE_STATS_CACHE_TIMEOUT", 5 * 60)
+COUNT_FIELDS = ("total", "present", "late", "absent")
+_VERSION_KEY = "academics:attendance-stats:version"
+
+_state = threading.local()
+
+
+# ===========================
+# Invalidation
+# ===========================
+def _version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # Seeded from a timestamp so a flushed cache never reuses old entries
+        version = time.time_ns()
+        cache.add(_VERSION_KEY, version, None)
+        version = cache.get(_VERSION_KEY, version)
+    return version
+
+
+def invalidate_attendance_stats():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, time.time_ns(), None)
+
+
+def _queue_days(days):
+    """Upsert dirty-day marks now; re-marking a queued day refreshes its ``queued_at``."""
+    now = timezone.now()
+    AttendanceStatsDirtyDay.objects.bulk_create(
+        [AttendanceStatsDirtyDay(date=day, queued_at=now) for day in days if day],
+        update_conflicts=True, unique_fields=["date"], update_fields=["queued_at"],
+    )
+
+
+def mark_days_dirty(days):
+    """
+    Queue these attendance dates for re-aggregation and drop the cached
+    stats once the write commits. The days are coalesced per thread and
+    upserted after the commit in one statement of their own, so concurrent
+    attendance writes never hold the shared per-day row lock for the length
+    of their transaction. A mark that lands after a bucket refresh merely
+    re-aggregates the day again.
+    """
+    _pending_days().update(parse_date(day) if isinstance(day, str) else day for day in days)
+    transaction.on_commit(flush_dirty_days)
+
+
+def _pending_days():
+    if not hasattr(_state, "days"):
+        _state.days = set()
+    return _state.days
+
+
+def flush_dirty_days():
+    pending = _pending_days()
+    if not pending:
+        return 0
+    days = list(pending)
+    pending.clear()
+    _queue_days(days)
+    invalidate_attendance_stats()
+    return len(days)
+
+
+# ===========================
+# Daily buckets
+# ===========================
+def _conditional_counts(prefix=""):
+    return {
+        "total": Count(f"{prefix}attendance_id"),
+        "present": Count(f"{prefix}attendance_id", filter=Q(**{f"{prefix}status": Attendance.PRESENT})),
+        "late": Count(f"{prefix}attendance_id", filter=Q(**{f"{prefix}status": Attendance.LATE})),
+        "absent": Count(f"{prefix}attendance_id", filter=Q(**{f"{prefix}status": Attendance.ABSENT})),
+    }
+
+
+def _day_counts(days):
+    """{(date, department_id, semester_id): counts} for these days, live from rows and compacted sessions."""
+    from academics.services.session_attendance import session_counts
+
+    rows = (
+        Attendance.objects.filter(date__in=days)
+        .values("date", department=F("student__department_id"), semester=F("student__semester_id"))
+        .annotate(**_conditional_counts())
+        .order_by()
+    )
+    counts = {
+        (row["date"], row["department"], row["semester"]): {field: row[field] for field in COUNT_FIELDS}
+        for row in rows
+    }
+    # Compacted sessions hold their days' marks without Attendance rows
+    for key, row in session_counts(days).items():
+        target = counts.setdefault(key, dict.fromkeys(COUNT_FIELDS, 0))
+        for field in COUNT_FIELDS:
+            target[field] += row[field]
+    return counts
+
+
+def refresh_buckets(date_from=None, date_to=None):
+    """
+    Re-aggregate the queued days in the range (all queued days by default);
+    returns days refreshed. The dirty-day marks are claimed with SKIP LOCKED,
+    so concurrent refreshes never rewrite the same day's buckets: days
+    another refresh holds are left to it.
+    """
+    queued = AttendanceStatsDirtyDay.objects.all()
+    if date_from:
+        queued = queued.filter(date__gte=date_from)
+    if date_to:
+        queued = queued.filter(date__lte=date_to)
+
+    with transaction.atomic():
+        marks = list(queued.select_for_update(skip_locked=True).values_list("date", "queued_at"))
+        if not marks:
+            return 0
+        days = [day for day, _ in marks]
+        AttendanceDailyBucket.objects.filter(date__in=days).delete()
+        AttendanceDailyBucket.objects.bulk_create(
+            [
+                AttendanceDailyBucket(date=day, department_id=department_id, semester_id=semester_id, **counts)
+                for (day, department_id, semester_id), counts in _day_counts(days).items()
+            ],
+            update_conflicts=True, unique_fields=["date", "department", "semester"],
+            update_fields=list(COUNT_FIELDS), batch_size=500,
+        )
+        # Only clear marks nobody re-queued while this ran
+        matches = Q()
+        for day, queued_at in marks:
+            matches |= Q(date=day, queued_at=queued_at)
+        AttendanceStatsDirtyDay.objects.filter(matches).delete()
+    return len(days)
+
+
+def rebuild_buckets(batch_days=60):
+    """Queue every day that has attendance and re-aggregate them, ``batch_days`` per transaction."""
+    days = sorted(
+        set(Attendance.objects.order_by().values_list("date", flat=True).distinct())
+        | set(SessionAttendance.objects.filter(compacted=True).order_by().values_list("date", flat=True).distinct())
+    )
+    refreshed = 0
+    for i in range(0, len(days), batch_days):
+        chunk = days[i:i + batch_days]
+        _queue_days(chunk)
+        refreshed += refresh_buckets(chunk[0], chunk[-1])
+    return refreshed
+
+
+# ===========================
+# Reading
+# ===========================
+def _grouped_counts(date_from=None, date_to=None):
+    """
+    {(department_id, semester_id): counts}, one GROUP BY over rows or over
+    the daily buckets (plus the queued days still being re-aggregated).
+    """
+    from academics.services.session_attendance import session_counts
+
+    counts = defaultdict(lambda: dict.fromkeys(COUNT_FIELDS, 0))
+    if date_from or date_to:
+        refresh_buckets(date_from, date_to)
+        window = Q()
+        if date_from:
+            window &= Q(date__gte=date_from)
+        if date_to:
+            window &= Q(date__lte=date_to)
+        # Days another request is still re-aggregating are counted live rather than waited for
+        busy = list(AttendanceStatsDirtyDay.objects.filter(window).values_list("date", flat=True))
+        sources = [
+            AttendanceDailyBucket.objects.filter(window).exclude(date__in=busy)
+            .values("department_id", "semester_id").annotate(**{field: Sum(field) for field in COUNT_FIELDS})
+            .order_by()
+        ]
+        if busy:
+            sources.append(
+                dict(row, department_id=department_id, semester_id=semester_id)
+                for (_, department_id, semester_id), row in _day_counts(busy).items()
+            )
+    else:
+        sources = [
+            Attendance.objects.values(
+                department_id=F("student__department_id"), semester_id=F("student__semester_id")
+            ).annotate(**_conditional_counts()).order_by(),
+            # Archived terms count through the rollups captured when they were moved
+            ArchivedAttendanceTally.objects.values(
+                department_id=F("student__department_id"), semester_id=F("student__semester_id")
+            ).annotate(**{field: Sum(field) for field in COUNT_FIELDS}).order_by(),
+        ]
+        # Compacted sessions have no rows left to group
+        sessions = defaultdict(lambda: dict.fromkeys(COUNT_FIELDS, 0))
+        for (_, department_id, semester_id), row in session_counts().items():
+            target = sessions[(department_id, semester_id)]
+            for field in COUNT_FIELDS:
+                target[field] += row[field]
+        sources.append(
+            dict(row, department_id=department_id, semester_id=semester_id)
+            for (department_id, semester_id), row in sessions.items()
+        )
+    for source in sources:
+        for row in source:
+            target = counts[(row["department_id"], row["semester_id"])]
+            for field in COUNT_FIELDS:
+                target[field] += row[field] or 0
+    return counts
+
+
+def department_stats(date_from=None, date_to=None):
+    """
+    The department -> semester attendance statistics of the admin stats
+    page, from a constant number of grouped queries. Cached until the next
+    attendance write; a date window is served from the daily buckets.
+    """
+    key = f"academics:attendance-stats:v{_version()}:{date_from or ''}:{date_to or ''}"
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    counts = _grouped_counts(date_from, date_to)
+    student_counts = {
+        (row["department_id"], row["semester_id"]): row["n"]
+        for row in Student.objects.values("department_id", "semester_id").annotate(n=Count("pk")).order_by()
+    }
+    semesters = defaultdict(list)
+    for semester in Semester.objects.order_by("semester_id").values("semester_id", "name", "semester_code", "department_id"):
+        semesters[semester["department_id"]].append(semester)
+
+    stats = []
+    for dept in Department.objects.order_by("department_id").values("department_id", "name", "code"):
+        dept_stats = {
+            'department_id': dept["department_id"],
+            'department_name': dept["name"],
+            'department_code': dept["code"],
+            'semesters': []
+        }
+        for sem in semesters[dept["department_id"]]:
+            pair = (dept["department_id"], sem["semester_id"])
+            row = counts.get(pair) or dict.fromkeys(COUNT_FIELDS, 0)
+            dept_stats['semesters'].append({
+                'semester_id': sem["semester_id"],
+                'semester_name': sem["name"],
+                'semester_code': sem["semester_code"],
+                'total_students': student_counts.get(pair, 0),
+                'attendance_stats': {
+                    'total_records': row["total"],
+                    'present': row["present"],
+                    'absent': row["absent"],
+                    'late': row["late"],
+                    'attendance_rate': round((row["present"] / row["total"] * 100), 2) if row["total"] > 0 else 0
+                }
+            })
+        stats.append(dept_stats)
+
+    cache.set(key, stats, STATS_TIMEOUT)
+    return stats
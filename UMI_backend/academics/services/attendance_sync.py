@@ -0,0 +1,114 @@
+from datetime import date as date_cls
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from academics.models import AttendanceSyncRecord, Timetable
+from academics.services.attendance import write_attendance
+from academics.services.class_sessions import scheduled_on
+from academics.services.student_metrics import deferred_refresh
+
+
+class SyncBatchError(Exception):
+    """A batch that cannot be applied; reported back without storing a dedup record."""
+
+
+def _parse_date(value):
+    try:
+        return date_cls.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        raise SyncBatchError(f'Invalid date "{value}"')
+
+
+def _timetable_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validate(batch, timetable, instructor, today):
+    if timetable is None:
+        raise SyncBatchError('Timetable not found')
+    if timetable.instructor_id != instructor.pk:
+        raise SyncBatchError('Unauthorized: You can only mark attendance for your assigned classes')
+    day = _parse_date(batch.get('date'))
+    if day > today:
+        raise SyncBatchError('Attendance cannot be synced for a future date')
+    if not scheduled_on(timetable, day):
+        raise SyncBatchError(f'Attendance can only be marked on {timetable.day.title()}')
+    marks = batch.get('marks')
+    if not isinstance(marks, list) or not marks:
+        raise SyncBatchError('marks must be a non-empty list')
+    return day, marks
+
+
+def _apply(key, timetable, instructor, day, marks):
+    semester = timetable.course.semester
+    with transaction.atomic():
+        result = write_attendance(marks, date=day, instructor=instructor, timetable=timetable, semester=semester)
+        response = {
+            'idempotency_key': key,
+            'timetable_id': timetable.timetable_id,
+            'date': day.isoformat(),
+            'status': 'applied',
+            'created': len(result.created),
+            'updated': len(result.updated),
+            'warnings': result.warnings(semester.name if semester else None),
+        }
+        # The dedup record commits with the write, so a batch is either applied and recorded or neither
+        AttendanceSyncRecord.objects.create(
+            instructor=instructor, idempotency_key=key, timetable=timetable, date=day, response=response
+        )
+    return response
+
+
+def sync_batches(batches, instructor):
+    """
+    Apply many offline (timetable, date, marks) batches, each at most once.
+
+    Stored outcomes for every key in the request are loaded with one query,
+    so a retried batch is answered without touching Attendance. New batches
+    are written with ``write_attendance`` and recorded in the same
+    transaction; if a concurrent retry recorded the key first, its stored
+    outcome is returned instead. Returns one result dict per batch, in order.
+    """
+    keys = [str(batch.get('idempotency_key') or '') for batch in batches]
+    stored = {
+        record.idempotency_key: record.response
+        for record in AttendanceSyncRecord.objects.filter(instructor=instructor, idempotency_key__in=keys)
+    }
+    pending_ids = {
+        _timetable_id(batch.get('timetable_id')) for key, batch in zip(keys, batches) if key not in stored
+    } - {None}
+    timetables = Timetable.objects.select_related('course__semester').in_bulk(pending_ids) if pending_ids else {}
+    today = timezone.now().date()
+
+    results = []
+    seen = {}
+    with deferred_refresh():
+        for key, batch in zip(keys, batches):
+            if not key:
+                results.append({'idempotency_key': None, 'status': 'error', 'error': 'idempotency_key is required'})
+                continue
+            if key in stored or key in seen:
+                results.append(dict(stored.get(key) or seen[key], status='replayed'))
+                continue
+            try:
+                timetable = timetables.get(_timetable_id(batch.get('timetable_id')))
+                day, marks = _validate(batch, timetable, instructor, today)
+                response = _apply(key, timetable, instructor, day, marks)
+            except SyncBatchError as e:
+                results.append({'idempotency_key': key, 'status': 'error', 'error': str(e)})
+                continue
+            except IntegrityError:
+                record = AttendanceSyncRecord.objects.filter(instructor=instructor, idempotency_key=key).first()
+                if record is None:
+                    results.append({'idempotency_key': key, 'status': 'error',
+                                    'error': 'Conflicting concurrent write, retry the batch'})
+                else:
+                    results.append(dict(record.response, status='replayed'))
+                continue
+            seen[key] = response
+            results.append(response)
+    return results
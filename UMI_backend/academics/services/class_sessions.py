@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academics.models import ClassSession, ClassSessionSpan, Timetable
+from academics.services.slot_index import WEEKDAYS, SlotEntry, get_slot_index, minute_of_day
+
+SESSION_FIELDS = ["course", "instructor", "weekday", "starts_at", "ends_at", "room"]
+
+
+def _aware(day, value):
+    return timezone.make_aware(datetime.combine(day, value), timezone.get_current_timezone())
+
+
+# ===========================
+# Generating
+# ===========================
+def _timetables(semester_ids=None, timetable_ids=None):
+    timetables = Timetable.objects.filter(day__in=WEEKDAYS)
+    if semester_ids:
+        timetables = timetables.filter(course__semester_id__in=semester_ids)
+    if timetable_ids:
+        timetables = timetables.filter(timetable_id__in=timetable_ids)
+    return list(timetables.order_by().values_list(
+        "timetable_id", "course_id", "instructor_id", "day", "start_time", "end_time", "room", "course__semester_id"
+    ))
+
+
+def generate_class_sessions(date_from, date_to, semester_ids=None, timetable_ids=None, batch_size=1000):
+    """
+    Expand the weekly timetable into one ClassSession per slot occurrence
+    between ``date_from`` and ``date_to`` (inclusive). Existing sessions are
+    updated in place; sessions in the range that no longer match their
+    slot's weekday are removed. Unless only some slots are generated
+    (``timetable_ids``), the range is recorded as a span of every semester
+    covered, so reads use these sessions there and the weekly timetable
+    elsewhere. Returns (sessions written, sessions removed).
+    """
+    slots = _timetables(semester_ids, timetable_ids)
+    by_weekday = defaultdict(list)
+    for slot in slots:
+        by_weekday[WEEKDAYS.index(slot[3])].append(slot)
+
+    sessions = []
+    day = date_from
+    while day <= date_to:
+        for timetable_id, course_id, instructor_id, _, start_time, end_time, room, _ in by_weekday[day.weekday()]:
+            sessions.append(ClassSession(
+                timetable_id=timetable_id, course_id=course_id, instructor_id=instructor_id, date=day,
+                weekday=day.weekday(), starts_at=_aware(day, start_time), ends_at=_aware(day, end_time),
+                room=room,
+            ))
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        current = Q()
+        for weekday, group in by_weekday.items():
+            current |= Q(weekday=weekday, timetable_id__in=[slot[0] for slot in group])
+        stale = ClassSession.objects.filter(date__gte=date_from, date__lte=date_to)
+        if semester_ids or timetable_ids:
+            stale = stale.filter(timetable_id__in=[slot[0] for slot in slots])
+        removed, _ = (stale.exclude(current) if slots else stale).delete()
+        ClassSession.objects.bulk_create(
+            sessions, update_conflicts=True, unique_fields=["timetable", "date"], update_fields=SESSION_FIELDS,
+            batch_size=batch_size,
+        )
+        if not timetable_ids:
+            semesters = set(semester_ids or ()) | {slot[7] for slot in slots if slot[7]}
+            ClassSessionSpan.objects.bulk_create(
+                [ClassSessionSpan(semester_id=semester_id, date_from=date_from, date_to=date_to)
+                 for semester_id in semesters],
+                ignore_conflicts=True,
+            )
+    return len(sessions), removed
+
+
+def regenerate_timetable(timetable_id):
+    """
+    Bring one slot's upcoming sessions in line after it was edited, over the
+    rest of each generated span of its semester. Past sessions are kept as
+    they were held.
+    """
+    today = timezone.now().date()
+    spans = ClassSessionSpan.objects.filter(
+        semester__courses__timetables=timetable_id, date_to__gte=today
+    ).values_list("date_from", "date_to")
+    written = removed = 0
+    for date_from, date_to in spans:
+        counts = generate_class_sessions(max(date_from, today), date_to, timetable_ids=[timetable_id])
+        written, removed = written + counts[0], removed + counts[1]
+    return written, removed
+
+
+# ===========================
+# Reading
+# ===========================
+def generated_semesters(day, semester_ids=None):
+    """
+    The ids of the semesters (among ``semester_ids``) with a generated span
+    covering ``day``: their sessions (possibly none) are the schedule, the
+    others fall back to the weekly timetable.
+    """
+    spans = ClassSessionSpan.objects.filter(date_from__lte=day, date_to__gte=day)
+    if semester_ids is not None:
+        spans = spans.filter(semester_id__in=semester_ids)
+    return set(spans.values_list("semester_id", flat=True))
+
+
+def sessions_generated(timetable, day):
+    """Whether ``day`` lies within a generated span of ``timetable``'s semester."""
+    return ClassSessionSpan.objects.filter(
+        semester__courses__timetables=timetable, date_from__lte=day, date_to__gte=day
+    ).exists()
+
+
+def open_sessions(now=None, instructor_id=None, before=0, after=0):
+    """Sessions running at ``now``, widened by ``before``/``after`` minutes: one indexed range lookup."""
+    now = now or timezone.now()
+    sessions = ClassSession.objects.filter(
+        starts_at__lte=now + timedelta(minutes=before), ends_at__gte=now - timedelta(minutes=after)
+    )
+    if instructor_id is not None:
+        sessions = sessions.filter(instructor_id=instructor_id)
+    return sessions
+
+
+def marking_open(timetable, now=None, before=0, after=0):
+    """
+    Whether ``timetable`` may be marked at ``now``: its generated session
+    for the day if there is one, otherwise its weekly day and times.
+    """
+    now = now or timezone.now()
+    if sessions_generated(timetable, now.date()):
+        return open_sessions(now, before=before, after=after).filter(timetable=timetable).exists()
+    if timetable.day not in WEEKDAYS or WEEKDAYS.index(timetable.day) != now.weekday():
+        return False
+    minute = minute_of_day(now)
+    return minute_of_day(timetable.start_time) - before <= minute <= minute_of_day(timetable.end_time) + after
+
+
+def scheduled_on(timetable, day):
+    """Whether ``timetable`` meets on ``day``, from its semester's generated sessions when it has any then."""
+    if sessions_generated(timetable, day):
+        return ClassSession.objects.filter(timetable=timetable, date=day).exists()
+    return timetable.day in WEEKDAYS and WEEKDAYS.index(timetable.day) == day.weekday()
+
+
+def _session_entries(sessions):
+    """Slot index entries for these sessions, with course, semester and department joined in."""
+    rows = sessions.values_list(
+        "timetable_id", "instructor_id", "course_id", "course__name", "course__code",
+        "course__semester_id", "course__semester__name", "course__semester__department__name",
+        "weekday", "starts_at", "ends_at", "room",
+    )
+    entries = []
+    for (timetable_id, instructor_id, course_id, course_name, course_code, semester_id, semester_name,
+         department_name, weekday, starts_at, ends_at, room) in rows:
+        start_time = timezone.localtime(starts_at).time()
+        end_time = timezone.localtime(ends_at).time()
+        entries.append(SlotEntry(
+            timetable_id, instructor_id, course_id, course_name, course_code, semester_id, semester_name,
+            department_name, weekday, start_time, end_time, minute_of_day(start_time), minute_of_day(end_time),
+            room,
+        ))
+    return entries
+
+
+def day_entries(day, weekly, instructor_id=None):
+    """
+    The day's schedule as slot index entries ordered by start: generated
+    sessions for the semesters whose span covers ``day`` (only
+    ``instructor_id``'s when given), and the ``weekly`` index entries of
+    every other semester.
+    """
+    generated = generated_semesters(day)
+    entries = [entry for entry in weekly if entry.semester_id not in generated]
+    if not generated:
+        return entries
+    sessions = ClassSession.objects.filter(date=day, course__semester_id__in=generated)
+    if instructor_id is not None:
+        sessions = sessions.filter(instructor_id=instructor_id)
+    entries += _session_entries(sessions)
+    return sorted(entries, key=lambda entry: (entry.start_minute, entry.timetable_id))
+
+
+def open_entries(now=None, instructor_id=None, before=0, after=0):
+    """
+    Slot index entries open at ``now`` (widened by ``before``/``after``
+    minutes): the running generated sessions for semesters with a span
+    covering today, the weekly index's active slots for the rest.
+    """
+    now = now or timezone.now()
+    generated = generated_semesters(now.date())
+    entries = [
+        entry for entry in get_slot_index().active(now.weekday(), minute_of_day(now), instructor_id=instructor_id,
+                                                   before=before, after=after)
+        if entry.semester_id not in generated
+    ]
+    if not generated:
+        return entries
+    entries += _session_entries(
+        open_sessions(now, instructor_id=instructor_id, before=before, after=after)
+        .filter(date=now.date(), course__semester_id__in=generated)
+    )
+    return sorted(entries, key=lambda entry: (entry.start_minute, entry.timetable_id))
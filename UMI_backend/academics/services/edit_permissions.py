@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from academics.models import Attendance, AttendanceEditPermission
+from academics.services.admin_attendance import InvalidCursor
+from academics.services.attendance import VALID_STATUSES
+from academics.services.attendance_counters import CounterDeltas, apply_deltas
+from academics.services.student_metrics import mark_students_dirty
+
+REVIEW_ACTIONS = {"approve": "approved", "reject": "rejected"}
+QUEUE_RELATED = ("instructor__user", "attendance__student", "attendance__course", "attendance__timetable")
+
+
+def pending_request():
+    """Exists() annotation: the outer Attendance row has a pending edit request."""
+    return Exists(AttendanceEditPermission.objects.filter(attendance=OuterRef("pk"), status="pending"))
+
+
+# ===========================
+# Admin queue
+# ===========================
+def _encode_cursor(permission):
+    values = [permission.requested_at.isoformat(), permission.permission_id]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        requested_at, permission_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        requested_at = parse_datetime(requested_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if requested_at is None or not isinstance(permission_id, int):
+        raise InvalidCursor("Invalid cursor")
+    return requested_at, permission_id
+
+
+def permission_queue(status_filter=None):
+    permissions = AttendanceEditPermission.objects.select_related(*QUEUE_RELATED)
+    if status_filter:
+        permissions = permissions.filter(status=status_filter)
+    return permissions
+
+
+def permission_page(permissions, cursor=None, page_size=100):
+    """
+    One keyset page of edit requests, newest first, with the instructor,
+    student, course and slot joined in. Returns (permissions, next cursor or None).
+    """
+    if cursor:
+        requested_at, permission_id = _decode_cursor(cursor)
+        permissions = permissions.filter(
+            Q(requested_at__lt=requested_at) | Q(requested_at=requested_at, permission_id__lt=permission_id)
+        )
+    page = list(permissions.order_by("-requested_at", "-permission_id")[: page_size + 1])
+    next_cursor = _encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def queue_entry(perm):
+    attendance = perm.attendance
+    course, timetable, user = attendance.course, attendance.timetable, perm.instructor.user
+    return {
+        'id': perm.permission_id,
+        'instructor': {
+            'id': perm.instructor.id,
+            'name': perm.instructor.name,
+            'email': user.email if user else 'N/A'
+        },
+        'student': {
+            'id': attendance.student.student_id,
+            'name': attendance.student.name
+        },
+        'course': {
+            'id': course.course_id if course else 'N/A',
+            'name': course.name if course else 'General',
+            'code': course.code if course else 'N/A'
+        },
+        'timetable': {
+            'day': timetable.day if timetable else 'N/A',
+            'time': f"{timetable.start_time} - {timetable.end_time}" if timetable else 'N/A',
+            'room': timetable.room if timetable else 'N/A'
+        },
+        'attendance_id': attendance.attendance_id,
+        'date': attendance.date,
+        'current_status': attendance.status,
+        'proposed_status': perm.proposed_status,
+        'reason': perm.reason,
+        'requested_at': perm.requested_at,
+        'reviewed_at': perm.reviewed_at,
+        'admin_notes': perm.admin_notes,
+        'status': perm.status
+    }
+
+
+# ===========================
+# Bulk review
+# ===========================
+def review_permissions(permission_ids, action, reviewer=None, admin_notes=""):
+    """
+    Approve or reject pending edit requests in one transaction with a
+    handful of set-based UPDATEs. Approving applies each request's
+    ``proposed_status`` (the latest request wins when one record has
+    several) and opens the record for editing. The UPDATEs bypass the
+    Attendance signals, so counter deltas, dirty stats days and student
+    metric refreshes are applied here. Returns (reviewed ids, skipped ids);
+    ids that are unknown or no longer pending are skipped.
+    """
+    if action not in REVIEW_ACTIONS:
+        raise ValueError("Invalid action")
+    permission_ids = {int(pid) for pid in permission_ids}
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(
+            AttendanceEditPermission.objects.select_for_update()
+            .filter(permission_id__in=permission_ids, status="pending")
+            .order_by("requested_at", "permission_id")
+            .values_list("permission_id", "attendance_id", "proposed_status")
+        )
+        reviewed = [row[0] for row in rows]
+        AttendanceEditPermission.objects.filter(permission_id__in=reviewed).update(
+            status=REVIEW_ACTIONS[action], reviewed_by=reviewer, reviewed_at=now, admin_notes=admin_notes
+        )
+        if action == "approve" and rows:
+            _apply_approvals(rows, now)
+
+    return sorted(reviewed), sorted(permission_ids - set(reviewed))
+
+
+def _apply_approvals(rows, now):
+    proposed = {}
+    for _, attendance_id, proposed_status in rows:
+        if proposed_status in VALID_STATUSES:
+            proposed[attendance_id] = proposed_status
+        else:
+            proposed.setdefault(attendance_id, None)
+
+    records = Attendance.objects.select_for_update().filter(attendance_id__in=list(proposed)).values_list(
+        "attendance_id", "student_id", "course_id", "date", "status"
+    )
+    deltas = CounterDeltas()
+    by_status = defaultdict(list)
+    for attendance_id, student_id, course_id, day, old_status in records:
+        new_status = proposed[attendance_id]
+        if new_status and new_status != old_status:
+            deltas.transition(student_id, course_id, old_status, new_status)
+            deltas.days.add(day)
+            by_status[new_status].append(attendance_id)
+
+    Attendance.objects.filter(attendance_id__in=list(proposed)).update(
+        admin_approved_edit=True, can_edit=True, updated_at=now
+    )
+    for new_status, attendance_ids in by_status.items():
+        Attendance.objects.filter(attendance_id__in=attendance_ids).update(status=new_status)
+    apply_deltas(deltas)
+    mark_students_dirty(list(deltas.students))
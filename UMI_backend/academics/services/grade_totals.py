@@ -0,0 +1,292 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+
+from academics.models import Course, GradeTotals, Result, SemesterGradeTotals
+from academics.services.grading import active_scheme, percentage
+from students.models import Student
+
+TOTAL_FIELDS = ("grade_points", "result_count", "credit_points", "credits")
+
+
+def grade_points_expression():
+    """The active scheme's grade points per Result row, for set-based recounts."""
+    return active_scheme().points_expression()
+
+
+def result_state(instance):
+    """
+    (student_id, course_id, percentage) of a Result as loaded or saved. The
+    percentage is turned into points when the deltas are resolved, so
+    loading a Result never has to consult the grading scheme.
+    """
+    values = instance.__dict__
+    return values.get("student_id"), values.get("course_id"), percentage(
+        values.get("obtained_marks"), values.get("total_marks")
+    )
+
+
+class GradeDeltas:
+    """Accumulates running-sum deltas per student and per (student, semester)."""
+
+    def __init__(self):
+        self.states = []  # (student_id, course_id, percentage, sign)
+
+    def add(self, student_id, course_id, share, sign=1):
+        if student_id:
+            self.states.append((student_id, course_id, share, sign))
+
+    def transition(self, old_state, new_state):
+        if old_state is not None:
+            self.add(*old_state, sign=-1)
+        self.add(*new_state, sign=1)
+
+    def __bool__(self):
+        return bool(self.states)
+
+    def resolve(self):
+        """Turn the queued states into ({student_id: delta}, {(student_id, semester_id): delta})."""
+        course_ids = {course_id for _, course_id, _, _ in self.states if course_id}
+        courses = {
+            pk: (semester_id, credits)
+            for pk, semester_id, credits in Course.objects.filter(pk__in=course_ids).values_list(
+                "pk", "semester_id", "credits"
+            )
+        }
+        points_of = active_scheme().points_many([share for _, _, share, _ in self.states])
+        students = defaultdict(lambda: defaultdict(float))
+        semesters = defaultdict(lambda: defaultdict(float))
+        for (student_id, course_id, _, sign), points in zip(self.states, points_of):
+            semester_id, credits = courses.get(course_id, (None, 0))
+            delta = {
+                "grade_points": sign * points,
+                "result_count": sign,
+                "credit_points": sign * points * credits,
+                "credits": sign * credits,
+            }
+            for field, value in delta.items():
+                students[student_id][field] += value
+                if semester_id is not None:
+                    semesters[(student_id, semester_id)][field] += value
+        return students, semesters
+
+
+def _grouped(deltas):
+    groups = defaultdict(list)
+    for key, delta in deltas.items():
+        vector = tuple(delta.get(field, 0) for field in TOTAL_FIELDS)
+        if any(vector):
+            groups[vector].append(key)
+    return groups
+
+
+def _pairs_match(pairs, semester_field="semester_id"):
+    """(student_id, semester_id) pairs as one OR term per semester, so large batches stay shallow SQL."""
+    by_semester = defaultdict(list)
+    for student_id, semester_id in pairs:
+        by_semester[semester_id].append(student_id)
+    match = Q()
+    for semester_id, student_ids in by_semester.items():
+        match |= Q(student_id__in=student_ids, **{semester_field: semester_id})
+    return match
+
+
+def _increments(vector):
+    return {field: F(field) + value for field, value in zip(TOTAL_FIELDS, vector) if value}
+
+
+def apply_grade_deltas(deltas, create_missing=True):
+    """
+    Apply accumulated deltas with one UPDATE per distinct delta vector, the same
+    way the attendance counters are maintained. Students or semesters without a
+    totals row yet are rebuilt from a recount of their results instead.
+    """
+    if not deltas:
+        return
+    students, semesters = deltas.resolve()
+    student_ids = list(students)
+
+    known_students = set(
+        GradeTotals.objects.filter(student_id__in=student_ids).values_list("student_id", flat=True)
+    )
+    for vector, keys in _grouped(students).items():
+        keys = [sid for sid in keys if sid in known_students]
+        if keys:
+            GradeTotals.objects.filter(student_id__in=keys).update(**_increments(vector))
+
+    known_pairs = set(
+        SemesterGradeTotals.objects.filter(student_id__in=student_ids).values_list("student_id", "semester_id")
+    )
+    for vector, keys in _grouped(semesters).items():
+        keys = [pair for pair in keys if pair in known_pairs]
+        if not keys:
+            continue
+        SemesterGradeTotals.objects.filter(_pairs_match(keys)).update(**_increments(vector))
+
+    if create_missing:
+        missing_students = [sid for sid in student_ids if sid not in known_students]
+        missing_pairs = [pair for pair in semesters if pair not in known_pairs]
+        if missing_students:
+            rebuild_student_totals(missing_students)
+        if missing_pairs:
+            rebuild_semester_totals(missing_pairs)
+
+
+def _sums(queryset, keys):
+    points = grade_points_expression()
+    credits = F("course__credits")
+    return queryset.values(*keys).annotate(
+        grade_points=Sum(points),
+        result_count=Count("result_id"),
+        credit_points=Sum(points * credits, output_field=FloatField()),
+        credits=Sum(credits),
+    ).order_by()
+
+
+def _totals_from(row):
+    row = row or {}
+    return {field: row.get(field) or 0 for field in TOTAL_FIELDS}
+
+
+def recount_totals(student_ids):
+    """Full recompute from Result: ({student_id: sums}, {(student_id, semester_id): sums})."""
+    results = Result.objects.filter(student_id__in=student_ids)
+    per_student = {row["student_id"]: _totals_from(row) for row in _sums(results, ["student_id"])}
+    per_semester = {
+        (row["student_id"], row["course__semester_id"]): _totals_from(row)
+        for row in _sums(results.filter(course__isnull=False), ["student_id", "course__semester_id"])
+    }
+    return per_student, per_semester
+
+
+def rebuild_student_totals(student_ids):
+    """Recount the per-student totals for these students from Result."""
+    student_ids = list(Student.objects.filter(student_id__in=student_ids).values_list("student_id", flat=True))
+    rows = {row["student_id"]: row for row in _sums(Result.objects.filter(student_id__in=student_ids), ["student_id"])}
+    totals = [GradeTotals(student_id=sid, **_totals_from(rows.get(sid))) for sid in student_ids]
+    GradeTotals.objects.bulk_create(
+        totals, update_conflicts=True, unique_fields=["student"], update_fields=list(TOTAL_FIELDS), batch_size=500
+    )
+    return totals
+
+
+def rebuild_semester_totals(pairs):
+    """Recount the per-semester totals for these (student_id, semester_id) pairs."""
+    existing = set(
+        Student.objects.filter(student_id__in={sid for sid, _ in pairs}).values_list("student_id", flat=True)
+    )
+    pairs = [pair for pair in pairs if pair[0] in existing]
+    if not pairs:
+        return []
+    results = Result.objects.filter(_pairs_match(pairs, "course__semester_id"))
+    rows = {
+        (row["student_id"], row["course__semester_id"]): row
+        for row in _sums(results, ["student_id", "course__semester_id"])
+    }
+    totals = [
+        SemesterGradeTotals(student_id=student_id, semester_id=semester_id, **_totals_from(rows.get((student_id, semester_id))))
+        for student_id, semester_id in pairs
+    ]
+    SemesterGradeTotals.objects.bulk_create(
+        totals, update_conflicts=True, unique_fields=["student", "semester"],
+        update_fields=list(TOTAL_FIELDS), batch_size=500
+    )
+    return totals
+
+
+def rebuild_all_totals(student_ids):
+    """Reconcile both totals tables for a batch of students; returns rows written."""
+    per_student, per_semester = recount_totals(student_ids)
+    with transaction.atomic():
+        GradeTotals.objects.filter(student_id__in=student_ids).delete()
+        SemesterGradeTotals.objects.filter(student_id__in=student_ids).delete()
+        GradeTotals.objects.bulk_create(
+            [GradeTotals(student_id=sid, **sums) for sid, sums in per_student.items()], batch_size=500
+        )
+        SemesterGradeTotals.objects.bulk_create(
+            [
+                SemesterGradeTotals(student_id=sid, semester_id=semester_id, **sums)
+                for (sid, semester_id), sums in per_semester.items()
+            ],
+            batch_size=500,
+        )
+    return len(per_student) + len(per_semester)
+
+
+def regrade_results(student_ids):
+    """
+    Bring these students' Result grades and totals in line with the active
+    grading scheme: one UPDATE rewrites the letters that changed, then the
+    totals are rebuilt from a recount. Returns the number of results regraded.
+    """
+    expression = active_scheme().grade_expression()
+    with transaction.atomic():
+        regraded = Result.objects.filter(student_id__in=student_ids).exclude(grade=expression).update(
+            grade=expression
+        )
+        rebuild_all_totals(student_ids)
+    return regraded
+
+
+def student_gpas(student_ids):
+    """{student_id: gpa} read from the running totals; missing rows are backfilled once."""
+    student_ids = list(student_ids)
+    totals = {t.student_id: t for t in GradeTotals.objects.filter(student_id__in=student_ids)}
+    missing = [sid for sid in student_ids if sid not in totals]
+    if missing:
+        for t in rebuild_student_totals(missing):
+            totals[t.student_id] = t
+    return {student_id: t.gpa for student_id, t in totals.items()}
+
+
+def student_totals(student_id):
+    """The running totals for one student, backfilled if missing."""
+    totals = GradeTotals.objects.filter(student_id=student_id).first()
+    if totals is None:
+        rebuilt = rebuild_student_totals([student_id])
+        totals = rebuilt[0] if rebuilt else None
+    return totals
+
+
+def semester_totals(student_id, semester_id):
+    """The running totals for one student in one semester, backfilled if missing."""
+    totals = SemesterGradeTotals.objects.filter(student_id=student_id, semester_id=semester_id).first()
+    if totals is None:
+        rebuilt = rebuild_semester_totals([(student_id, semester_id)])
+        totals = rebuilt[0] if rebuilt else None
+    return totals
+
+
+def verify_totals(student_ids, tolerance=1e-6):
+    """
+    Compare the stored running totals with a full recompute. Returns a list of
+    (student_id, semester_id or None, stored sums, expected sums) mismatches.
+    """
+    expected_students, expected_semesters = recount_totals(student_ids)
+    stored_students = {
+        row["student_id"]: _totals_from(row)
+        for row in GradeTotals.objects.filter(student_id__in=student_ids).values("student_id", *TOTAL_FIELDS)
+    }
+    stored_semesters = {
+        (row["student_id"], row["semester_id"]): _totals_from(row)
+        for row in SemesterGradeTotals.objects.filter(student_id__in=student_ids).values(
+            "student_id", "semester_id", *TOTAL_FIELDS
+        )
+    }
+    empty = _totals_from(None)
+
+    def differs(a, b):
+        return any(abs(a[field] - b[field]) > tolerance for field in TOTAL_FIELDS)
+
+    # Rows that do not exist yet are backfilled from a recount on first read, so only stored rows are checked
+    mismatches = []
+    for sid, stored in stored_students.items():
+        expected = expected_students.get(sid, empty)
+        if differs(stored, expected):
+            mismatches.append((sid, None, stored, expected))
+    for (sid, semester_id), stored in stored_semesters.items():
+        expected = expected_semesters.get((sid, semester_id), empty)
+        if differs(stored, expected):
+            mismatches.append((sid, semester_id, stored, expected))
+    return mismatches
@@ -0,0 +1,109 @@
+from django.db.models import FilteredRelation, Q
+
+from academics.models import Timetable
+from academics.services.marks_import import MARK_LIMITS, MarksRow, save_marks, validate_rows
+from students.models import Student
+
+# Gradebook columns: every component of a course's Final result, which grades the course out of 100
+COMPONENTS = (
+    ("quiz1_marks", "Quiz 1"),
+    ("quiz2_marks", "Quiz 2"),
+    ("assignment1_marks", "Assignment 1"),
+    ("assignment2_marks", "Assignment 2"),
+    ("mid_term_marks", "Mid Term"),
+    ("final_marks", "Final"),
+)
+GRADEBOOK_EXAM_TYPE = "Final"
+
+
+class GradebookError(ValueError):
+    pass
+
+
+def teaches(instructor, course):
+    return Timetable.objects.filter(instructor=instructor, course=course).exists()
+
+
+def gradebook(course):
+    """
+    The course's students x components matrix: every student on the course
+    roster (enrolled in the course or its semester) with their Final result
+    for the course, read with one LEFT JOIN. Students without a result have
+    empty cells.
+    """
+    enrolled = Q(courses=course)
+    if course.semester_id:
+        enrolled |= Q(semester_id=course.semester_id)
+    roster = Student.objects.filter(
+        pk__in=Student.objects.filter(enrolled).values("pk")
+    ).annotate(
+        gradebook_result=FilteredRelation(
+            "results", condition=Q(results__course=course, results__exam_type__iexact=GRADEBOOK_EXAM_TYPE)
+        )
+    )
+    fields = [f"gradebook_result__{field}" for field, _ in COMPONENTS]
+    rows = roster.order_by("name", "student_id", "gradebook_result__result_id").values_list(
+        "student_id", "name", "gradebook_result__result_id", "gradebook_result__obtained_marks",
+        "gradebook_result__grade", *fields,
+    )
+
+    students = {}
+    for student_id, name, result_id, obtained, grade, *cells in rows:
+        # With several Final results for the course the newest one wins, as in the import
+        students[student_id] = {
+            'student_id': student_id,
+            'name': name,
+            'result_id': result_id,
+            'cells': cells if result_id else [None] * len(COMPONENTS),
+            'obtained_marks': obtained,
+            'grade': grade,
+        }
+    return {
+        'course': {'id': course.course_id, 'code': course.code, 'name': course.name},
+        'exam_type': GRADEBOOK_EXAM_TYPE,
+        'components': [
+            {'key': field, 'label': label, 'max_marks': MARK_LIMITS[field]} for field, label in COMPONENTS
+        ],
+        'students': list(students.values()),
+    }
+
+
+def _cell_marks(cells):
+    """{student_id: {component: mark}} from a sparse list of edited cells."""
+    edits = {}
+    for index, cell in enumerate(cells):
+        if not isinstance(cell, dict):
+            raise GradebookError(f"Cell {index} must be an object")
+        student_id, component, value = cell.get("student_id"), cell.get("component"), cell.get("value")
+        if not student_id or component not in MARK_LIMITS:
+            raise GradebookError(f"Cell {index} needs a student_id and one of {', '.join(MARK_LIMITS)}")
+        try:
+            value = float(value if value is not None else 0)
+        except (TypeError, ValueError):
+            raise GradebookError(f"Cell {index}: {component} must be a number")
+        if not 0 <= value <= MARK_LIMITS[component]:
+            raise GradebookError(f"Cell {index}: {component} must be between 0 and {MARK_LIMITS[component]}")
+        edits.setdefault(str(student_id), {})[component] = value
+    return edits
+
+
+def save_gradebook(course, cells, instructor=None):
+    """
+    Apply a sparse diff of edited cells (``{student_id, component, value}``;
+    a null value clears the cell to 0) to the course's Final results in one
+    transaction through the bulk marks writer. Cells not in the diff keep
+    their stored marks. Returns (created, updated) counts; raises
+    GradebookError listing every student that is not on the roster.
+    """
+    edits = _cell_marks(cells)
+    if not edits:
+        return 0, 0
+    rows = [
+        MarksRow(index, student_id, str(course.course_id), GRADEBOOK_EXAM_TYPE, None, marks)
+        for index, (student_id, marks) in enumerate(edits.items())
+    ]
+    valid, errors = validate_rows(rows, instructor)
+    if errors:
+        raise GradebookError("; ".join(error['error'] for error in errors))
+    created, updated = save_marks(valid)
+    return len(created), len(updated)
@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, F, FloatField, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+
+from academics.models import GradingScheme
+
+VERSION_KEY = "academics:grading-scheme:version"
+FAIL_GRADE = ("F", 0.0)  # awarded below the lowest band of a scheme
+
+# (grade, minimum percentage, grade points): the letters Result.save has always
+# assigned, with the points the GPA totals have always counted
+DEFAULT_BANDS = (
+    ("A+", 90, 4.0), ("A", 85, 4.0), ("A-", 80, 3.5),
+    ("B+", 75, 3.5), ("B", 70, 3.0), ("B-", 65, 3.0),
+    ("C+", 60, 2.5), ("C", 55, 2.5), ("C-", 50, 2.0),
+    ("D+", 45, 0.0), ("D", 40, 0.0), ("F", 0, 0.0),
+)
+
+_lock = threading.Lock()
+_scheme = None
+
+
+def percentage(obtained, total):
+    """obtained / total as a percentage; computed as obtained * 100 / total, the same operations the SQL uses."""
+    if not total or obtained is None:
+        return 0.0
+    return obtained * 100 / total
+
+
+class CompiledScheme:
+    """
+    A grading scheme compiled into parallel arrays sorted by threshold.
+    ``grades[i]``/``points[i]`` apply from ``thresholds[i - 1]`` up to
+    ``thresholds[i]``; index 0 is the fail grade below the lowest band, so
+    a lookup is a single ``bisect_right``.
+    """
+
+    def __init__(self, bands, scheme_id=None, name="Default", version=0):
+        ordered = sorted(bands, key=lambda band: band[1])
+        self.scheme_id = scheme_id
+        self.name = name
+        self.version = version
+        self.built_at = time.monotonic()
+        self.thresholds = [float(minimum) for _, minimum, _ in ordered]
+        self.grades = [FAIL_GRADE[0]] + [grade for grade, _, _ in ordered]
+        self.points = [FAIL_GRADE[1]] + [float(points) for _, _, points in ordered]
+        self.points_by_grade = {grade: points for grade, points in zip(self.grades, self.points)}
+
+    def grade(self, value):
+        return self.grades[bisect_right(self.thresholds, value)]
+
+    def grade_points(self, value):
+        return self.points[bisect_right(self.thresholds, value)]
+
+    def grade_many(self, values):
+        """Letter grades for a whole sequence of percentages."""
+        thresholds, grades = self.thresholds, self.grades
+        return [grades[bisect_right(thresholds, value)] for value in values]
+
+    def points_many(self, values):
+        """Grade points for a whole sequence of percentages."""
+        thresholds, points = self.thresholds, self.points
+        return [points[bisect_right(thresholds, value)] for value in values]
+
+    def points_for_grade(self, grade):
+        """Points for a stored letter grade; unknown letters count as a fail."""
+        return self.points_by_grade.get((grade or "").strip().upper(), FAIL_GRADE[1])
+
+    # ---------- database-side equivalents ----------
+    def _expression(self, table, output_field):
+        share = F("obtained_marks") * 100 / F("total_marks")
+        return Case(
+            When(total_marks=0, then=Value(table[bisect_right(self.thresholds, 0.0)])),
+            *[
+                When(GreaterThanOrEqual(share, threshold), then=Value(table[i + 1]))
+                for i, threshold in reversed(list(enumerate(self.thresholds)))
+            ],
+            default=Value(table[0]),
+            output_field=output_field,
+        )
+
+    def grade_expression(self):
+        """The letter grade of each Result row, for set-based regrades."""
+        return self._expression(self.grades, CharField())
+
+    def points_expression(self):
+        """The grade points of each Result row, for set-based recounts."""
+        return self._expression(self.points, FloatField())
+
+
+def _load_scheme(version):
+    scheme = GradingScheme.objects.filter(is_active=True).prefetch_related("bands").first()
+    if scheme is None or not scheme.bands.all():
+        return CompiledScheme(DEFAULT_BANDS, version=version)
+    bands = [(band.grade, band.min_percentage, band.points) for band in scheme.bands.all()]
+    return CompiledScheme(bands, scheme_id=scheme.scheme_id, name=scheme.name, version=version)
+
+
+def active_scheme():
+    """
+    The active scheme, compiled once per process and rebuilt when the shared
+    version key moved (a scheme or band was saved) or after
+    GRADING_SCHEME_TTL seconds. Falls back to DEFAULT_BANDS when no scheme
+    is active.
+    """
+    global _scheme
+    version = cache.get(VERSION_KEY, 0)
+    ttl = getattr(settings, "GRADING_SCHEME_TTL", 300)
+    scheme = _scheme
+    if scheme is not None and scheme.version == version and time.monotonic() - scheme.built_at < ttl:
+        return scheme
+    with _lock:
+        scheme = _scheme
+        if scheme is None or scheme.version != version or time.monotonic() - scheme.built_at >= ttl:
+            scheme = _scheme = _load_scheme(version)
+    return scheme
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def invalidate_grading_scheme():
+    """Drop this process's compiled scheme now and move the shared version once the change commits."""
+    global _scheme
+    _scheme = None
+    transaction.on_commit(_bump_version)
+
+
+def grade_for(obtained, total):
+    """The active scheme's letter grade for one set of marks."""
+    return active_scheme().grade(percentage(obtained, total))
+
+
+def points_for(obtained, total):
+    """The active scheme's grade points for one set of marks."""
+    return active_scheme().grade_points(percentage(obtained, total))
@@ -0,0 +1,257 @@
+import csv
+import io
+from collections import defaultdict, namedtuple
+from datetime import date as date_cls
+
+from django.db import transaction
+from django.db.models import Q
+
+from academics.models import Course, Result, Timetable
+from academics.services.grade_totals import GradeDeltas, apply_grade_deltas
+from academics.services.grading import active_scheme, percentage
+from academics.services.rosters import course_rosters, semester_rosters
+from academics.services.student_metrics import mark_students_dirty
+from academics.services.transcripts import mark_transcripts_stale
+
+# Component columns and their maximum marks (see the Result model)
+MARK_LIMITS = {
+    "quiz1_marks": 5,
+    "quiz2_marks": 5,
+    "assignment1_marks": 5,
+    "assignment2_marks": 5,
+    "mid_term_marks": 25,
+    "final_marks": 60,
+}
+REQUIRED_COLUMNS = ("student_id", "course", "exam_type")
+UPDATE_FIELDS = ("exam_date", "total_marks", "obtained_marks", "grade", *MARK_LIMITS)
+MAX_ROWS = 20000
+
+MarksRow = namedtuple("MarksRow", ["line", "student_id", "course", "exam_type", "exam_date", "marks"])
+
+
+class MarksImportError(ValueError):
+    """The file as a whole cannot be read (missing columns, too many rows)."""
+
+
+# ===========================
+# Parsing
+# ===========================
+def _mark(value, column):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        mark = float(value)
+    except ValueError:
+        raise ValueError(f"{column} must be a number")
+    if not 0 <= mark <= MARK_LIMITS[column]:
+        raise ValueError(f"{column} must be between 0 and {MARK_LIMITS[column]}")
+    return mark
+
+
+def parse_marks_csv(source):
+    """
+    Read a marks CSV with the columns student_id, course (code or id),
+    exam_type, optionally exam_date (YYYY-MM-DD) and any of the component
+    columns in MARK_LIMITS. Blank component cells leave the stored mark
+    alone. Returns (rows, errors); errors are {'line', 'error'} dicts.
+    """
+    if isinstance(source, bytes):
+        source = source.decode("utf-8-sig")
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    reader = csv.DictReader(source)
+    columns = {(name or "").strip().lower(): name for name in reader.fieldnames or ()}
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise MarksImportError(f"Missing columns: {', '.join(missing)}")
+    mark_columns = [column for column in MARK_LIMITS if column in columns]
+    if not mark_columns:
+        raise MarksImportError(f"No mark columns; expected any of {', '.join(MARK_LIMITS)}")
+
+    rows, errors, seen = [], [], {}
+    for record in reader:
+        line = reader.line_num
+        if len(rows) + len(errors) >= MAX_ROWS:
+            raise MarksImportError(f"At most {MAX_ROWS} rows can be imported at once")
+        value = {column: (record.get(name) or "").strip() for column, name in columns.items()}
+        try:
+            if not value["student_id"] or not value["course"] or not value["exam_type"]:
+                raise ValueError("student_id, course and exam_type are required")
+            exam_date = date_cls.fromisoformat(value["exam_date"]) if value.get("exam_date") else None
+            marks = {column: _mark(value[column], column) for column in mark_columns}
+            key = (value["student_id"], value["course"].upper(), value["exam_type"].lower())
+            if key in seen:
+                raise ValueError(f"Duplicate of line {seen[key]}")
+            seen[key] = line
+        except ValueError as e:
+            errors.append({'line': line, 'error': str(e)})
+            continue
+        rows.append(MarksRow(line, value["student_id"], value["course"], value["exam_type"], exam_date,
+                             {column: mark for column, mark in marks.items() if mark is not None}))
+    return rows, errors
+
+
+# ===========================
+# Validating
+# ===========================
+def _courses(rows):
+    """{course reference as written: Course}, one query for codes and ids together."""
+    references = {row.course for row in rows}
+    ids = {int(ref) for ref in references if ref.isdecimal()}
+    codes = references | {ref.upper() for ref in references}
+    courses = list(Course.objects.filter(Q(code__in=codes) | Q(course_id__in=ids)))
+    by_code = {course.code.upper(): course for course in courses}
+    by_id = {course.course_id: course for course in courses}
+    resolved = {}
+    for ref in references:
+        course = by_code.get(ref.upper()) or (by_id.get(int(ref)) if ref.isdecimal() else None)
+        if course is not None:
+            resolved[ref] = course
+    return resolved
+
+
+def _enrolled(courses):
+    """{course_id: student ids} from the cached course and semester rosters."""
+    by_course = course_rosters([course.course_id for course in courses])
+    by_semester = semester_rosters([course.semester_id for course in courses if course.semester_id])
+    return {
+        course.course_id: {
+            entry.student_id
+            for entry in by_course.get(course.course_id, ()) + by_semester.get(course.semester_id, ())
+        }
+        for course in courses
+    }
+
+
+def validate_rows(rows, instructor=None):
+    """
+    Resolve courses and check every student against the course roster
+    (students enrolled in the course or in its semester). An instructor may
+    only import marks for courses they teach. Returns (rows with their
+    Course, errors).
+    """
+    courses = _courses(rows)
+    enrolled = _enrolled(set(courses.values()))
+    taught = None
+    if instructor is not None:
+        taught = set(Timetable.objects.filter(
+            instructor=instructor, course_id__in=[course.course_id for course in courses.values()]
+        ).values_list("course_id", flat=True))
+
+    valid, errors = [], []
+    for row in rows:
+        course = courses.get(row.course)
+        if course is None:
+            error = f"Unknown course {row.course}"
+        elif taught is not None and course.course_id not in taught:
+            error = f"You do not teach {course.code}"
+        elif row.student_id not in enrolled[course.course_id]:
+            error = f"Student {row.student_id} is not on the roster of {course.code}"
+        else:
+            valid.append((row, course))
+            continue
+        errors.append({'line': row.line, 'error': error})
+    return valid, errors
+
+
+# ===========================
+# Writing
+# ===========================
+def _existing(valid):
+    """{(student_id, course_id, exam type lowercased): Result}, the newest when there are several."""
+    student_ids = {row.student_id for row, _ in valid}
+    course_ids = {course.course_id for _, course in valid}
+    existing = {}
+    results = Result.objects.select_for_update().filter(
+        student_id__in=student_ids, course_id__in=course_ids
+    ).order_by("result_id")
+    for result in results:
+        existing[(result.student_id, result.course_id, (result.exam_type or "").lower())] = result
+    return existing
+
+
+def _update_results(results, batch_size):
+    """
+    Write changed results with one UPDATE per distinct set of values, the way
+    the counters are maintained; imports repeat the same marks often enough
+    that this beats a per-row CASE from bulk_update.
+    """
+    groups = defaultdict(list)
+    for result in results:
+        groups[tuple(getattr(result, field) for field in UPDATE_FIELDS)].append(result.pk)
+    for values, pks in groups.items():
+        for start in range(0, len(pks), batch_size):
+            Result.objects.filter(pk__in=pks[start:start + batch_size]).update(**dict(zip(UPDATE_FIELDS, values)))
+
+
+def save_marks(valid, dry_run=False, batch_size=500):
+    """
+    Write validated (MarksRow, Course) pairs in one transaction: totals come
+    from Result.compute_marks and grades from one batch lookup on the active
+    scheme, new results are bulk_created and existing ones updated in
+    groups. The grade totals get one set of deltas, every affected
+    student's GPA is refreshed once and their transcripts are marked stale.
+    Returns (created, updated) Result lists.
+    """
+    with transaction.atomic():
+        existing = _existing(valid)
+        results, states = [], []
+        for row, course in valid:
+            result = existing.get((row.student_id, course.course_id, row.exam_type.lower()))
+            if result is None:
+                result = Result(student_id=row.student_id, course=course, exam_type=row.exam_type)
+                if row.exam_date:
+                    result.exam_date = row.exam_date
+            elif row.exam_date:
+                result.exam_date = row.exam_date
+            for column, mark in row.marks.items():
+                setattr(result, column, mark)
+            result.total_marks, result.obtained_marks = result.compute_marks()
+            results.append(result)
+            states.append(getattr(result, "_grade_state", None) if result.pk else None)
+
+        grades = active_scheme().grade_many(
+            [percentage(result.obtained_marks, result.total_marks) for result in results]
+        )
+        created, updated, deltas = [], [], GradeDeltas()
+        for result, grade, old_state in zip(results, grades, states):
+            result.grade = grade
+            new_state = (result.student_id, result.course_id, percentage(result.obtained_marks, result.total_marks))
+            if result.pk is None:
+                created.append(result)
+                deltas.add(*new_state)
+            else:
+                updated.append(result)
+                if old_state != new_state:
+                    deltas.transition(old_state, new_state)
+        if dry_run:
+            return created, updated
+
+        Result.objects.bulk_create(created, batch_size=batch_size)
+        _update_results(updated, batch_size)
+        # bulk writes skip the Result signals, so the totals and metrics they maintain are updated here
+        apply_grade_deltas(deltas)
+        student_ids = sorted({result.student_id for result in results})
+        mark_students_dirty(student_ids)
+        mark_transcripts_stale(student_ids)
+    return created, updated
+
+
+def import_marks(source, instructor=None, dry_run=False, batch_size=500):
+    """
+    Import a marks CSV. Rows are validated up front and nothing is written
+    if any row fails; valid files go through ``save_marks``. Returns a
+    summary dict with 'errors'.
+    """
+    rows, errors = parse_marks_csv(source)
+    summary = {'rows': len(rows) + len(errors), 'created': 0, 'updated': 0, 'students': 0}
+    valid, invalid = validate_rows(rows, instructor) if rows else ([], [])
+    errors = summary['errors'] = sorted(errors + invalid, key=lambda error: error['line'])
+    if errors or not valid:
+        return summary
+
+    created, updated = save_marks(valid, dry_run=dry_run, batch_size=batch_size)
+    summary.update(created=len(created), updated=len(updated),
+                   students=len({result.student_id for result in created + updated}))
+    return summary
@@ -0,0 +1,118 @@
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from students.models import Student
+
+RosterEntry = namedtuple("RosterEntry", ["student_id", "name", "email", "image", "department_id"])
+
+ROSTER_TIMEOUT = getattr(settings, "ROSTER_CACHE_TIMEOUT", 60 * 60)
+
+
+def _version_key(scope, pk):
+    return f"academics:roster:{scope}:{pk}:version"
+
+
+def _roster_key(scope, pk, version):
+    return f"academics:roster:{scope}:{pk}:v{version}"
+
+
+def _versions(scope, pks):
+    """Current version per key; unseen keys start from a timestamp so a flushed cache never reuses old data."""
+    keys = {_version_key(scope, pk): pk for pk in pks}
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, pk in keys.items():
+        if pk not in versions:
+            seed = time.time_ns()
+            cache.add(key, seed, None)
+            versions[pk] = cache.get(key, seed)
+    return versions
+
+
+def _image_url(image):
+    if not image:
+        return None
+    return f"{settings.MEDIA_URL}{image}"
+
+
+def _load(scope, pks):
+    queryset = Student.objects.order_by("name", "student_id")
+    if scope == "semester":
+        queryset = queryset.filter(semester_id__in=pks)
+        field = "semester_id"
+    else:
+        queryset = queryset.filter(courses__in=pks)
+        field = "courses"
+    rosters = {pk: [] for pk in pks}
+    for key, student_id, name, email, image, department_id in queryset.values_list(
+        field, "student_id", "name", "email", "image", "department_id"
+    ):
+        rosters[key].append(RosterEntry(student_id, name, email, _image_url(image), department_id))
+    return {pk: tuple(entries) for pk, entries in rosters.items()}
+
+
+def _rosters(scope, pks):
+    pks = [pk for pk in dict.fromkeys(pks) if pk is not None]
+    if not pks:
+        return {}
+    versions = _versions(scope, pks)
+    keys = {_roster_key(scope, pk, versions[pk]): pk for pk in pks}
+    rosters = {keys[key]: roster for key, roster in cache.get_many(list(keys)).items()}
+    missing = [pk for pk in pks if pk not in rosters]
+    if missing:
+        loaded = _load(scope, missing)
+        cache.set_many(
+            {_roster_key(scope, pk, versions[pk]): roster for pk, roster in loaded.items()},
+            ROSTER_TIMEOUT,
+        )
+        rosters.update(loaded)
+    return rosters
+
+
+def semester_rosters(semester_ids):
+    """{semester_id: tuple of RosterEntry ordered by name}; misses are loaded with one query."""
+    return _rosters("semester", semester_ids)
+
+
+def semester_roster(semester_id):
+    return semester_rosters([semester_id]).get(semester_id, ())
+
+
+def course_rosters(course_ids):
+    """{course_id: tuple of RosterEntry} for students enrolled through ``Student.courses``."""
+    return _rosters("course", course_ids)
+
+
+def course_roster(course_id):
+    return course_rosters([course_id]).get(course_id, ())
+
+
+def _bump_now(scope, pks):
+    for pk in pks:
+        try:
+            cache.incr(_version_key(scope, pk))
+        except ValueError:
+            cache.set(_version_key(scope, pk), time.time_ns(), None)
+
+
+def _bump(scope, pks):
+    """
+    Move the roster versions once the change commits, so a reader racing the
+    write cannot re-cache the old roster under the new version. Ids are read
+    now, while querysets over the changed rows still see them.
+    """
+    pks = {pk for pk in pks if pk is not None}
+    if pks:
+        transaction.on_commit(lambda: _bump_now(scope, pks))
+
+
+def invalidate_semester_rosters(semester_ids):
+    _bump("semester", semester_ids)
+
+
+def invalidate_course_rosters(course_ids):
+    _bump("course", course_ids)
@@ -0,0 +1,167 @@
+from collections import defaultdict
+from datetime import date as date_cls, datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import Attendance, AttendanceCheckIn, Timetable
+from academics.services.attendance import write_attendance
+from academics.services.class_sessions import open_entries
+from academics.services.rosters import ROSTER_TIMEOUT, semester_roster
+from academics.services.session_attendance import slot_submitted
+from academics.services.student_metrics import deferred_refresh
+from students.models import Student
+
+# Same window SlotBasedAttendanceView enforces for manual marking
+OPENS_BEFORE = 15
+CLOSES_AFTER = 30
+TOKEN_TTL = getattr(settings, "ATTENDANCE_CHECKIN_TOKEN_TTL", 60)
+LATE_AFTER = getattr(settings, "ATTENDANCE_CHECKIN_LATE_AFTER", 10)
+_signer = signing.Signer(salt="academics.self-checkin")
+
+
+class CheckInError(ValueError):
+    pass
+
+
+# ===========================
+# Slot tokens
+# ===========================
+def _at(day, minute):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(minutes=minute),
+                               timezone.get_current_timezone())
+
+
+def open_slot(timetable_id, instructor_id, now=None):
+    """The instructor's slot if its check-in window is open now, from today's class sessions or the slot index."""
+    for entry in open_entries(now, instructor_id=instructor_id, before=OPENS_BEFORE, after=CLOSES_AFTER):
+        if entry.timetable_id == timetable_id:
+            return entry
+    return None
+
+
+def issue_token(entry, now=None):
+    """
+    A signed token for one slot's check-in, valid for ATTENDANCE_CHECKIN_TOKEN_TTL
+    seconds and never past the end of the window. Everything the check-in
+    needs (slot, semester, date, late cut-off, expiry) travels in the token.
+    Returns (token, expires_at).
+    """
+    now = now or timezone.now()
+    today = now.date()
+    expires = min(now + timedelta(seconds=TOKEN_TTL), _at(today, entry.end_minute + CLOSES_AFTER))
+    late_at = _at(today, entry.start_minute + LATE_AFTER)
+    value = ":".join(str(part) for part in (
+        entry.timetable_id, entry.semester_id or "", today.isoformat(), int(late_at.timestamp()),
+        int(expires.timestamp()),
+    ))
+    return _signer.sign(value), expires
+
+
+def verify_token(token, now=None):
+    """
+    Check the signature and expiry without touching the database.
+    Returns (timetable_id, semester_id, date, status) where status is
+    Late once the slot's late cut-off has passed.
+    """
+    now = now or timezone.now()
+    try:
+        timetable_id, semester_id, day, late_at, expires = _signer.unsign(token).split(":")
+        timetable_id, late_at, expires = int(timetable_id), int(late_at), int(expires)
+        day = date_cls.fromisoformat(day)
+    except (signing.BadSignature, ValueError):
+        raise CheckInError("Invalid check-in token")
+    if now.timestamp() > expires:
+        raise CheckInError("Check-in token has expired")
+    status_value = Attendance.LATE if now.timestamp() > late_at else Attendance.PRESENT
+    return timetable_id, int(semester_id) if semester_id else None, day, status_value
+
+
+# ===========================
+# Checking in
+# ===========================
+def _student_key(user_id):
+    return f"academics:checkin:student:{user_id}"
+
+
+def student_for_user(user):
+    """The student id linked to this user, cached so a check-in does not look it up every time."""
+    key = _student_key(user.pk)
+    student_id = cache.get(key)
+    if student_id is None:
+        student_id = Student.objects.filter(user=user).values_list("student_id", flat=True).first()
+        if student_id:
+            cache.set(key, student_id, ROSTER_TIMEOUT)
+    return student_id
+
+
+def check_in(token, student_id, now=None):
+    """
+    Buffer one check-in. The token is verified by signature and the
+    student against the cached semester roster, so the only query is the
+    insert into the buffer; repeated check-ins are ignored by its unique
+    key. Returns (timetable_id, date, status).
+    """
+    now = now or timezone.now()
+    timetable_id, semester_id, day, status_value = verify_token(token, now)
+    if semester_id is not None and all(entry.student_id != student_id for entry in semester_roster(semester_id)):
+        raise CheckInError("You are not enrolled in this class")
+    AttendanceCheckIn.objects.bulk_create([
+        AttendanceCheckIn(timetable_id=timetable_id, student_id=student_id, date=day,
+                          status=status_value, checked_in_at=now)
+    ], ignore_conflicts=True)
+    return timetable_id, day, status_value
+
+
+# ===========================
+# Flushing
+# ===========================
+def _write_slot(timetable, day, checkins):
+    """Write one slot's check-ins; students the instructor already marked keep their mark."""
+    # Taken first so the instructor's own writes for this slot wait for ours
+    Timetable.objects.select_for_update().filter(pk=timetable.pk).exists()
+    if slot_submitted(timetable, day):
+        return 0
+    marked = Attendance.objects.filter(timetable=timetable, date=day)
+    taken = set(marked.values_list("student_id", flat=True))
+    marks = [{"student_id": sid, "status": value} for sid, value in checkins if sid not in taken]
+    if not marks:
+        return 0
+    result = write_attendance(marks, date=day, instructor=timetable.instructor, timetable=timetable,
+                              semester=timetable.course.semester)
+    return len(result.created)
+
+
+def flush_checkins(batch_size=5000, timetable_ids=None):
+    """
+    Move buffered check-ins into Attendance, ``batch_size`` per transaction,
+    with one bulk write per (slot, date). Rows are claimed with SKIP LOCKED so
+    several workers can flush side by side. Check-ins for a slot that was
+    submitted in the meantime are dropped. Returns the number of rows written.
+    """
+    written = 0
+    while True:
+        with transaction.atomic():
+            claimed = AttendanceCheckIn.objects.select_for_update(skip_locked=True)
+            if timetable_ids:
+                claimed = claimed.filter(timetable_id__in=timetable_ids)
+            rows = list(claimed.order_by("checkin_id").values_list(
+                "checkin_id", "timetable_id", "date", "student_id", "status"
+            )[:batch_size])
+            if not rows:
+                return written
+
+            slots = defaultdict(list)
+            for _, timetable_id, day, student_id, status_value in rows:
+                slots[(timetable_id, day)].append((student_id, status_value))
+            timetables = Timetable.objects.select_related("course__semester", "instructor").in_bulk(
+                {timetable_id for timetable_id, _ in slots}
+            )
+            with deferred_refresh():
+                for (timetable_id, day), checkins in slots.items():
+                    if timetable_id in timetables:
+                        written += _write_slot(timetables[timetable_id], day, checkins)
+            AttendanceCheckIn.objects.filter(checkin_id__in=[row[0] for row in rows]).delete()
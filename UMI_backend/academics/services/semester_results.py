@@ -0,0 +1,188 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from academics.models import Course, GradeTotals, Result, Semester, SemesterGradeTotals, StudentAcademicHistory
+from academics.services.attendance_stats import invalidate_attendance_stats
+from academics.services.grade_totals import rebuild_semester_totals, rebuild_student_totals
+from academics.services.rosters import invalidate_course_rosters, invalidate_semester_rosters
+from academics.services.transcripts import mark_transcripts_stale, next_semesters
+from students.models import Student
+
+PASSING_GPA = 2.0
+
+
+# ===========================
+# Planning
+# ===========================
+def department_chunks(department_ids=None, semester_ids=None):
+    """
+    {department_id: [semester ids]} for the semesters to close, one query.
+    Each department is closed independently, so the chunks can run in
+    separate processes.
+    """
+    semesters = Semester.objects.all()
+    if department_ids:
+        semesters = semesters.filter(department_id__in=department_ids)
+    if semester_ids:
+        semesters = semesters.filter(semester_id__in=semester_ids)
+    chunks = defaultdict(list)
+    for department_id, semester_id in semesters.order_by("department_id", "semester_id").values_list(
+        "department_id", "semester_id"
+    ):
+        chunks[department_id].append(semester_id)
+    return dict(chunks)
+
+
+def _finished(semester_ids):
+    """
+    {student_id: failed finals} for the students placed in these semesters
+    who have a final result for every course of their semester, from two
+    grouped queries.
+    """
+    courses = dict(
+        Course.objects.filter(semester_id__in=semester_ids).values("semester_id").annotate(n=Count("course_id"))
+        .order_by().values_list("semester_id", "n")
+    )
+    finals = (
+        Result.objects.filter(
+            student__semester_id__in=semester_ids, course__semester_id=F("student__semester_id"),
+            exam_type__icontains="final",
+        )
+        .values("student_id", "student__semester_id")
+        .annotate(courses=Count("course_id", distinct=True), failed=Count("result_id", filter=Q(grade="F")))
+        .order_by()
+    )
+    return {
+        row["student_id"]: row["failed"]
+        for row in finals if row["courses"] == courses.get(row["student__semester_id"])
+    }
+
+
+def _totals(pairs):
+    """({student_id: GradeTotals}, {student_id: SemesterGradeTotals}) for (student_id, semester_id) pairs."""
+    student_ids = [student_id for student_id, _ in pairs]
+    overall = {t.student_id: t for t in GradeTotals.objects.filter(student_id__in=student_ids)}
+    missing = [student_id for student_id in student_ids if student_id not in overall]
+    if missing:
+        overall.update((t.student_id, t) for t in rebuild_student_totals(missing))
+
+    wanted = set(pairs)
+    semester = {
+        t.student_id: t
+        for t in SemesterGradeTotals.objects.filter(
+            student_id__in=student_ids, semester_id__in={semester_id for _, semester_id in pairs}
+        )
+        if (t.student_id, t.semester_id) in wanted
+    }
+    missing = [pair for pair in pairs if pair[0] not in semester]
+    if missing:
+        semester.update((t.student_id, t) for t in rebuild_semester_totals(missing))
+    return overall, semester
+
+
+# ===========================
+# Closing
+# ===========================
+def _update_students(values, batch_size):
+    """Write {student_id: (gpa, cgpa, previous_cgpa)} with one UPDATE per distinct vector, as the results are."""
+    groups = defaultdict(list)
+    for student_id, vector in values.items():
+        groups[vector].append(student_id)
+    for (gpa, cgpa, previous_cgpa), student_ids in groups.items():
+        for start in range(0, len(student_ids), batch_size):
+            Student.objects.filter(student_id__in=student_ids[start:start + batch_size]).update(
+                gpa=gpa, cgpa=cgpa, previous_cgpa=previous_cgpa
+            )
+
+
+def close_semesters(semester_ids, dry_run=False, batch_size=500):
+    """
+    Close these semesters for every student placed in them who has a final
+    result for each of the semester's courses: record the semester GPA and
+    CGPA in the academic history with one upsert, and promote students
+    without a failed final and with a semester GPA of at least PASSING_GPA
+    with one UPDATE per next semester. Students still missing finals are
+    left alone. Returns a summary.
+
+    Student.gpa keeps one meaning everywhere: the GPA over all of the
+    student's results, the value refresh_students maintains, so the two
+    writers cannot disagree. Student.cgpa is the credit-weighted CGPA of the
+    running totals (replacing the old mean of the previous CGPA and the
+    semester GPA). previous_cgpa only moves when the CGPA changed, so
+    closing a semester again is harmless.
+    """
+    semester_ids = list(semester_ids)
+    placed = list(
+        Student.objects.filter(semester_id__in=semester_ids).values_list(
+            "student_id", "semester_id", "department_id", "semester__name", "cgpa", "previous_cgpa"
+        )
+    )
+    finished = _finished(semester_ids) if placed else {}
+    summary = {'semesters': len(semester_ids), 'students': len(placed), 'completed': 0, 'promoted': 0}
+    placed = [row for row in placed if row[0] in finished]
+    summary['completed'] = len(placed)
+    if not placed:
+        return summary
+
+    overall, semester = _totals([(student_id, semester_id) for student_id, semester_id, *_ in placed])
+    following = next_semesters((department_id, name) for _, _, department_id, name, _, _ in placed)
+    students, history, promotions = {}, [], defaultdict(list)
+    for student_id, semester_id, department_id, name, old_cgpa, previous_cgpa in placed:
+        gpa = semester[student_id].gpa if student_id in semester else 0.0
+        totals = overall.get(student_id)
+        cgpa = totals.cgpa if totals else gpa
+        students[student_id] = (totals.gpa if totals else gpa, cgpa, old_cgpa if cgpa != old_cgpa else previous_cgpa)
+        history.append(StudentAcademicHistory(student_id=student_id, semester_id=semester_id, gpa=gpa, cgpa=cgpa))
+        next_semester = following.get((department_id, name))
+        if next_semester and not finished[student_id] and gpa >= PASSING_GPA:
+            promotions[next_semester[0]].append(student_id)
+    summary['promoted'] = sum(len(ids) for ids in promotions.values())
+    if dry_run:
+        return summary
+
+    with transaction.atomic():
+        _update_students(students, batch_size)
+        StudentAcademicHistory.objects.bulk_create(
+            history, update_conflicts=True, unique_fields=["student", "semester"], update_fields=["gpa", "cgpa"],
+            batch_size=batch_size,
+        )
+        for next_semester_id, student_ids in promotions.items():
+            for start in range(0, len(student_ids), batch_size):
+                Student.objects.filter(student_id__in=student_ids[start:start + batch_size]).update(
+                    semester_id=next_semester_id
+                )
+        # The set-based writes skip the Student signals, so the caches they maintain are refreshed here
+        mark_transcripts_stale(list(students))
+
+    if promotions:
+        promoted = [student_id for student_ids in promotions.values() for student_id in student_ids]
+        invalidate_semester_rosters(semester_ids + list(promotions))
+        invalidate_course_rosters(
+            Student.courses.through.objects.filter(student_id__in=promoted).values_list("course_id", flat=True)
+            .distinct()
+        )
+        invalidate_attendance_stats()
+    return summary
+
+
+def close_department(department_id, semester_ids, dry_run=False, batch_size=500):
+    """Close one department's semesters; the unit of work handed to each worker process."""
+    summary = close_semesters(semester_ids, dry_run=dry_run, batch_size=batch_size)
+    summary['department_id'] = department_id
+    return summary
+
+
+def close_departments(chunks, dry_run=False, batch_size=500, progress=None):
+    """
+    Close the semesters of ``department_chunks`` one department after the
+    other in this process, calling ``progress(summary, done, total)`` after
+    each. Returns the per-department summaries.
+    """
+    summaries = []
+    for department_id, semester_ids in chunks.items():
+        summaries.append(close_department(department_id, semester_ids, dry_run=dry_run, batch_size=batch_size))
+        if progress:
+            progress(summaries[-1], len(summaries), len(chunks))
+    return summaries
@@ -0,0 +1,320 @@
+from collections import defaultdict
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from academics.models import Attendance, AttendanceEditPermission, SessionAttendance, SessionStudentSpan
+from academics.services.attendance_archive import archived_attendance, keep_edit_requests
+from academics.services.attendance_counters import counters_frozen
+from students.models import Student
+
+BIT_FIELDS = {
+    Attendance.PRESENT: "present_bits",
+    Attendance.LATE: "late_bits",
+    Attendance.ABSENT: "absent_bits",
+}
+VALID_STATUSES = set(BIT_FIELDS)
+TALLY_CHUNK = 200  # students per roster LIKE query in session_tallies
+
+
+# ===========================
+# Packing
+# ===========================
+def pack(statuses):
+    """{student_id: status} -> (roster string, {bit field: bytes}) with the roster sorted by id."""
+    roster = sorted(statuses)
+    size = (len(roster) + 7) // 8
+    bits = {field: bytearray(size) for field in BIT_FIELDS.values()}
+    for i, student_id in enumerate(roster):
+        field = BIT_FIELDS.get(statuses[student_id])
+        if field:
+            bits[field][i >> 3] |= 1 << (i & 7)
+    return f",{','.join(roster)},", {field: bytes(value) for field, value in bits.items()}
+
+
+def roster_ids(roster):
+    return [student_id for student_id in roster.split(",") if student_id]
+
+
+def unpack(roster, present_bits, late_bits, absent_bits):
+    """Inverse of ``pack``: {student_id: status} in roster order."""
+    planes = [
+        (Attendance.PRESENT, bytes(present_bits or b"")),
+        (Attendance.LATE, bytes(late_bits or b"")),
+        (Attendance.ABSENT, bytes(absent_bits or b"")),
+    ]
+    statuses = {}
+    for i, student_id in enumerate(roster_ids(roster)):
+        byte, mask = i >> 3, 1 << (i & 7)
+        for status_value, plane in planes:
+            if byte < len(plane) and plane[byte] & mask:
+                statuses[student_id] = status_value
+                break
+    return statuses
+
+
+def expand(session):
+    return unpack(session.roster, session.present_bits, session.late_bits, session.absent_bits)
+
+
+def _set_statuses(session, statuses):
+    session.roster, bits = pack(statuses)
+    for field, value in bits.items():
+        setattr(session, field, value)
+
+
+# ===========================
+# Read-only history
+# ===========================
+# Compacted sessions are history only: marking, submitting and editing work
+# on Attendance rows, and a slot with a compacted session counts as submitted.
+def is_compacted(timetable, date):
+    return SessionAttendance.objects.filter(timetable=timetable, date=date, compacted=True).exists()
+
+
+def slot_submitted(timetable, date):
+    """Whether the slot is locked for ``date``: submitted Attendance rows or a compacted session."""
+    return (
+        Attendance.objects.filter(timetable=timetable, date=date, is_submitted=True).exists()
+        or is_compacted(timetable, date)
+    )
+
+
+# ===========================
+# Read adapters
+# ===========================
+def session_statuses(timetable, date):
+    """{student_id: status} for one session, from the compact record if there is one."""
+    session = SessionAttendance.objects.filter(timetable=timetable, date=date).first()
+    return expand(session) if session else {}
+
+
+def _sessions_for(student_ids):
+    """
+    Compacted sessions holding any of these students. Their slot date spans
+    narrow the scan to the (timetable, date) index first; the roster LIKE
+    only confirms membership within those slots.
+    """
+    spans = {}
+    for timetable_id, first_date, last_date in SessionStudentSpan.objects.filter(
+        student_id__in=student_ids
+    ).values_list("timetable_id", "first_date", "last_date"):
+        lo, hi = spans.get(timetable_id, (first_date, last_date))
+        spans[timetable_id] = (min(lo, first_date), max(hi, last_date))
+    if not spans:
+        return SessionAttendance.objects.none()
+    slots = Q()
+    for timetable_id, (first_date, last_date) in spans.items():
+        slots |= Q(timetable_id=timetable_id, date__gte=first_date, date__lte=last_date)
+    match = Q()
+    for student_id in student_ids:
+        match |= Q(roster__contains=f",{student_id},")
+    return SessionAttendance.objects.filter(slots, match, compacted=True)
+
+
+def student_records(student_id, date_from=None, date_to=None):
+    """
+    [(date, course_id, status)] for one student across Attendance rows,
+    compacted sessions and, when the range reaches back into them, archived
+    terms; oldest first. Used by per-student reports.
+    """
+    rows = Attendance.objects.filter(student_id=student_id)
+    sessions = _sessions_for([student_id])
+    if date_from:
+        rows, sessions = rows.filter(date__gte=date_from), sessions.filter(date__gte=date_from)
+    if date_to:
+        rows, sessions = rows.filter(date__lte=date_to), sessions.filter(date__lte=date_to)
+
+    records = list(rows.order_by().values_list("date", "course_id", "status"))
+    for day, course_id, roster, present, late, absent in sessions.order_by().values_list(
+        "date", "course_id", "roster", "present_bits", "late_bits", "absent_bits"
+    ):
+        status_value = unpack(roster, present, late, absent).get(student_id)
+        if status_value:
+            records.append((day, course_id, status_value))
+    records.extend(
+        (row.date, row.course_id, row.status)
+        for row in archived_attendance(date_from, date_to, student_ids=[student_id])
+    )
+    return sorted(records, key=lambda record: record[0])
+
+
+def session_tallies(student_ids):
+    """
+    {(student_id, course_id): {total, present, late, absent}} from compacted
+    sessions. Students are matched TALLY_CHUNK at a time to keep the LIKE
+    filter small; a session matched by several chunks is counted once.
+    """
+    student_ids = set(student_ids)
+    tallies = defaultdict(lambda: defaultdict(int))
+    if not student_ids:
+        return tallies
+    ordered, seen = sorted(student_ids), set()
+    for start in range(0, len(ordered), TALLY_CHUNK):
+        sessions = _sessions_for(ordered[start:start + TALLY_CHUNK]).order_by().values_list(
+            "pk", "course_id", "roster", "present_bits", "late_bits", "absent_bits"
+        )
+        for pk, course_id, roster, present, late, absent in sessions.iterator(chunk_size=500):
+            if pk in seen:
+                continue
+            seen.add(pk)
+            for student_id, status_value in unpack(roster, present, late, absent).items():
+                if student_id not in student_ids:
+                    continue
+                tally = tallies[(student_id, course_id)]
+                tally["total"] += 1
+                tally[status_value.lower()] += 1
+    return tallies
+
+
+def session_counts(days=None):
+    """
+    {(date, department_id, semester_id): {total, present, late, absent}}
+    from compacted sessions (on ``days`` only, if given), grouped by the
+    students' current placement as the Attendance aggregates are.
+    """
+    sessions = SessionAttendance.objects.filter(compacted=True)
+    if days is not None:
+        sessions = sessions.filter(date__in=days)
+    marks = defaultdict(lambda: defaultdict(int))
+    for day, roster, present, late, absent in sessions.order_by().values_list(
+        "date", "roster", "present_bits", "late_bits", "absent_bits"
+    ).iterator(chunk_size=500):
+        for student_id, status_value in unpack(roster, present, late, absent).items():
+            marks[(day, student_id)][status_value] += 1
+
+    counts = defaultdict(lambda: {"total": 0, "present": 0, "late": 0, "absent": 0})
+    if not marks:
+        return counts
+    placements = {
+        student_id: (department_id, semester_id)
+        for student_id, department_id, semester_id in Student.objects.filter(
+            student_id__in={student_id for _, student_id in marks}
+        ).values_list("student_id", "department_id", "semester_id")
+    }
+    for (day, student_id), statuses in marks.items():
+        if student_id not in placements:
+            continue
+        target = counts[(day, *placements[student_id])]
+        for status_value, n in statuses.items():
+            target["total"] += n
+            target[status_value.lower()] += n
+    return counts
+
+
+# ===========================
+# Conversion
+# ===========================
+def convertible_rows(before, timetable_ids=None):
+    """
+    Timetabled Attendance rows dated before ``before`` whose slot is fully
+    submitted and has no pending edit request; other slots stay as rows
+    until they are submitted and reviewed.
+    """
+    rows = Attendance.objects.filter(timetable__isnull=False, date__lt=before).exclude(
+        Exists(Attendance.objects.filter(
+            timetable_id=OuterRef("timetable_id"), date=OuterRef("date"), is_submitted=False
+        ))
+    ).exclude(
+        Exists(AttendanceEditPermission.objects.filter(
+            attendance__timetable_id=OuterRef("timetable_id"), attendance__date=OuterRef("date"), status="pending"
+        ))
+    )
+    if timetable_ids:
+        rows = rows.filter(timetable_id__in=timetable_ids)
+    return rows
+
+
+def convert_attendance(before, batch_size=500, delete_rows=False, timetable_ids=None):
+    """
+    Fold the submitted timetabled Attendance rows dated before ``before``
+    into SessionAttendance records, one transaction per ``batch_size``
+    sessions. Existing session marks are kept unless a row overrides them.
+    With ``delete_rows`` the converted rows are removed with the counters
+    frozen (the sessions keep counting them), their edit requests kept in
+    ArchivedEditPermission and the sessions flagged as compacted, after
+    which they are read-only history. Returns (sessions written, rows
+    converted).
+    """
+    rows = convertible_rows(before, timetable_ids).order_by("timetable_id", "date", "student_id").values_list(
+        "timetable_id", "date", "student_id", "course_id", "instructor_id", "status", "attendance_id"
+    )
+
+    written = converted = 0
+    chunk = []
+    for key, group in groupby(rows.iterator(chunk_size=2000), key=lambda row: (row[0], row[1])):
+        chunk.append((key, list(group)))
+        if len(chunk) >= batch_size:
+            written, converted = _flush(chunk, delete_rows, written, converted)
+            chunk = []
+    if chunk:
+        written, converted = _flush(chunk, delete_rows, written, converted)
+    return written, converted
+
+
+def _extend_spans(sessions):
+    """Widen the SessionStudentSpan of every (student, slot) in these compacted sessions."""
+    spans = {}
+    for session in sessions:
+        for student_id in roster_ids(session.roster):
+            key = (student_id, session.timetable_id)
+            lo, hi = spans.get(key, (session.date, session.date))
+            spans[key] = (min(lo, session.date), max(hi, session.date))
+    existing = SessionStudentSpan.objects.filter(
+        student_id__in={student_id for student_id, _ in spans},
+        timetable_id__in={timetable_id for _, timetable_id in spans},
+    ).values_list("student_id", "timetable_id", "first_date", "last_date")
+    for student_id, timetable_id, first_date, last_date in existing:
+        if (student_id, timetable_id) in spans:
+            lo, hi = spans[(student_id, timetable_id)]
+            spans[(student_id, timetable_id)] = (min(lo, first_date), max(hi, last_date))
+    SessionStudentSpan.objects.bulk_create(
+        [
+            SessionStudentSpan(student_id=student_id, timetable_id=timetable_id, first_date=lo, last_date=hi)
+            for (student_id, timetable_id), (lo, hi) in spans.items()
+        ],
+        update_conflicts=True, unique_fields=["student", "timetable"], update_fields=["first_date", "last_date"],
+        batch_size=500,
+    )
+
+
+def _flush(chunk, delete_rows, written, converted):
+    keys = Q()
+    for (timetable_id, day), _ in chunk:
+        keys |= Q(timetable_id=timetable_id, date=day)
+
+    with transaction.atomic():
+        existing = {
+            (session.timetable_id, session.date): session
+            for session in SessionAttendance.objects.select_for_update().filter(keys)
+        }
+        sessions = []
+        for (timetable_id, day), group in chunk:
+            session = existing.get((timetable_id, day)) or SessionAttendance(
+                timetable_id=timetable_id, date=day, compacted=False
+            )
+            statuses = expand(session) if session.pk else {}
+            statuses.update({row[2]: row[5] for row in group})
+            _set_statuses(session, statuses)
+            session.course_id = session.course_id or group[0][3]
+            session.instructor_id = session.instructor_id or group[0][4]
+            session.is_submitted = True
+            # A session only counts on its own once its rows are gone
+            session.compacted = delete_rows
+            sessions.append(session)
+
+        fields = ["roster", "present_bits", "late_bits", "absent_bits", "course", "instructor",
+                  "is_submitted", "compacted"]
+        SessionAttendance.objects.bulk_update([s for s in sessions if s.pk], fields, batch_size=500)
+        SessionAttendance.objects.bulk_create([s for s in sessions if not s.pk], batch_size=500)
+
+        if delete_rows:
+            _extend_spans(sessions)
+            keep_edit_requests({
+                row[6]: {"session": session} for session, (_, group) in zip(sessions, chunk) for row in group
+            })
+            with counters_frozen():
+                Attendance.objects.filter(keys).delete()
+
+    return written + len(sessions), converted + sum(len(group) for _, group in chunk)
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from academics.models import Attendance, SessionAttendance, Timetable
+from academics.services.rosters import semester_rosters
+
+BUCKET_MINUTES = 15
+VERSION_KEY = "academics:slot-index:version"
+WEEKDAYS = [day for day, _ in Timetable.DAY_CHOICES]  # monday == 0, same as date.weekday()
+
+SlotEntry = namedtuple("SlotEntry", [
+    "timetable_id", "instructor_id", "course_id", "course_name", "course_code",
+    "semester_id", "semester_name", "department_name",
+    "weekday", "start_time", "end_time", "start_minute", "end_minute", "room",
+])
+
+_lock = threading.Lock()
+_index = None
+
+
+def minute_of_day(value):
+    """Minutes since midnight of a time/datetime, keeping seconds as a fraction."""
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+class WeeklySlotIndex:
+    """
+    The whole weekly timetable held in memory.
+
+    ``buckets`` maps (weekday, minute bucket) to every slot overlapping that
+    bucket, so "what is running now" touches one or two small lists. ``agenda``
+    maps (weekday, instructor_id) to that instructor's slots ordered by start,
+    and ``days`` maps a weekday to all of its slots ordered by start.
+    """
+
+    def __init__(self, entries, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.buckets = defaultdict(list)
+        self.agenda = defaultdict(list)
+        self.days = defaultdict(list)
+        for entry in sorted(entries, key=lambda e: (e.weekday, e.start_minute)):
+            for bucket in range(int(entry.start_minute // BUCKET_MINUTES), int(entry.end_minute // BUCKET_MINUTES) + 1):
+                self.buckets[(entry.weekday, bucket)].append(entry)
+            self.agenda[(entry.weekday, entry.instructor_id)].append(entry)
+            self.days[entry.weekday].append(entry)
+
+    def active(self, weekday, minute, instructor_id=None, before=0, after=0):
+        """
+        Slots running at ``minute`` on ``weekday``. ``before``/``after`` widen
+        each slot by that many minutes before its start and after its end.
+        """
+        found = {}
+        first = int((minute - after) // BUCKET_MINUTES)
+        last = int((minute + before) // BUCKET_MINUTES)
+        for bucket in range(first, last + 1):
+            for entry in self.buckets.get((weekday, bucket), ()):
+                if instructor_id is not None and entry.instructor_id != instructor_id:
+                    continue
+                if entry.start_minute - before <= minute <= entry.end_minute + after:
+                    found[entry.timetable_id] = entry
+        return sorted(found.values(), key=lambda e: e.start_minute)
+
+    def day_agenda(self, weekday, instructor_id):
+        return list(self.agenda.get((weekday, instructor_id), ()))
+
+    def day_slots(self, weekday):
+        return list(self.days.get(weekday, ()))
+
+
+def _load_entries():
+    rows = Timetable.objects.order_by().values_list(
+        "timetable_id", "instructor_id", "course_id", "course__name", "course__code",
+        "course__semester_id", "course__semester__name", "course__semester__department__name",
+        "day", "start_time", "end_time", "room",
+    )
+    entries = []
+    for (timetable_id, instructor_id, course_id, course_name, course_code, semester_id,
+         semester_name, department_name, day, start_time, end_time, room) in rows:
+        if day not in WEEKDAYS:
+            continue
+        entries.append(SlotEntry(
+            timetable_id, instructor_id, course_id, course_name, course_code,
+            semester_id, semester_name, department_name,
+            WEEKDAYS.index(day), start_time, end_time, minute_of_day(start_time), minute_of_day(end_time), room,
+        ))
+    return entries
+
+
+def get_slot_index():
+    """
+    Return the process-local index, rebuilding it when the shared version key
+    moved (another process saved a Timetable) or after SLOT_INDEX_TTL seconds.
+    """
+    global _index
+    version = cache.get(VERSION_KEY, 0)
+    ttl = getattr(settings, "SLOT_INDEX_TTL", 300)
+    index = _index
+    if index is not None and index.version == version and time.monotonic() - index.built_at < ttl:
+        return index
+    with _lock:
+        index = _index
+        if index is None or index.version != version or time.monotonic() - index.built_at >= ttl:
+            index = _index = WeeklySlotIndex(_load_entries(), version)
+    return index
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def invalidate_slot_index():
+    """Drop this process's index now and move the shared version once the change commits."""
+    global _index
+    _index = None
+    transaction.on_commit(_bump_version)
+
+
+def slot_status(slots, date):
+    """
+    {timetable_id: (students_count, is_submitted)} for many index slots at once:
+    roster sizes come from the semester roster cache and the submission flags
+    from one query over all the slots (rows and compact sessions).
+    """
+    slots = list(slots)
+    if not slots:
+        return {}
+    rosters = semester_rosters(slot.semester_id for slot in slots)
+    timetable_ids = [slot.timetable_id for slot in slots]
+    submitted = set(
+        Attendance.objects.filter(timetable_id__in=timetable_ids, date=date, is_submitted=True)
+        .order_by().values_list("timetable_id", flat=True).distinct()
+        .union(
+            SessionAttendance.objects.filter(timetable_id__in=timetable_ids, date=date, is_submitted=True)
+            .order_by().values_list("timetable_id", flat=True)
+        )
+    )
+    return {
+        slot.timetable_id: (len(rosters.get(slot.semester_id, ())), slot.timetable_id in submitted)
+        for slot in slots
+    }
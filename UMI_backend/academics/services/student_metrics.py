@@ -0,0 +1,124 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academics.models import DirtyStudent
+from academics.services.attendance_counters import attendance_rates
+from academics.services.grade_totals import student_gpas
+from students.models import Student
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, "pending"):
+        _state.pending = set()
+        _state.window_depth = 0
+    return _state.pending
+
+
+# ===========================
+# Set-based recomputation
+# ===========================
+def compute_student_metrics(student_ids):
+    """Return {student_id: (attendance_percentage, gpa)} read from the running counters and totals."""
+    student_ids = list(student_ids)
+    metrics = {sid: [0.0, 0.0] for sid in student_ids}
+
+    for student_id, rate in attendance_rates(student_ids).items():
+        metrics[student_id][0] = rate
+
+    for student_id, gpa in student_gpas(student_ids).items():
+        metrics[student_id][1] = gpa
+
+    return metrics
+
+
+def refresh_students(student_ids, batch_size=500):
+    """Recompute attendance_percentage and gpa for many students with one bulk update."""
+    metrics = compute_student_metrics(student_ids)
+    if not metrics:
+        return 0
+    students = [
+        Student(student_id=sid, attendance_percentage=attendance, gpa=gpa)
+        for sid, (attendance, gpa) in metrics.items()
+    ]
+    Student.objects.bulk_update(students, ["attendance_percentage", "gpa"], batch_size=batch_size)
+    return len(students)
+
+
+# ===========================
+# Dirty-student queue
+# ===========================
+def mark_students_dirty(student_ids):
+    """
+    Record that these students need their derived fields recomputed.
+
+    Ids are coalesced in memory and flushed once when the surrounding
+    transaction commits (or when the enclosing `deferred_refresh` window
+    closes). With STUDENT_METRICS_QUEUE enabled the flush only persists the
+    ids to DirtyStudent for `refresh_student_metrics` to drain later.
+    """
+    pending = _pending()
+    pending.update(str(sid) for sid in student_ids if sid)
+    if pending and not _state.window_depth:
+        transaction.on_commit(flush_dirty_students)
+
+
+def flush_dirty_students():
+    pending = _pending()
+    if not pending:
+        return 0
+    student_ids = list(pending)
+    pending.clear()
+    if getattr(settings, "STUDENT_METRICS_QUEUE", False):
+        enqueue_students(student_ids)
+        return 0
+    return refresh_students(student_ids)
+
+
+@contextmanager
+def deferred_refresh():
+    """Batch window: coalesce every dirty student marked inside the block into one flush."""
+    _pending()
+    _state.window_depth += 1
+    try:
+        yield
+    finally:
+        _state.window_depth -= 1
+        if not _state.window_depth and _state.pending:
+            transaction.on_commit(flush_dirty_students)
+
+
+def enqueue_students(student_ids):
+    now = timezone.now()
+    DirtyStudent.objects.bulk_create(
+        [DirtyStudent(student_id=sid, queued_at=now) for sid in student_ids],
+        update_conflicts=True,
+        unique_fields=["student_id"],
+        update_fields=["queued_at"],
+        batch_size=500,
+    )
+
+
+def drain_queue(batch_size=500):
+    """
+    Recompute queued students in batches. A row is only removed if it was not
+    re-queued while its batch was being recomputed.
+    """
+    drained = 0
+    while True:
+        batch = list(DirtyStudent.objects.values_list("student_id", "queued_at")[:batch_size])
+        if not batch:
+            return drained
+        with transaction.atomic():
+            refresh_students([sid for sid, _ in batch], batch_size=batch_size)
+            matches = Q()
+            for sid, queued_at in batch:
+                matches |= Q(student_id=sid, queued_at=queued_at)
+            DirtyStudent.objects.filter(matches).delete()
+        drained += len(batch)
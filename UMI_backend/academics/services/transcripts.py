@@ -0,0 +1,174 @@
+from collections import defaultdict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
+
+from academics.models import GradeTotals, Result, Semester, SemesterGradeTotals, StudentTranscript
+from academics.services.grade_totals import rebuild_all_totals
+from students.models import Student
+
+TRANSCRIPT_FIELDS = ("semesters", "cgpa", "total_credits", "credit_points", "promotion", "built_generation", "updated_at")
+DROP_AFTER_FAILURES = 3  # consecutive failed finals, newest first
+
+
+# ===========================
+# Invalidation
+# ===========================
+def mark_transcripts_stale(student_ids):
+    """
+    Bump the generation of these students' transcripts with one UPDATE, so
+    the next read rebuilds them. ``student_ids`` may be a values queryset.
+    Students without a transcript yet are left alone.
+    """
+    return StudentTranscript.objects.filter(student_id__in=student_ids).update(generation=F("generation") + 1)
+
+
+# ===========================
+# Building
+# ===========================
+def next_semester_name(semester_name):
+    """The name following "Semester N", or None for names without a trailing number."""
+    try:
+        return f"Semester {int(semester_name.split()[-1]) + 1}"
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+def _promotion(final_grades, next_semester):
+    """Promotion status from the student's final grades (newest first) and the next semester, if any."""
+    if not final_grades:
+        return {"status": "pending", "message": "No final results available"}
+    failed = 0
+    for grade in final_grades:
+        failed = failed + 1 if (grade or "").upper() == "F" else 0
+        if failed >= DROP_AFTER_FAILURES:
+            return {
+                "status": "dropped",
+                "message": f"Student dropped due to {DROP_AFTER_FAILURES} consecutive failures",
+                "action": "drop_student",
+            }
+    if next_semester:
+        semester_id, name = next_semester
+        return {
+            "status": "promote",
+            "message": f"Promote to {name}",
+            "next_semester_id": semester_id,
+            "action": "promote_student",
+        }
+    return {"status": "current", "message": "Student remains in current semester"}
+
+
+def next_semesters(placements):
+    """
+    {(department_id, semester name): (semester_id, name) of the next
+    semester} for (department_id, semester name) placements, one query. The
+    lowest id wins when a department repeats a name, as
+    Student.get_next_semester picks it.
+    """
+    wanted = {
+        (department_id, name): next_semester_name(name)
+        for department_id, name in placements if department_id and next_semester_name(name)
+    }
+    if not wanted:
+        return {}
+    found = {}
+    rows = Semester.objects.filter(
+        department_id__in={department_id for department_id, _ in wanted}, name__in=set(wanted.values())
+    ).order_by("-semester_id").values_list("department_id", "name", "semester_id")
+    for department_id, name, semester_id in rows:
+        found[(department_id, name)] = (semester_id, name)
+    return {
+        placement: found[(placement[0], name)] for placement, name in wanted.items() if (placement[0], name) in found
+    }
+
+
+def rebuild_transcripts(student_ids, batch_size=500):
+    """
+    Build the transcripts of many students from the running grade totals
+    with a fixed number of queries and upsert them in one statement.
+    Each row records the generation it was built from, so a write that lands
+    while it is being built leaves it stale. Returns {student_id: transcript}.
+    """
+    student_ids = list(student_ids)
+    generations = dict(
+        StudentTranscript.objects.filter(student_id__in=student_ids).values_list("student_id", "generation")
+    )
+    students = list(
+        Student.objects.filter(student_id__in=student_ids).values_list("student_id", "department_id", "semester__name")
+    )
+    if not students:
+        return {}
+
+    ids = [student_id for student_id, _, _ in students]
+    totals = {t.student_id: t for t in GradeTotals.objects.filter(student_id__in=ids)}
+    missing = [student_id for student_id in ids if student_id not in totals]
+    if missing:
+        # No totals yet: recount both tables for these students
+        rebuild_all_totals(missing)
+        totals.update((t.student_id, t) for t in GradeTotals.objects.filter(student_id__in=missing))
+
+    semesters = defaultdict(list)
+    for t in SemesterGradeTotals.objects.filter(student_id__in=ids).select_related("semester").order_by(
+        "student_id", "semester_id"
+    ):
+        semesters[t.student_id].append({
+            "semester_id": t.semester_id,
+            "name": t.semester.name,
+            "gpa": t.gpa,
+            "cgpa": t.cgpa,
+            "credits": t.credits,
+            "result_count": t.result_count,
+        })
+
+    final_grades = defaultdict(list)
+    for student_id, grade in Result.objects.filter(
+        student_id__in=ids, exam_type__icontains="final"
+    ).order_by("student_id", "-exam_date", "-result_id").values_list("student_id", "grade"):
+        final_grades[student_id].append(grade)
+
+    following = next_semesters((department_id, semester_name) for _, department_id, semester_name in students)
+    transcripts = {}
+    for student_id, department_id, semester_name in students:
+        t = totals.get(student_id)
+        transcripts[student_id] = StudentTranscript(
+            student_id=student_id,
+            semesters=semesters.get(student_id, []),
+            cgpa=t.cgpa if t else 0.0,
+            total_credits=t.credits if t else 0,
+            credit_points=round(t.credit_points, 2) if t else 0.0,
+            promotion=_promotion(final_grades.get(student_id), following.get((department_id, semester_name))),
+            generation=generations.get(student_id, 0),
+            built_generation=generations.get(student_id, 0),
+        )
+    StudentTranscript.objects.bulk_create(
+        transcripts.values(), update_conflicts=True, unique_fields=["student"],
+        update_fields=list(TRANSCRIPT_FIELDS), batch_size=batch_size,
+    )
+    return transcripts
+
+
+# ===========================
+# Reading
+# ===========================
+def student_transcript(student):
+    """
+    The student's transcript; fetch the student with
+    ``select_related("transcript")`` and a fresh transcript costs no query.
+    Missing or stale transcripts are rebuilt on the spot.
+    """
+    try:
+        transcript = student.transcript
+    except ObjectDoesNotExist:
+        transcript = None
+    if transcript is None or transcript.is_stale:
+        transcript = student.transcript = rebuild_transcripts([student.pk])[student.pk]
+    return transcript
+
+
+def cgpa_summary(transcript):
+    """The ``cgpa`` block of the results page."""
+    return {
+        "cgpa": transcript.cgpa,
+        "total_credits": transcript.total_credits,
+        "grade_points": transcript.credit_points,
+    }
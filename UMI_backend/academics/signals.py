@@ -7,26 +7,15 @@ from students.models import Student
 # GPA calculation
 # ===========================
 def compute_gpa(student):
-    pts = []
-    for r in student.results.all():
-        pct = r.percentage
-        if pct >= 85: pts.append(4.0)
-        elif pct >= 75: pts.append(3.5)
-        elif pct >= 65: pts.append(3.0)
-        elif pct >= 55: pts.append(2.5)
-        elif pct >= 50: pts.append(2.0)
-        else: pts.append(0.0)
-    return round(sum(pts) / len(pts), 2) if pts else 0.0
+    from .services.grade_totals import student_gpas
+    return student_gpas([student.pk]).get(student.pk, 0.0)
 
 # ===========================
 # Attendance percentage
 # ===========================
 def compute_attendance_rate(student):
-    total = student.attendances.count()
-    if total == 0:
-        return 0.0
-    present = student.attendances.filter(status=Attendance.PRESENT).count()
-    return round((present / total) * 100, 2)
+    from .services.attendance_counters import attendance_rates
+    return attendance_rates([student.pk]).get(student.pk, 0.0)
 
 # ===========================
 # Refresh student analytics
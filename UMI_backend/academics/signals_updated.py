@@ -1,36 +1,27 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.db.models import Avg
-from .models import Attendance, Result, Scholarship, StudentAcademicHistory
+from django.db.models import Avg, Q
+from .models import (Attendance, Course, Department, GradeBand, GradingScheme, Result, Scholarship, Semester,
+                     Timetable)
+from .services.student_metrics import mark_students_dirty
+from .services.attendance_counters import CounterDeltas, apply_deltas, attendance_rates
+from .services.grade_totals import GradeDeltas, apply_grade_deltas, result_state, student_gpas
+from .services.slot_index import invalidate_slot_index
+from .services.grading import invalidate_grading_scheme
+from .services.rosters import invalidate_course_rosters, invalidate_semester_rosters
+from .services.attendance_stats import invalidate_attendance_stats
+from .services.class_sessions import regenerate_timetable
+from .services.transcripts import mark_transcripts_stale
 from students.models import Student
 from datetime import timedelta
 
-# GPA calculate
+# GPA (read from the running grade-point totals)
 def compute_gpa(student):
-    pts = []
-    for r in student.results.all():
-        pct = r.percentage
-        if pct >= 85:
-            pts.append(4.0)
-        elif pct >= 75:
-            pts.append(3.5)
-        elif pct >= 65:
-            pts.append(3.0)
-        elif pct >= 55:
-            pts.append(2.5)
-        elif pct >= 50:
-            pts.append(2.0)
-        else:
-            pts.append(0.0)
-    return round(sum(pts) / len(pts), 2) if pts else 0.0
-
-# Attendance %
+    return student_gpas([student.pk]).get(student.pk, 0.0)
+
+# Attendance % (read from the maintained counters)
 def compute_attendance_rate(student):
-    total = student.attendances.count()
-    if total == 0:
-        return 0.0
-    present = student.attendances.filter(status=Attendance.PRESENT).count()
-    return round((present / total) * 100, 2)
+    return attendance_rates([student.pk]).get(student.pk, 0.0)
 
 # Refresh student AI fields
 def refresh_student_ai(student):
@@ -38,69 +29,170 @@ def refresh_student_ai(student):
     student.gpa = compute_gpa(student)
     student.save(update_fields=["attendance_percentage", "gpa"])
 
-# Signals to update GPA & Attendance automatically
-@receiver(post_save, sender=Attendance)
-@receiver(post_save, sender=Result)
+# Signals to update GPA & Attendance automatically.
+# Only the student id is queued here; the recompute runs once per student on commit.
+@receiver([post_save, post_delete], sender=Attendance)
+@receiver([post_save, post_delete], sender=Result)
 def update_student_ai(sender, instance, **kwargs):
-    refresh_student_ai(instance.student)
+    mark_students_dirty([instance.student_id])
 
-# Update student data when scholarship M2M changes
-@receiver(m2m_changed, sender=Scholarship.students.through)
-def update_student_scholarship(sender, instance, **kwargs):
-    if hasattr(instance, 'students'):
-        for student in instance.students.all():
-            refresh_student_ai(student)
+# Attendance counters: remember the loaded state so saves can apply a transition delta
+def _counter_state(instance):
+    values = instance.__dict__
+    return values.get('student_id'), values.get('course_id'), values.get('status')
+
+@receiver(post_init, sender=Attendance)
+def remember_attendance_state(sender, instance, **kwargs):
+    instance._counter_state = _counter_state(instance) if instance.pk else None
+    instance._counter_day = instance.__dict__.get('date') if instance.pk else None
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_counters(sender, instance, created, **kwargs):
+    new_state = _counter_state(instance)
+    old_state = None if created else getattr(instance, '_counter_state', None)
+    old_day = None if created else getattr(instance, '_counter_day', None)
+    if old_state == new_state and old_day == instance.date:
+        return
+    deltas = CounterDeltas(days=[old_day, instance.date])
+    if old_state is not None and old_state[0]:
+        deltas.add(*old_state, sign=-1)
+    deltas.add(*new_state, sign=1)
+    apply_deltas(deltas)
+    instance._counter_state = new_state
+    instance._counter_day = instance.date
+
+@receiver(post_delete, sender=Attendance)
+def remove_attendance_from_counters(sender, instance, **kwargs):
+    state = getattr(instance, '_counter_state', None) or _counter_state(instance)
+    deltas = CounterDeltas(days=[instance.date])
+    deltas.add(*state, sign=-1)
+    apply_deltas(deltas, create_missing=False)
+
+# Grade totals: same pattern as the attendance counters, keyed on the result's grade points
+@receiver(post_init, sender=Result)
+def remember_result_state(sender, instance, **kwargs):
+    instance._grade_state = result_state(instance) if instance.pk else None
 
-# Signal for final result submission, CGPA calculation, and promotion
 @receiver(post_save, sender=Result)
-def handle_final_result_submission(sender, instance, created, **kwargs):
-    """
-    When a final result is saved, check if all finals for the semester are submitted.
-    If yes, calculate semester GPA, update CGPA, create history, and promote if passed.
-    """
-    if not instance.exam_type or 'final' not in instance.exam_type.lower():
+def update_grade_totals(sender, instance, created, **kwargs):
+    new_state = result_state(instance)
+    old_state = None if created else getattr(instance, '_grade_state', None)
+    if old_state == new_state:
+        return
+    deltas = GradeDeltas()
+    deltas.transition(old_state if old_state and old_state[0] else None, new_state)
+    apply_grade_deltas(deltas)
+    instance._grade_state = new_state
+
+@receiver(post_delete, sender=Result)
+def remove_result_from_totals(sender, instance, **kwargs):
+    state = getattr(instance, '_grade_state', None) or result_state(instance)
+    deltas = GradeDeltas()
+    deltas.add(*state, sign=-1)
+    apply_grade_deltas(deltas, create_missing=False)
+
+# Weekly slot index: rebuild after any timetable change (course rows carry the names it shows)
+@receiver([post_save, post_delete], sender=Timetable)
+@receiver([post_save, post_delete], sender=Course)
+def refresh_slot_index(sender, instance, **kwargs):
+    invalidate_slot_index()
+
+# Grading scheme: recompile after a scheme or band changes (existing results wait for `regrade_results`)
+@receiver([post_save, post_delete], sender=GradingScheme)
+@receiver([post_save, post_delete], sender=GradeBand)
+def refresh_grading_scheme(sender, instance, **kwargs):
+    invalidate_grading_scheme()
+
+# Generated class sessions: re-expand an edited slot's upcoming occurrences
+@receiver(post_save, sender=Timetable)
+def refresh_class_sessions(sender, instance, **kwargs):
+    regenerate_timetable(instance.pk)
+
+# Attendance stats list every department and semester
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Semester)
+def refresh_attendance_stats(sender, instance, **kwargs):
+    invalidate_attendance_stats()
+
+# Roster cache: bump the semester/course roster versions a student appears in when it changes
+def _roster_state(instance):
+    values = instance.__dict__
+    return (values.get('semester_id'), values.get('department_id'), values.get('name'),
+            values.get('email'), str(values.get('image') or ''))
+
+@receiver(post_init, sender=Student)
+def remember_roster_state(sender, instance, **kwargs):
+    instance._roster_state = _roster_state(instance) if instance.pk else None
+
+@receiver(post_save, sender=Student)
+def refresh_student_rosters(sender, instance, created, **kwargs):
+    old_state = None if created else getattr(instance, '_roster_state', None)
+    new_state = _roster_state(instance)
+    if old_state == new_state:
         return
+    invalidate_semester_rosters([new_state[0], old_state[0] if old_state else None])
+    if old_state is None or old_state[:2] != new_state[:2]:
+        # Student counts per department/semester changed
+        invalidate_attendance_stats()
+    if not created:
+        invalidate_course_rosters(instance.courses.values_list('pk', flat=True))
+    instance._roster_state = new_state
 
-    student = instance.student
-    semester = instance.course.semester if instance.course else None
-    if not semester or semester != student.semester:
+@receiver(pre_delete, sender=Student)
+def drop_student_from_rosters(sender, instance, **kwargs):
+    invalidate_semester_rosters([instance.semester_id])
+    invalidate_course_rosters(instance.courses.values_list('pk', flat=True))
+    invalidate_attendance_stats()
+
+@receiver(m2m_changed, sender=Student.courses.through)
+def refresh_course_rosters(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
         return
+    if reverse:
+        invalidate_course_rosters([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_course_rosters(instance.courses.values_list('pk', flat=True))
+    else:
+        invalidate_course_rosters(pk_set or [])
+
+# Student transcripts: bump the generation of every transcript whose results page a write changes
+@receiver([post_save, post_delete], sender=Result)
+def refresh_result_transcript(sender, instance, **kwargs):
+    mark_transcripts_stale([instance.student_id])
 
-    # Check if all courses for the semester have final results
-    semester_courses = semester.courses.all()
-    final_results = Result.objects.filter(
-        student=student,
-        course__in=semester_courses,
-        exam_type__icontains='final'
-    )
-
-    if final_results.count() != semester_courses.count():
-        return  # Not all finals submitted yet
-
-    # All finals submitted, calculate semester GPA
-    semester_gpa = compute_gpa(student)
-
-    # Update student GPA and CGPA
-    student.gpa = semester_gpa
-    student.previous_cgpa = student.cgpa
-    student.cgpa = (student.previous_cgpa + semester_gpa) / 2
-    student.save(update_fields=['gpa', 'cgpa', 'previous_cgpa'])
-
-    # Create academic history record
-    StudentAcademicHistory.objects.create(
-        student=student,
-        semester=semester,
-        gpa=semester_gpa,
-        cgpa=student.cgpa
-    )
-
-    # Check if passed (no F grades and GPA >= 2.0)
-    failing_results = final_results.filter(grade='F')
-    if failing_results.exists() or semester_gpa < 2.0:
-        return  # Not passed, no promotion
-
-    # Promote to next semester
-    next_semester = student.get_next_semester()
-    if next_semester:
-        student.semester = next_semester
-        student.save()
\ No newline at end of file
+@receiver(post_save, sender=Student)
+def refresh_student_transcript(sender, instance, created, **kwargs):
+    if not created:
+        mark_transcripts_stale([instance.pk])
+
+@receiver(m2m_changed, sender=Student.courses.through)
+def refresh_course_transcripts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        mark_transcripts_stale([instance.pk])
+    elif action == 'pre_clear':
+        mark_transcripts_stale(instance.students.values('pk'))
+    else:
+        mark_transcripts_stale(pk_set or [])
+
+@receiver([post_save, pre_delete], sender=Course)
+def refresh_course_student_transcripts(sender, instance, **kwargs):
+    students = Student.objects.filter(Q(courses=instance) | Q(results__course=instance))
+    mark_transcripts_stale(students.values('pk'))
+
+# Promotion status depends on the names of the department's semesters
+@receiver([post_save, pre_delete], sender=Semester)
+def refresh_semester_transcripts(sender, instance, **kwargs):
+    students = Student.objects.filter(Q(semester=instance) | Q(department_id=instance.department_id))
+    mark_transcripts_stale(students.values('pk'))
+
+@receiver([post_save, pre_delete], sender=Department)
+def refresh_department_transcripts(sender, instance, **kwargs):
+    mark_transcripts_stale(Student.objects.filter(department=instance).values('pk'))
+
+# Update student data when scholarship M2M changes
+@receiver(m2m_changed, sender=Scholarship.students.through)
+def update_student_scholarship(sender, instance, **kwargs):
+    if hasattr(instance, 'students'):
+        mark_students_dirty(instance.students.values_list('student_id', flat=True))
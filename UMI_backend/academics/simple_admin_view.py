@@ -2,56 +2,47 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.db import IntegrityError
 from .models import AttendanceEditPermission
+from .permissions import IsAdminRoleOrReadOnly
+from .services.admin_attendance import InvalidCursor
+from .services.edit_permissions import permission_page, permission_queue, queue_entry, review_permissions
 
 
 class SimpleAdminPermissionsView(APIView):
     """
-    Simple admin view to get attendance edit requests
+    Simple admin view to get attendance edit requests.
+
+    Requests come back newest first, one keyset page at a time
+    (``page_size``, ``cursor``), optionally filtered by ``status``.
     """
     permission_classes = [IsAuthenticated]
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
 
     def get(self, request):
         try:
-            permissions = AttendanceEditPermission.objects.all().order_by('-requested_at')
-            
-            permissions_data = []
-            for perm in permissions:
-                permissions_data.append({
-                    'id': perm.permission_id,
-                    'instructor': {
-                        'id': perm.instructor.id,
-                        'name': perm.instructor.name,
-                        'email': 'instructor@example.com'
-                    },
-                    'student': {
-                        'id': perm.attendance.student.student_id,
-                        'name': perm.attendance.student.name
-                    },
-                    'course': {
-                        'id': 'N/A',
-                        'name': 'General',
-                        'code': 'N/A'
-                    },
-                    'timetable': {
-                        'day': 'Today',
-                        'time': 'N/A',
-                        'room': 'N/A'
-                    },
-                    'date': perm.attendance.date,
-                    'current_status': perm.attendance.status,
-                    'proposed_status': perm.proposed_status,
-                    'reason': perm.reason,
-                    'requested_at': perm.requested_at,
-                    'status': perm.status
-                })
+            try:
+                page_size = min(int(request.query_params.get('page_size', self.DEFAULT_PAGE_SIZE)), self.MAX_PAGE_SIZE)
+            except ValueError:
+                return Response({'error': 'page_size must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            page_size = max(page_size, 1)
+            cursor = request.query_params.get('cursor')
+
+            permissions = permission_queue(request.query_params.get('status'))
+            page, next_cursor = permission_page(permissions, cursor=cursor, page_size=page_size)
+            permissions_data = [queue_entry(perm) for perm in page]
             
             return Response({
                 'pending_requests': permissions_data,
                 'requests': permissions_data,
-                'total_count': permissions.count()
+                'total_count': permissions.count(),
+                'next_cursor': next_cursor,
+                'page_size': page_size
             })
             
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -77,4 +68,48 @@ class SimpleAdminPermissionsView(APIView):
             return Response({'message': f'Request {action}d successfully'})
             
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AdminAttendancePermissionsBulkView(APIView):
+    """
+    POST /api/academics/admin/attendance/permissions/bulk/
+    Approve or reject many edit requests at once:
+    {"permission_ids": [...], "action": "approve" | "reject", "admin_notes": ""}
+    Approving applies each request's proposed status. Requests that are
+    no longer pending are reported back as skipped. Admins only.
+    """
+    permission_classes = [IsAdminRoleOrReadOnly]
+
+    def post(self, request):
+        try:
+            permission_ids = request.data.get('permission_ids')
+            action = request.data.get('action')
+            admin_notes = request.data.get('admin_notes', '')
+
+            if not permission_ids or not action:
+                return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(permission_ids, list):
+                return Response({'error': 'permission_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+            if action not in ('approve', 'reject'):
+                return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                permission_ids = [int(pid) for pid in permission_ids]
+            except (TypeError, ValueError):
+                return Response({'error': 'permission_ids must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
+            reviewed, skipped = review_permissions(
+                permission_ids, action, reviewer=request.user, admin_notes=admin_notes
+            )
+            return Response({
+                'message': f'{len(reviewed)} request(s) {action}d',
+                'action': action,
+                'reviewed': reviewed,
+                'skipped': skipped
+            })
+
+        except IntegrityError:
+            return Response({'error': 'An instructor already has a reviewed request with this outcome for one of these records'},
+                            status=status.HTTP_409_CONFLICT)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
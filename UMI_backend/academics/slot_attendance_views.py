@@ -4,9 +4,11 @@ from rest_framework import status
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Timetable, Attendance, AttendanceEditPermission
-from students.models import Student
 from instructors.models import Instructor
 from .permissions import IsAdminOrInstructorForResultsAttendance
+from .services.attendance import write_attendance
+from .services.class_sessions import day_entries, marking_open, open_entries, scheduled_on
+from .services.slot_index import get_slot_index, slot_status
 
 class SlotBasedAttendanceView(APIView):
     """
@@ -30,63 +32,31 @@ class SlotBasedAttendanceView(APIView):
             if timetable.instructor != instructor:
                 return Response({'error': 'Unauthorized to mark attendance for this class'}, status=status.HTTP_403_FORBIDDEN)
             
-            # Check if within time slot (allow 15 minutes before and after)
-            current_time = timezone.now().time()
-            current_day = timezone.now().strftime('%A').lower()
-            
-            if timetable.day != current_day:
+            # Check if within time slot (allow 15 minutes before and 30 after), from the generated
+            # class sessions when there are any
+            now = timezone.now()
+            if not scheduled_on(timetable, now.date()):
                 return Response({'error': 'Attendance can only be marked on the scheduled day'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Allow marking 15 minutes before start and 30 minutes after end
-            start_buffer = (datetime.combine(datetime.today(), timetable.start_time) - timedelta(minutes=15)).time()
-            end_buffer = (datetime.combine(datetime.today(), timetable.end_time) + timedelta(minutes=30)).time()
-            
-            if not (start_buffer <= current_time <= end_buffer):
+            if not marking_open(timetable, now, before=15, after=30):
+                start_buffer = (datetime.combine(now.date(), timetable.start_time) - timedelta(minutes=15)).time()
+                end_buffer = (datetime.combine(now.date(), timetable.end_time) + timedelta(minutes=30)).time()
                 return Response({
                     'error': f'Attendance can only be marked between {start_buffer} and {end_buffer}',
-                    'current_time': current_time.strftime('%H:%M')
+                    'current_time': now.strftime('%H:%M')
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             today = timezone.now().date()
-            marked_count = 0
-            updated_count = 0
-            
-            for item in attendance_data:
-                student_id = item.get('student_id')
-                attendance_status = item.get('status')
-                
-                student = Student.objects.get(student_id=student_id)
-                
-                # Check if attendance already exists for this slot
-                attendance, created = Attendance.objects.get_or_create(
-                    student=student,
-                    course=timetable.course,
-                    instructor=instructor,
-                    timetable=timetable,
-                    date=today,
-                    defaults={
-                        'status': attendance_status,
-                        'marked_by': instructor,
-                        'is_submitted': False,
-                        'can_edit': True
-                    }
-                )
-                
-                if not created:
-                    # Check if already submitted
-                    if attendance.is_submitted and not attendance.admin_approved_edit:
-                        continue  # Skip if submitted and no admin approval
-                    
-                    # Update if not submitted or admin approved
-                    if not attendance.is_submitted or attendance.admin_approved_edit:
-                        attendance.status = attendance_status
-                        attendance.marked_by = instructor
-                        if attendance.admin_approved_edit:
-                            attendance.admin_approved_edit = False  # Reset after use
-                        attendance.save()
-                        updated_count += 1
-                else:
-                    marked_count += 1
+            result = write_attendance(
+                attendance_data,
+                date=today,
+                instructor=instructor,
+                timetable=timetable,
+                consume_approval=True,
+                strict=True,
+            )
+            marked_count = len(result.created)
+            updated_count = len(result.updated)
             
             return Response({
                 'message': f'Attendance processed: {marked_count} new, {updated_count} updated',
@@ -193,49 +163,39 @@ class GetInstructorSlotsView(APIView):
             if not instructor:
                 return Response({'error': 'User is not an instructor'}, status=status.HTTP_403_FORBIDDEN)
             
-            current_time = timezone.now().time()
-            current_day = timezone.now().strftime('%A').lower()
-            
-            # Get slots for today
-            today_slots = Timetable.objects.filter(
-                instructor=instructor,
-                day=current_day
-            ).order_by('start_time')
+            now = timezone.now()
+            current_time = now.time()
+            current_day = now.strftime('%A').lower()
+            today = now.date()
+            
+            # Today's agenda and the slots open for marking (15 min before start to 30 min after end)
+            # (generated class sessions for semesters that have them, the weekly slot index otherwise)
+            today_slots = day_entries(today, get_slot_index().day_agenda(now.weekday(), instructor.pk),
+                                      instructor_id=instructor.pk)
+            active_ids = {
+                slot.timetable_id for slot in open_entries(now, instructor_id=instructor.pk, before=15, after=30)
+            }
+            # Roster sizes from the roster cache, submission flags for the whole agenda in one query
+            statuses = slot_status(today_slots, today)
             
             slots_data = []
             for slot in today_slots:
-                # Check if currently active (within time range)
-                start_buffer = (datetime.combine(datetime.today(), slot.start_time) - timedelta(minutes=15)).time()
-                end_buffer = (datetime.combine(datetime.today(), slot.end_time) + timedelta(minutes=30)).time()
-                is_active = start_buffer <= current_time <= end_buffer
-                
-                # Get students for this slot
-                students = Student.objects.filter(
-                    department=slot.department,
-                    semester=slot.semester
-                )
-                
-                # Check if attendance already submitted for today
-                today = timezone.now().date()
-                submitted_attendance = Attendance.objects.filter(
-                    timetable=slot,
-                    date=today,
-                    is_submitted=True
-                ).exists()
+                is_active = slot.timetable_id in active_ids
+                students_count, submitted_attendance = statuses.get(slot.timetable_id, (0, False))
                 
                 slots_data.append({
                     'timetable_id': slot.timetable_id,
                     'course': {
-                        'id': slot.course.course_id,
-                        'name': slot.course.name,
-                        'code': slot.course.code
+                        'id': slot.course_id,
+                        'name': slot.course_name,
+                        'code': slot.course_code
                     },
-                    'department': slot.department.name,
-                    'semester': slot.semester.name,
+                    'department': slot.department_name,
+                    'semester': slot.semester_name,
                     'time_slot': f"{slot.start_time} - {slot.end_time}",
                     'room': slot.room,
                     'is_active': is_active,
-                    'students_count': students.count(),
+                    'students_count': students_count,
                     'attendance_submitted': submitted_attendance,
                     'can_mark': is_active and not submitted_attendance
                 })
@@ -123,3 +123,1870 @@ class DepartmentAPITestCase(APITestCase):
         url = reverse('department-detail', kwargs={'pk': self.department.pk})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AttendanceFixtures(TestCase):
+    """Department, semesters, course, Monday 9-10 slot and a three-student roster; no tests of its own."""
+
+    def setUp(self):
+        from datetime import time
+        from instructors.models import Instructor
+        from students.models import Student
+        from .models import Semester, Course, Timetable
+
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        self.semester = Semester.objects.create(
+            name='Semester 1', semester_code='CS-SEM1', program='BCS', department=self.department
+        )
+        self.other_semester = Semester.objects.create(
+            name='Semester 2', semester_code='CS-SEM2', program='BCS', department=self.department
+        )
+        self.course = Course.objects.create(name='Intro to CS', code='CS101', semester=self.semester)
+        user = User.objects.create_user(username='teacher', password='teacherpass', role='instructor')
+        self.instructor = Instructor.objects.create(user=user, name='Teacher', phone='123', specialization='CS')
+        self.timetable = Timetable.objects.create(
+            course=self.course, instructor=self.instructor, day='monday',
+            start_time=time(9, 0), end_time=time(10, 0)
+        )
+        self.students = [
+            Student.objects.create(
+                student_id=f'cs00{i}', name=f'Student {i}', email=f's{i}@example.com',
+                department=self.department, semester=self.semester
+            )
+            for i in range(1, 4)
+        ]
+        self.outsider = Student.objects.create(
+            student_id='cs009', name='Outsider', email='out@example.com',
+            department=self.department, semester=self.other_semester
+        )
+
+    def _write(self, marks, **kwargs):
+        from datetime import date
+        from .services.attendance import write_attendance
+        kwargs.setdefault('timetable', self.timetable)
+        kwargs.setdefault('semester', self.semester)
+        return write_attendance(marks, date=date(2025, 9, 1), instructor=self.instructor, **kwargs)
+
+
+class AttendanceWriteServiceTestCase(AttendanceFixtures):
+    def test_creates_then_updates_rows(self):
+        from .models import Attendance
+        marks = [{'student_id': s.student_id, 'status': 'Present'} for s in self.students]
+        result = self._write(marks)
+        self.assertEqual(len(result.created), 3)
+        self.assertEqual(Attendance.objects.count(), 3)
+
+        marks[0]['status'] = 'Absent'
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self._write(marks)
+        self.assertEqual(len(result.created), 0)
+        self.assertEqual(len(result.updated), 3)
+        self.assertEqual(Attendance.objects.get(student=self.students[0]).status, 'Absent')
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].attendance_percentage, 0.0)
+
+    def test_submitted_rows_are_locked_until_approved(self):
+        from .models import Attendance
+        marks = [{'student_id': s.student_id, 'status': 'Present'} for s in self.students]
+        self._write(marks)
+        Attendance.objects.update(is_submitted=True, can_edit=False)
+        Attendance.objects.filter(student=self.students[0]).update(
+            is_submitted=False, can_edit=True, admin_approved_edit=True
+        )
+
+        result = self._write([{'student_id': s.student_id, 'status': 'Late'} for s in self.students],
+                             consume_approval=True)
+        self.assertEqual(result.updated, [self.students[0].student_id])
+        self.assertEqual(len(result.locked), 2)
+        row = Attendance.objects.get(student=self.students[0])
+        self.assertEqual(row.status, 'Late')
+        self.assertFalse(row.admin_approved_edit)
+
+    def test_rejects_unknown_and_unenrolled_students(self):
+        from students.models import Student
+        result = self._write([
+            {'student_id': 'nobody', 'status': 'Present'},
+            {'student_id': self.outsider.student_id, 'status': 'Present'},
+        ])
+        self.assertEqual(result.missing, ['nobody'])
+        self.assertEqual(len(result.not_enrolled), 1)
+        self.assertEqual(result.marked_count, 0)
+        with self.assertRaises(Student.DoesNotExist):
+            self._write([{'student_id': 'nobody', 'status': 'Present'}], strict=True)
+
+    def test_roster_write_uses_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as single:
+            self._write([{'student_id': self.students[0].student_id, 'status': 'Present'}])
+        with CaptureQueriesContext(connection) as roster:
+            self._write([{'student_id': s.student_id, 'status': 'Present'} for s in self.students[1:]])
+        self.assertEqual(len(single.captured_queries), len(roster.captured_queries))
+
+class StudentMetricsFixtures(TestCase):
+    """One student in one course; no tests of its own."""
+
+    def setUp(self):
+        from students.models import Student
+        from .models import Semester, Course
+
+        self.department = Department.objects.create(name='Computer Science', code='CS')
+        semester = Semester.objects.create(
+            name='Semester 1', semester_code='CS-SEM1', program='BCS', department=self.department
+        )
+        self.course = Course.objects.create(name='Intro to CS', code='CS101', semester=semester)
+        self.student = Student.objects.create(
+            student_id='cs001', name='Student 1', email='s1@example.com',
+            department=self.department, semester=semester
+        )
+
+    def _attend(self, day, status_value):
+        from datetime import date
+        from .models import Attendance
+        return Attendance.objects.create(
+            student=self.student, course=self.course, date=date(2025, 9, day), status=status_value
+        )
+
+
+class StudentMetricsQueueTestCase(StudentMetricsFixtures):
+    def test_signals_coalesce_into_one_refresh_on_commit(self):
+        from .models import GradeTotals
+        GradeTotals.objects.create(student=self.student)  # steady state: the student's totals row exists
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._attend(1, 'Present')
+            self._attend(2, 'Absent')
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 0.0)
+
+        # One metrics refresh (3 queries) and one upsert of both dirty days
+        with self.assertNumQueries(4):
+            for callback in callbacks:
+                callback()
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 50.0)
+
+    def test_drain_command_recomputes_queued_students(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.test import override_settings
+        from .models import DirtyStudent
+
+        with override_settings(STUDENT_METRICS_QUEUE=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._attend(1, 'Present')
+        self.assertTrue(DirtyStudent.objects.filter(student_id='cs001').exists())
+
+        call_command('refresh_student_metrics', stdout=StringIO())
+        self.assertFalse(DirtyStudent.objects.exists())
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 100.0)
+
+
+class AttendanceCounterTestCase(StudentMetricsFixtures):
+    def _counter(self):
+        from .models import AttendanceCounter, CourseAttendanceCounter
+        student = AttendanceCounter.objects.get(student=self.student)
+        course = CourseAttendanceCounter.objects.get(student=self.student, course=self.course)
+        return (
+            (student.total, student.present, student.late, student.absent),
+            (course.total, course.present, course.late, course.absent),
+        )
+
+    def test_counters_follow_inserts_transitions_and_deletes(self):
+        first = self._attend(1, 'Present')
+        self._attend(2, 'Absent')
+        self.assertEqual(self._counter(), ((2, 1, 0, 1), (2, 1, 0, 1)))
+
+        first.status = 'Late'
+        first.save()
+        self.assertEqual(self._counter(), ((2, 0, 1, 1), (2, 0, 1, 1)))
+
+        first.save()
+        self.assertEqual(self._counter(), ((2, 0, 1, 1), (2, 0, 1, 1)))
+
+        first.delete()
+        self.assertEqual(self._counter(), ((1, 0, 0, 1), (1, 0, 0, 1)))
+
+    def test_rebuild_command_reconciles_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import AttendanceCounter
+
+        self._attend(1, 'Present')
+        self._attend(2, 'Present')
+        AttendanceCounter.objects.filter(student=self.student).update(total=10, present=0)
+
+        call_command('rebuild_attendance_counters', stdout=StringIO())
+        self.assertEqual(self._counter(), ((2, 2, 0, 0), (2, 2, 0, 0)))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attendance_percentage, 100.0)
+
+
+class GradeTotalsFixtures(StudentMetricsFixtures):
+    def _result(self, mid_marks, course=None):
+        from .models import Result
+        return Result.objects.create(
+            student=self.student, course=course or self.course, exam_type='Mid', mid_term_marks=mid_marks
+        )
+
+    def _totals(self):
+        from .models import GradeTotals, SemesterGradeTotals
+        overall = GradeTotals.objects.get(student=self.student)
+        semester = SemesterGradeTotals.objects.get(student=self.student, semester=self.course.semester)
+        return (
+            (overall.grade_points, overall.result_count, overall.credit_points, overall.credits),
+            (semester.grade_points, semester.result_count, semester.credit_points, semester.credits),
+        )
+
+
+class GradeTotalsTestCase(GradeTotalsFixtures):
+    def test_totals_follow_inserts_grade_changes_and_deletes(self):
+        first = self._result(20)   # 80% -> 3.5
+        self._result(10)           # 40% -> 0.0
+        self.assertEqual(self._totals(), ((3.5, 2, 10.5, 6), (3.5, 2, 10.5, 6)))
+
+        first.mid_term_marks = 23  # 92% -> 4.0
+        first.save()
+        self.assertEqual(self._totals(), ((4.0, 2, 12.0, 6), (4.0, 2, 12.0, 6)))
+
+        first.delete()
+        self.assertEqual(self._totals(), ((0.0, 1, 0.0, 3), (0.0, 1, 0.0, 3)))
+
+    def test_gpa_read_is_a_single_query(self):
+        from .signals_updated import compute_gpa
+
+        self._result(20)
+        self._result(14)           # 56% -> 2.5
+        with self.assertNumQueries(1):
+            self.assertEqual(compute_gpa(self.student), 3.0)
+
+    def test_verify_command_reports_and_fixes_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import GradeTotals
+
+        self._result(20)
+        out = StringIO()
+        call_command('verify_grade_totals', stdout=out)
+        self.assertIn('match a full recompute', out.getvalue())
+
+        GradeTotals.objects.filter(student=self.student).update(grade_points=9, result_count=4)
+        out = StringIO()
+        call_command('verify_grade_totals', stdout=out)
+        self.assertIn('1 students have drifted totals', out.getvalue())
+        self.assertEqual(GradeTotals.objects.get(student=self.student).result_count, 4)
+
+        call_command('verify_grade_totals', '--fix', stdout=StringIO())
+        self.assertEqual(self._totals()[0], (3.5, 1, 10.5, 3))
+
+
+class GradingSchemeTestCase(GradeTotalsFixtures):
+    def tearDown(self):
+        from .services.grading import invalidate_grading_scheme
+        invalidate_grading_scheme()  # the rolled-back scheme must not outlive the test in this process
+        super().tearDown()
+
+    def _activate(self, bands, name='Strict'):
+        from .models import GradeBand, GradingScheme
+        GradingScheme.objects.filter(is_active=True).update(is_active=False)
+        scheme = GradingScheme.objects.create(name=name, is_active=True)
+        for grade, minimum, points in bands:
+            GradeBand.objects.create(scheme=scheme, grade=grade, min_percentage=minimum, points=points)
+        return scheme
+
+    def test_compiled_lookup_matches_the_old_ladder(self):
+        from .services.grading import DEFAULT_BANDS, CompiledScheme
+
+        scheme = CompiledScheme(DEFAULT_BANDS)
+        shares = [100, 90, 89.99, 85, 80, 79.5, 60, 50, 45, 40, 39.99, 0]
+        self.assertEqual(
+            scheme.grade_many(shares), ['A+', 'A+', 'A', 'A', 'A-', 'B+', 'C+', 'C-', 'D+', 'D', 'F', 'F']
+        )
+        self.assertEqual(scheme.points_many([92, 80, 56, 40]), [4.0, 3.5, 2.5, 0.0])
+        self.assertEqual(scheme.points_for_grade(' b+ '), 3.5)
+        self.assertEqual(scheme.points_for_grade('Z'), 0.0)
+
+    def test_results_are_graded_by_the_active_scheme(self):
+        self.assertEqual(self._result(20).grade, 'A-')   # 80%
+        self._activate([('P', 70, 4.0), ('F', 0, 0.0)])
+        self.assertEqual(self._result(20).grade, 'P')
+        self.assertEqual(self._result(15).grade, 'F')    # 60%
+        self.assertEqual(self._totals()[0], (4.0 + 3.5 + 0.0, 3, 22.5, 9))
+
+    def test_regrade_command_updates_grades_totals_and_gpa(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import Result
+        from .services.grade_totals import verify_totals
+
+        for marks in (23, 20, 14, 11, 0):   # 92%, 80%, 56%, 44%, 0%
+            self._result(marks)
+        self._activate([('A', 80, 4.0), ('B', 55, 3.0), ('F', 0, 0.0)])
+
+        out = StringIO()
+        call_command('regrade_results', '--dry-run', stdout=out)
+        self.assertIn('4 results would be regraded', out.getvalue())
+        self.assertEqual(Result.objects.filter(grade='A').count(), 0)
+
+        out = StringIO()
+        call_command('regrade_results', '--batch-size', '10', stdout=out)
+        self.assertIn('Regraded 4 results', out.getvalue())
+        self.assertEqual(
+            sorted(Result.objects.values_list('grade', flat=True)), ['A', 'A', 'B', 'F', 'F']
+        )
+        self.assertEqual(self._totals()[0], (11.0, 5, 33.0, 15))
+        self.assertEqual(verify_totals([self.student.pk]), [])
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.gpa, 2.2)
+
+
+class MarksImportTestCase(AttendanceFixtures):
+    HEADER = (
+        'student_id,course,exam_type,quiz1_marks,quiz2_marks,'
+        'assignment1_marks,assignment2_marks,mid_term_marks,final_marks\n'
+    )
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _import(self, lines, **kwargs):
+        from .services.marks_import import import_marks
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_marks(self.HEADER + '\n'.join(lines) + '\n', **kwargs)
+
+    def test_import_creates_updates_and_keeps_totals_in_step(self):
+        from .models import Result
+        from .services.grade_totals import verify_totals
+
+        summary = self._import([
+            'cs001,CS101,Mid,,,,,20,',
+            'cs002,cs101,Mid,,,,,14,',
+            'cs003,%d,Quiz 1,4,,,,,' % self.course.pk,
+        ])
+        self.assertEqual((summary['created'], summary['updated'], summary['errors']), (3, 0, []))
+        grades = dict(Result.objects.values_list('student_id', 'grade'))
+        self.assertEqual(grades, {'cs001': 'A-', 'cs002': 'C', 'cs003': 'A-'})
+        ids = [s.student_id for s in self.students]
+        self.assertEqual(verify_totals(ids), [])
+
+        summary = self._import(['cs001,CS101,mid,,,,,23,'])
+        self.assertEqual((summary['created'], summary['updated']), (0, 1))
+        result = Result.objects.get(student_id='cs001')
+        self.assertEqual((result.obtained_marks, result.grade, result.exam_type), (23, 'A+', 'Mid'))
+        self.assertEqual(verify_totals(ids), [])
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].gpa, 4.0)
+
+    def test_any_invalid_row_rejects_the_file(self):
+        from .models import Result
+
+        summary = self._import([
+            'cs001,CS101,Mid,,,,,20,',
+            'cs009,CS101,Mid,,,,,20,',
+            'cs002,NOPE,Mid,,,,,20,',
+            'cs003,CS101,Mid,,,,,30,',
+            'cs001,CS101,MID,,,,,10,',
+        ])
+        self.assertEqual([error['line'] for error in summary['errors']], [3, 4, 5, 6])
+        self.assertIn('not on the roster', summary['errors'][0]['error'])
+        self.assertIn('Duplicate of line 2', summary['errors'][3]['error'])
+        self.assertFalse(Result.objects.exists())
+
+    def test_unicode_digit_course_is_an_invalid_row(self):
+        summary = self._import(['cs001,²,Mid,,,,,20,', 'cs002,٣,Mid,,,,,20,'])
+        self.assertEqual([error['error'] for error in summary['errors']], ['Unknown course ²', 'Unknown course ٣'])
+
+    def test_final_results_wait_for_the_semester_close(self):
+        from .models import StudentAcademicHistory
+        from .services.semester_results import close_semesters
+
+        self._import(['cs001,CS101,Final,5,5,5,5,25,55'])
+        self.assertFalse(StudentAcademicHistory.objects.exists())
+        close_semesters([self.semester.pk])
+        history = StudentAcademicHistory.objects.get(student_id='cs001')
+        self.assertEqual((history.semester_id, history.gpa), (self.semester.pk, 4.0))
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].semester, self.other_semester)
+
+    def test_api_limits_instructors_to_their_courses(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from rest_framework.test import APIClient
+        from .models import Course, Result
+
+        Course.objects.create(name='Databases', code='CS201', semester=self.semester)
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        url = '/api/academics/results/import/'
+
+        upload = SimpleUploadedFile('marks.csv', (self.HEADER + 'cs001,CS201,Mid,,,,,20,\n').encode())
+        response = client.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('do not teach CS201', response.data['errors'][0]['error'])
+
+        upload = SimpleUploadedFile('marks.csv', (self.HEADER + 'cs001,CS101,Mid,,,,,20,\n').encode())
+        response = client.post(url, {'file': upload, 'dry_run': 'true'}, format='multipart')
+        self.assertEqual((response.status_code, response.data['created']), (status.HTTP_200_OK, 1))
+        self.assertFalse(Result.objects.exists())
+
+        upload = SimpleUploadedFile('marks.csv', (self.HEADER + 'cs001,CS101,Mid,,,,,20,\n').encode())
+        response = client.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Result.objects.get().grade, 'A-')
+
+        response = client.post(url, {'csv': 'student_id,course\n'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Missing columns: exam_type', response.data['error'])
+
+
+class GradebookTestCase(AttendanceFixtures):
+    url = '/api/academics/courses/%d/gradebook/'
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _client(self, user=None):
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(user or self.instructor.user)
+        return client
+
+    def test_grid_is_one_query_over_the_roster(self):
+        from .models import Result
+        from .services.gradebook import gradebook
+
+        Result.objects.create(student=self.students[0], course=self.course, exam_type='Final',
+                              quiz1_marks=4, mid_term_marks=20, final_marks=50)
+        Result.objects.create(student=self.students[0], course=self.course, exam_type='Mid', mid_term_marks=10)
+        with self.assertNumQueries(1):
+            grid = gradebook(self.course)
+        self.assertEqual([row['student_id'] for row in grid['students']], ['cs001', 'cs002', 'cs003'])
+        first = grid['students'][0]
+        self.assertEqual((first['cells'], first['obtained_marks']), ([4, 0, 0, 0, 20, 50], 74))
+        self.assertEqual(grid['students'][1]['cells'], [None] * 6)
+        self.assertEqual([c['max_marks'] for c in grid['components']], [5, 5, 5, 5, 25, 60])
+
+    def test_sparse_diff_is_applied_in_one_transaction(self):
+        from .models import Result
+        from .services.grade_totals import verify_totals
+
+        Result.objects.create(student=self.students[0], course=self.course, exam_type='Final', final_marks=50)
+        client = self._client()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(self.url % self.course.pk, {'cells': [
+                {'student_id': 'cs001', 'component': 'mid_term_marks', 'value': 25},
+                {'student_id': 'cs002', 'component': 'quiz1_marks', 'value': 5},
+                {'student_id': 'cs002', 'component': 'final_marks', 'value': 40},
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        first = Result.objects.get(student_id='cs001')
+        self.assertEqual(
+            (first.final_marks, first.mid_term_marks, first.obtained_marks, first.grade), (50, 25, 75, 'B+')
+        )
+        self.assertEqual(Result.objects.get(student_id='cs002').grade, 'D+')
+        self.assertEqual(verify_totals(['cs001', 'cs002']), [])
+        self.assertEqual(response.data['students'][1]['cells'], [5, 0, 0, 0, 0, 40])
+
+        response = client.patch(self.url % self.course.pk, {'cells': [
+            {'student_id': 'cs003', 'component': 'quiz1_marks', 'value': 5},
+            {'student_id': 'cs009', 'component': 'quiz1_marks', 'value': 5},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cs009 is not on the roster', response.data['error'])
+        self.assertFalse(Result.objects.filter(student_id='cs003').exists())
+
+        response = client.patch(self.url % self.course.pk, {'cells': [
+            {'student_id': 'cs003', 'component': 'mid_term_marks', 'value': 26},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_instructors_only_see_their_courses(self):
+        from instructors.models import Instructor
+
+        other = Instructor.objects.create(
+            user=User.objects.create_user(username='other', password='x', role='instructor'),
+            name='Other', phone='1', specialization='CS'
+        )
+        self.assertEqual(self._client(other.user).get(self.url % self.course.pk).status_code, 403)
+        self.assertEqual(self._client().get(self.url % 999).status_code, 404)
+        admin = User.objects.create_user(username='boss', password='x', is_staff=True)
+        self.assertEqual(self._client(admin).get(self.url % self.course.pk).status_code, 200)
+
+
+class StudentTranscriptTestCase(AttendanceFixtures):
+    url = '/api/academics/students/%s/results/professional/'
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+        self.student = self.students[0]
+
+    def _result(self, exam_type, mid_marks, course=None, **kwargs):
+        from .models import Result
+        return Result.objects.create(
+            student=self.student, course=course or self.course, exam_type=exam_type, mid_term_marks=mid_marks, **kwargs
+        )
+
+    def _second_course(self):
+        # Four credits, so the CGPA weighting shows
+        from .models import Course
+        return Course.objects.create(name='Databases', code='CS201', semester=self.semester, credits=4)
+
+    def _read(self):
+        from students.models import Student
+        from .services.transcripts import student_transcript
+        return student_transcript(Student.objects.select_related('transcript').get(pk=self.student.pk))
+
+    def test_fresh_transcript_is_one_read(self):
+        second = self._second_course()
+        self._result('Mid', 20)                # 80% -> 3.5 x 3 credits
+        self._result('Mid', 10, course=second)  # 40% -> 0.0 x 4 credits
+        transcript = self._read()
+        self.assertEqual((transcript.cgpa, transcript.total_credits, transcript.credit_points), (1.5, 7, 10.5))
+        self.assertEqual(transcript.semesters, [{
+            'semester_id': self.semester.pk, 'name': 'Semester 1', 'gpa': 1.75, 'cgpa': 1.5,
+            'credits': 7, 'result_count': 2,
+        }])
+        self.assertEqual(transcript.promotion['status'], 'pending')
+        with self.assertNumQueries(1):
+            self.assertFalse(self._read().is_stale)
+
+    def test_writes_mark_the_transcript_stale(self):
+        from .models import StudentTranscript
+        from .services.marks_import import MarksRow, save_marks
+
+        self._second_course()
+        result = self._result('Mid', 20)
+        self._read()
+        result.mid_term_marks = 25
+        result.save()
+        self.assertTrue(StudentTranscript.objects.get(pk=self.student.pk).is_stale)
+        self.assertEqual(self._read().cgpa, 4.0)
+
+        save_marks([(MarksRow(1, self.student.pk, 'CS101', 'Mid', None, {'mid_term_marks': 10}), self.course)])
+        self.assertTrue(StudentTranscript.objects.get(pk=self.student.pk).is_stale)
+        self.assertEqual(self._read().cgpa, 0.0)
+
+        self.other_semester.name = 'Semester 3'
+        self.other_semester.save()
+        self.assertTrue(StudentTranscript.objects.get(pk=self.student.pk).is_stale)
+
+    def test_promotion_status(self):
+        second = self._second_course()
+        self._result('Final', 20)
+        self.assertEqual(self._read().promotion['next_semester_id'], self.other_semester.pk)
+
+        self.student.semester = self.other_semester
+        self.student.save()
+        self.assertEqual(self._read().promotion['status'], 'current')
+
+        from datetime import date
+        for day in (1, 2, 3):
+            self._result('Final', 0, course=second, exam_date=date(2025, 6, day))
+        self.assertEqual(self._read().promotion['status'], 'dropped')
+
+    def test_results_page_answers_if_none_match(self):
+        from rest_framework.test import APIClient
+
+        self._second_course()
+        self._result('Mid', 20)
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        response = client.get(self.url % self.student.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cgpa'], {'cgpa': 3.5, 'total_credits': 3, 'grade_points': 10.5})
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = client.get(self.url % self.student.pk, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.student.courses.add(self.course)
+        response = client.get(self.url % self.student.pk, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['assigned_courses']), 1)
+
+
+class SemesterCloseTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _final(self, student, final_marks):
+        from .models import Result
+        return Result.objects.create(
+            student=student, course=self.course, exam_type='Final',
+            quiz1_marks=5, quiz2_marks=5, assignment1_marks=5, assignment2_marks=5, mid_term_marks=20,
+            final_marks=final_marks,
+        )
+
+    def _placements(self):
+        from students.models import Student
+        return dict(Student.objects.filter(pk__in=['cs001', 'cs002', 'cs003']).values_list('pk', 'semester_id'))
+
+    def test_close_records_history_and_promotes_in_bulk(self):
+        from .models import StudentAcademicHistory
+        from .services.semester_results import close_semesters
+
+        self._final(self.students[0], 55)  # 95% -> A+
+        self._final(self.students[1], 0)   # 40% -> D, 0.0 points
+        self.assertFalse(StudentAcademicHistory.objects.exists())
+
+        summary = close_semesters([self.semester.pk], dry_run=True)
+        self.assertEqual((summary['students'], summary['completed'], summary['promoted']), (3, 2, 1))
+        self.assertFalse(StudentAcademicHistory.objects.exists())
+
+        # Grouped reads, one UPDATE per distinct GPA vector and one history upsert
+        with self.assertNumQueries(14):
+            close_semesters([self.semester.pk])
+        history = dict(StudentAcademicHistory.objects.values_list('student_id', 'gpa'))
+        self.assertEqual(history, {'cs001': 4.0, 'cs002': 0.0})
+        self.assertEqual(self._placements(), {
+            'cs001': self.other_semester.pk, 'cs002': self.semester.pk, 'cs003': self.semester.pk,
+        })
+        self.students[0].refresh_from_db()
+        self.assertEqual((self.students[0].gpa, self.students[0].cgpa), (4.0, 4.0))
+
+        # Closing again only revisits the students still placed in the semester
+        summary = close_semesters([self.semester.pk])
+        self.assertEqual((summary['completed'], summary['promoted']), (1, 0))
+        self.assertEqual(StudentAcademicHistory.objects.count(), 2)
+
+    def test_student_gpa_matches_the_metrics_refresh(self):
+        from .models import Course, Result, StudentAcademicHistory
+        from .services.semester_results import close_semesters
+        from .services.student_metrics import refresh_students
+
+        later = Course.objects.create(name='Algorithms', code='CS301', semester=self.other_semester)
+        Result.objects.create(student=self.students[0], course=later, exam_type='Mid', mid_term_marks=10)  # 0.0
+        self._final(self.students[0], 55)  # 4.0
+        close_semesters([self.semester.pk])
+        self.assertEqual(StudentAcademicHistory.objects.get(student_id='cs001').gpa, 4.0)
+        self.students[0].refresh_from_db()
+        self.assertEqual((self.students[0].gpa, self.students[0].cgpa), (2.0, 2.0))
+        self.assertEqual(self._placements()['cs001'], self.other_semester.pk)
+
+        refresh_students(['cs001'])
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].gpa, 2.0)
+
+    def test_failed_final_blocks_promotion(self):
+        from .models import Result
+        from .services.semester_results import close_semesters
+
+        # A stored F (say from an older scheme) blocks promotion even with a passing GPA
+        result = self._final(self.students[0], 55)
+        Result.objects.filter(pk=result.pk).update(grade='F')
+        self.assertEqual(close_semesters([self.semester.pk])['promoted'], 0)
+        self.assertEqual(self._placements()['cs001'], self.semester.pk)
+
+    def test_command_reports_progress_per_department(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import Semester
+
+        other = Department.objects.create(name='Mathematics', code='MA')
+        Semester.objects.create(name='Semester 1', semester_code='MA-SEM1', program='BMA', department=other)
+        self._final(self.students[0], 55)
+        out = StringIO()
+        call_command('close_semesters', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], f'[1/2] department {self.department.pk}: 1 of 4 students completed, 1 promoted')
+        self.assertTrue(lines[1].startswith(f'[2/2] department {other.pk}: 0 of 0'))
+        self.assertIn('Completed 1 students in 3 semesters across 2 departments', lines[2])
+
+    def test_api_is_admin_only(self):
+        from rest_framework.test import APIClient
+
+        self._final(self.students[0], 55)
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        url = '/api/academics/results/semester-close/'
+        self.assertEqual(client.post(url, {'semester_id': self.semester.pk}).status_code, 403)
+
+        client.force_authenticate(User.objects.create_user(username='boss', password='x', is_staff=True))
+        self.assertEqual(client.post(url, {}).status_code, 400)
+        self.assertEqual(client.post(url, {'semester_id': 999}).status_code, 404)
+        response = client.post(url, {'department_id': self.department.pk, 'dry_run': 'true'})
+        self.assertEqual((response.data['completed'], response.data['promoted']), (1, 1))
+        self.assertEqual(self._placements()['cs001'], self.semester.pk)
+        response = client.post(url, {'semester_id': self.semester.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._placements()['cs001'], self.other_semester.pk)
+
+
+class SlotIndexTestCase(AttendanceFixtures):
+    def test_active_slots_and_buffers(self):
+        from .services.slot_index import get_slot_index
+
+        index = get_slot_index()
+        self.assertEqual([s.timetable_id for s in index.active(0, 9 * 60 + 30)], [self.timetable.timetable_id])
+        self.assertEqual(index.active(0, 10 * 60 + 20), [])
+        self.assertEqual(len(index.active(0, 10 * 60 + 20, after=30)), 1)
+        self.assertEqual(len(index.active(0, 8 * 60 + 50, instructor_id=self.instructor.pk, before=15)), 1)
+        self.assertEqual(index.active(1, 9 * 60 + 30), [])
+
+    def test_timetable_changes_invalidate_the_index(self):
+        from datetime import time
+        from .models import Timetable
+        from .services.slot_index import get_slot_index
+
+        self.assertEqual(get_slot_index().day_agenda(1, self.instructor.pk), [])
+        Timetable.objects.create(
+            course=self.course, instructor=self.instructor, day='tuesday',
+            start_time=time(11, 0), end_time=time(12, 0)
+        )
+        self.assertEqual(len(get_slot_index().day_agenda(1, self.instructor.pk)), 1)
+
+        self.timetable.delete()
+        self.assertEqual(get_slot_index().day_agenda(0, self.instructor.pk), [])
+
+    def test_roster_counts_and_submission_flags_in_one_query(self):
+        from datetime import date
+        from .models import Attendance
+        from django.core.cache import cache
+        from .services.slot_index import get_slot_index, slot_status
+
+        cache.clear()
+        self._write([{'student_id': self.students[0].student_id, 'status': 'Present'}])
+        Attendance.objects.update(is_submitted=True)
+        slots = get_slot_index().day_agenda(0, self.instructor.pk)
+        slot_status(slots, date(2025, 9, 1))  # warm the roster cache
+        with self.assertNumQueries(1):
+            statuses = slot_status(slots, date(2025, 9, 1))
+        self.assertEqual(statuses, {self.timetable.timetable_id: (3, True)})
+        self.assertEqual(slot_status(slots, date(2025, 9, 2)), {self.timetable.timetable_id: (3, False)})
+
+
+class RosterCacheTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def test_semester_roster_is_cached_until_a_student_moves(self):
+        from .services.rosters import semester_roster
+
+        roster = semester_roster(self.semester.pk)
+        self.assertEqual([s.student_id for s in roster], ['cs001', 'cs002', 'cs003'])
+        with self.assertNumQueries(0):
+            self.assertEqual(semester_roster(self.semester.pk), roster)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.outsider.semester = self.semester
+            self.outsider.save()
+            # Until the move commits, readers keep the old version
+            self.assertEqual(len(semester_roster(self.semester.pk)), 3)
+        self.assertEqual(len(semester_roster(self.semester.pk)), 4)
+        self.assertEqual(semester_roster(self.other_semester.pk), ())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[0].name = 'Renamed'
+            self.students[0].save()
+        names = {s.student_id: s.name for s in semester_roster(self.semester.pk)}
+        self.assertEqual(names['cs001'], 'Renamed')
+
+    def test_course_roster_follows_enrolment_changes(self):
+        from .services.rosters import course_roster
+
+        self.assertEqual(course_roster(self.course.pk), ())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[0].courses.add(self.course)
+            self.course.students.add(self.students[1])
+        self.assertEqual([s.student_id for s in course_roster(self.course.pk)], ['cs001', 'cs002'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[0].courses.clear()
+        self.assertEqual([s.student_id for s in course_roster(self.course.pk)], ['cs002'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students[1].delete()
+        self.assertEqual(course_roster(self.course.pk), ())
+
+
+class HotQueryBenchmarkTestCase(TestCase):
+    def test_benchmark_command_reports_and_rolls_back(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import Attendance
+
+        out = StringIO()
+        call_command('benchmark_hot_queries', students=20, days=5, runs=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('slot submitted today', output)
+        self.assertIn('pending edit queue', output)
+        self.assertIn('rolled back', output)
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AttendanceIngestQueueTestCase(AttendanceFixtures):
+    def test_worker_applies_marks_then_submit_in_order(self):
+        from datetime import date
+        from .models import Attendance, AttendanceIngestBatch
+        from .services.attendance_ingest import enqueue_marks, enqueue_submit, flush_ingest_queue
+
+        day = date(2025, 9, 1)
+        marks = enqueue_marks(
+            [{'student_id': s.student_id, 'status': 'Present'} for s in self.students],
+            timetable=self.timetable, instructor=self.instructor, date=day,
+        )
+        submit = enqueue_submit(timetable=self.timetable, instructor=self.instructor, date=day)
+        self.assertFalse(Attendance.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_ingest_queue(), 2)
+
+        marks.refresh_from_db()
+        submit.refresh_from_db()
+        self.assertEqual((marks.status, marks.result['marked']), (AttendanceIngestBatch.APPLIED, 3))
+        self.assertEqual(submit.result, {'submitted': 3})
+        self.assertEqual(Attendance.objects.filter(is_submitted=True).count(), 3)
+        self.assertEqual(flush_ingest_queue(), 0)
+
+    def test_failed_batch_does_not_block_the_rest(self):
+        from datetime import date
+        from .models import Attendance, AttendanceIngestBatch
+        from .services.attendance_ingest import enqueue_marks, flush_ingest_queue
+
+        day = date(2025, 9, 1)
+        bad = AttendanceIngestBatch.objects.create(
+            kind=AttendanceIngestBatch.MARK, timetable=self.timetable, instructor=self.instructor,
+            date=day, payload='not a list of marks',
+        )
+        good = enqueue_marks([{'student_id': 'cs001', 'status': 'Late'}],
+                             timetable=self.timetable, instructor=self.instructor, date=day)
+        flush_ingest_queue()
+
+        bad.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(bad.status, AttendanceIngestBatch.FAILED)
+        self.assertTrue(bad.error)
+        self.assertEqual(good.status, AttendanceIngestBatch.APPLIED)
+        self.assertEqual(Attendance.objects.get().status, 'Late')
+
+    def test_status_endpoint_reports_position_and_result(self):
+        from datetime import date
+        from rest_framework.test import APIClient
+        from .services.attendance_ingest import enqueue_marks, flush_ingest_queue
+
+        day = date(2025, 9, 1)
+        first = enqueue_marks([{'student_id': 'cs001', 'status': 'Present'}],
+                              timetable=self.timetable, instructor=self.instructor, date=day)
+        second = enqueue_marks([{'student_id': 'cs002', 'status': 'Absent'}],
+                               timetable=self.timetable, instructor=self.instructor, date=day)
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        url = f'/api/academics/attendance/ingest/{second.batch_id}/'
+
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['status'], response.data['position']), ('queued', 1))
+
+        flush_ingest_queue()
+        response = client.get(url)
+        self.assertEqual(response.data['status'], 'applied')
+        self.assertEqual(response.data['result']['marked'], 1)
+        self.assertEqual(client.get(f'/api/academics/attendance/ingest/{first.batch_id + 100}/').status_code, 404)
+
+        client.force_authenticate(User.objects.create_user(username='pupil', password='x', role='student'))
+        self.assertEqual(client.get(url).status_code, 403)
+        client.force_authenticate(User.objects.create_user(username='boss', password='x', is_staff=True))
+        self.assertEqual(client.get(url).status_code, 200)
+
+    def test_slot_batches_wait_for_earlier_batches_held_elsewhere(self):
+        from datetime import date, time
+        from .models import Timetable
+        from .services.attendance_ingest import _in_slot_order, enqueue_marks, enqueue_submit
+
+        day = date(2025, 9, 1)
+        other = Timetable.objects.create(course=self.course, instructor=self.instructor, day='monday',
+                                         start_time=time(11, 0), end_time=time(12, 0))
+        held = enqueue_marks([{'student_id': 'cs001', 'status': 'Present'}],
+                             timetable=self.timetable, instructor=self.instructor, date=day)
+        submit = enqueue_submit(timetable=self.timetable, instructor=self.instructor, date=day)
+        free = enqueue_marks([{'student_id': 'cs002', 'status': 'Present'}],
+                             timetable=other, instructor=self.instructor, date=day)
+        # Another worker holds the first MARK: the SUBMIT behind it must wait
+        self.assertEqual(_in_slot_order([submit, free]), [free])
+        self.assertEqual(_in_slot_order([held, submit, free]), [held, submit, free])
+
+
+class AttendanceDraftTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def test_drafts_stay_unwritten_until_finalized(self):
+        from datetime import date
+        from .models import Attendance
+        from .services.attendance import finalize_attendance
+        from .services.attendance_drafts import draft_marks, get_draft, save_draft
+
+        day = date(2025, 9, 1)
+        result = save_draft([{'student_id': s.student_id, 'status': 'Present'} for s in self.students],
+                            timetable=self.timetable, date=day)
+        save_draft([{'student_id': 'cs002', 'status': 'Absent'}, {'student_id': 'cs009', 'status': 'Present'}],
+                   timetable=self.timetable, date=day)
+        self.assertEqual(result.marked_count, 3)
+        self.assertFalse(Attendance.objects.exists())
+
+        draft = get_draft(self.timetable, day)
+        self.assertEqual(draft, {'cs001': 'Present', 'cs002': 'Absent', 'cs003': 'Present'})
+
+        _, submitted = finalize_attendance(draft_marks(draft), timetable=self.timetable,
+                                           instructor=self.instructor, date=day, semester=self.semester)
+        self.assertEqual(submitted, 3)
+        self.assertEqual(Attendance.objects.filter(is_submitted=True, can_edit=False).count(), 3)
+        self.assertEqual(Attendance.objects.get(student_id='cs002').status, 'Absent')
+
+    def test_draft_survives_cache_loss_and_expires_as_a_whole(self):
+        from datetime import date, timedelta
+        from unittest import mock
+        from django.core.cache import cache
+        from django.utils import timezone
+        from .services.attendance_drafts import DRAFT_TTL, get_draft, save_draft
+
+        day = date(2025, 9, 1)
+        save_draft([{'student_id': 'cs001', 'status': 'Late'}], timetable=self.timetable, date=day)
+        # Another process (or a cache flush) still sees the same draft
+        cache.clear()
+        save_draft([{'student_id': 'cs002', 'status': 'Absent'}], timetable=self.timetable, date=day)
+        self.assertEqual(get_draft(self.timetable, day), {'cs001': 'Late', 'cs002': 'Absent'})
+
+        later = timezone.now() + timedelta(seconds=DRAFT_TTL + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(get_draft(self.timetable, day), {})
+            result = save_draft([{'student_id': 'cs003', 'status': 'Present'}], timetable=self.timetable, date=day)
+            self.assertEqual(result.created, ['cs003'])
+            self.assertEqual(get_draft(self.timetable, day), {'cs003': 'Present'})
+
+    def test_purge_command_deletes_only_expired_drafts(self):
+        from datetime import date, timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import AttendanceDraftMark
+        from .services.attendance_drafts import DRAFT_TTL, save_draft
+
+        stale, live = date(2025, 9, 1), date(2025, 9, 8)
+        save_draft([{'student_id': 'cs001', 'status': 'Late'}, {'student_id': 'cs002', 'status': 'Absent'}],
+                   timetable=self.timetable, date=stale)
+        save_draft([{'student_id': 'cs001', 'status': 'Present'}, {'student_id': 'cs002', 'status': 'Late'}],
+                   timetable=self.timetable, date=live)
+        expired = timezone.now() - timedelta(seconds=DRAFT_TTL + 1)
+        AttendanceDraftMark.objects.filter(date=stale).update(updated_at=expired)
+        # A live draft keeps its older marks: drafts expire as a whole
+        AttendanceDraftMark.objects.filter(date=live, student_id='cs001').update(updated_at=expired)
+
+        out = StringIO()
+        call_command('purge_attendance_drafts', batch_size=1, stdout=out)
+        self.assertIn('Deleted 2 expired draft marks', out.getvalue())
+        self.assertEqual(sorted(AttendanceDraftMark.objects.values_list('date', 'student_id')),
+                         [(live, 'cs001'), (live, 'cs002')])
+        call_command('purge_attendance_drafts', stdout=out)
+        self.assertIn('No expired drafts to delete.', out.getvalue())
+
+    def test_roster_read_merges_draft_over_persisted_rows(self):
+        from django.test import override_settings
+        from django.utils import timezone
+        from rest_framework.test import APIClient
+        from .services.attendance import write_attendance
+        from .services.attendance_drafts import save_draft
+
+        today = timezone.now().date()
+        write_attendance([{'student_id': 'cs001', 'status': 'Present'}], date=today,
+                         instructor=self.instructor, timetable=self.timetable)
+        save_draft([{'student_id': 'cs001', 'status': 'Late'}, {'student_id': 'cs002', 'status': 'Absent'}],
+                   timetable=self.timetable, date=today)
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        with override_settings(ATTENDANCE_DRAFTS=True):
+            response = client.get(f'/api/academics/attendance/timetable/{self.timetable.timetable_id}/students/')
+        rows = {row['student_id']: row for row in response.data['students']}
+        self.assertEqual((rows['cs001']['current_status'], rows['cs001']['is_draft']), ('Late', True))
+        self.assertEqual(rows['cs002']['current_status'], 'Absent')
+        self.assertEqual((rows['cs003']['is_marked'], rows['cs003']['is_draft']), (False, False))
+
+
+class AttendanceSyncTestCase(AttendanceFixtures):
+    def _batch(self, key, status_value='Present', day='2025-09-01'):
+        return {
+            'idempotency_key': key,
+            'timetable_id': self.timetable.timetable_id,
+            'date': day,
+            'marks': [{'student_id': s.student_id, 'status': status_value} for s in self.students],
+        }
+
+    def test_sync_applies_each_batch_once(self):
+        from rest_framework.test import APIClient
+        from .models import Attendance
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        payload = {'batches': [self._batch('k1'), self._batch('k2', 'Late'), self._batch('k1'),
+                               self._batch('k3', day='2025-09-02')]}
+        response = client.post('/api/academics/attendance/sync/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.data['results']], ['applied', 'applied', 'replayed', 'error'])
+        self.assertIn('monday', response.data['results'][3]['error'].lower())
+        self.assertEqual(Attendance.objects.filter(status='Late').count(), 3)
+
+        retry = client.post('/api/academics/attendance/sync/', {'batches': [self._batch('k2', 'Absent')]}, format='json')
+        self.assertEqual(retry.data['results'][0]['status'], 'replayed')
+        self.assertEqual(retry.data['results'][0]['updated'], 3)
+        self.assertFalse(Attendance.objects.filter(status='Absent').exists())
+
+    def test_retry_costs_one_lookup(self):
+        from .services.attendance_sync import sync_batches
+
+        sync_batches([self._batch('k1')], self.instructor)
+        with self.assertNumQueries(1):
+            results = sync_batches([self._batch('k1')], self.instructor)
+        self.assertEqual(results[0]['status'], 'replayed')
+
+
+class SessionAttendanceTestCase(AttendanceFixtures):
+    def test_pack_round_trip(self):
+        from .services.session_attendance import pack, unpack
+
+        statuses = {f'cs{i:03d}': ['Present', 'Late', 'Absent'][i % 3] for i in range(20)}
+        roster, bits = pack(statuses)
+        self.assertEqual(len(bits['present_bits']), 3)
+        self.assertEqual(unpack(roster, bits['present_bits'], bits['late_bits'], bits['absent_bits']), statuses)
+
+    def test_only_submitted_slots_before_the_cutoff_are_compacted(self):
+        from datetime import date
+        from .models import Attendance, SessionAttendance
+        from .services.attendance import write_attendance
+        from .services.attendance_stats import department_stats
+        from .services.session_attendance import convert_attendance, session_statuses, slot_submitted
+
+        marks = [{'student_id': s.student_id, 'status': 'Present'} for s in self.students]
+        old, still_open, recent = date(2025, 9, 1), date(2025, 9, 8), date(2025, 9, 15)
+        with self.captureOnCommitCallbacks(execute=True):
+            for day, submit in [(old, True), (still_open, False), (recent, True)]:
+                write_attendance(marks, date=day, instructor=self.instructor, timetable=self.timetable, submit=submit)
+            written, converted = convert_attendance(recent, delete_rows=True)
+        self.assertEqual((written, converted), (1, 3))
+        self.assertEqual(SessionAttendance.objects.get().date, old)
+        self.assertEqual(Attendance.objects.filter(date=old).count(), 0)
+        self.assertEqual(len(session_statuses(self.timetable, old)), 3)
+
+        # The compacted slot is read-only history and still counts in the stats
+        self.assertTrue(slot_submitted(self.timetable, old))
+        result = write_attendance([{'student_id': 'cs001', 'status': 'Absent'}], date=old,
+                                  instructor=self.instructor, timetable=self.timetable)
+        self.assertEqual((result.marked_count, len(result.locked)), (0, 1))
+        self.assertFalse(Attendance.objects.filter(date=old).exists())
+        stats = department_stats(old, old)[0]['semesters'][0]['attendance_stats']
+        self.assertEqual((stats['total_records'], stats['present']), (3, 3))
+        stats = department_stats()[0]['semesters'][0]['attendance_stats']
+        self.assertEqual(stats['total_records'], 9)
+
+    def test_conversion_skips_pending_requests_and_keeps_edit_history(self):
+        from datetime import date
+        from .models import ArchivedEditPermission, Attendance, AttendanceEditPermission, SessionStudentSpan
+        from .services.attendance import write_attendance
+        from .services.session_attendance import _sessions_for, convert_attendance, student_records
+
+        marks = [{'student_id': s.student_id, 'status': 'Present'} for s in self.students]
+        reviewed, pending = date(2025, 9, 1), date(2025, 9, 8)
+        for day in (reviewed, pending):
+            write_attendance(marks, date=day, instructor=self.instructor, timetable=self.timetable, submit=True)
+        approved = AttendanceEditPermission.objects.create(
+            instructor=self.instructor, attendance=Attendance.objects.get(date=reviewed, student_id='cs001'),
+            reason='typo', status='approved',
+        )
+        AttendanceEditPermission.objects.create(
+            instructor=self.instructor, attendance=Attendance.objects.get(date=pending, student_id='cs002'),
+            reason='late bus',
+        )
+
+        self.assertEqual(convert_attendance(date(2025, 10, 1), delete_rows=True), (1, 3))
+        self.assertEqual(Attendance.objects.filter(date=pending).count(), 3)
+        kept = ArchivedEditPermission.objects.get()
+        self.assertEqual((kept.permission_id, kept.status, kept.session.date), (approved.pk, 'approved', reviewed))
+
+        # Compact history is found through the per-student slot spans
+        span = SessionStudentSpan.objects.get(student_id='cs001')
+        self.assertEqual((span.timetable_id, span.first_date, span.last_date), (self.timetable.pk, reviewed, reviewed))
+        self.assertEqual(list(_sessions_for(['cs009'])), [])
+        self.assertEqual([r[0] for r in student_records('cs001')], [reviewed, pending])
+
+    def test_conversion_command_requires_a_past_cutoff(self):
+        from datetime import timedelta
+        from django.core.management import CommandError, call_command
+        from django.utils import timezone
+
+        with self.assertRaises(CommandError):
+            call_command('convert_attendance_to_sessions')
+        with self.assertRaises(CommandError):
+            call_command('convert_attendance_to_sessions',
+                         before=(timezone.now().date() + timedelta(days=1)).isoformat())
+
+    def test_conversion_with_row_deletion_keeps_counts(self):
+        from datetime import date
+        from .models import Attendance, AttendanceCounter, CourseAttendanceCounter, SessionAttendance
+        from .services.attendance import write_attendance
+        from .services.attendance_counters import rebuild_all_counters
+        from .services.session_attendance import convert_attendance, student_records
+
+        for day, value in [(date(2025, 9, 1), 'Present'), (date(2025, 9, 8), 'Absent')]:
+            write_attendance([{'student_id': s.student_id, 'status': value} for s in self.students],
+                             date=day, instructor=self.instructor, timetable=self.timetable, submit=True)
+        written, converted = convert_attendance(date(2025, 10, 1), batch_size=1, delete_rows=True)
+        self.assertEqual((written, converted), (2, 6))
+        self.assertFalse(Attendance.objects.exists())
+        self.assertTrue(all(s.compacted for s in SessionAttendance.objects.all()))
+
+        counter = AttendanceCounter.objects.get(student_id='cs001')
+        self.assertEqual((counter.total, counter.present, counter.absent), (2, 1, 1))
+        rebuild_all_counters(['cs001'])
+        counter = CourseAttendanceCounter.objects.get(student_id='cs001', course=self.course)
+        self.assertEqual((counter.total, counter.present, counter.absent), (2, 1, 1))
+        self.assertEqual([r[2] for r in student_records('cs001')], ['Present', 'Absent'])
+
+    def test_storage_benchmark_reports_and_rolls_back(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import SessionAttendance
+
+        out = StringIO()
+        call_command('benchmark_session_storage', students=30, days=5, runs=1, stdout=out)
+        self.assertIn('smaller', out.getvalue())
+        self.assertIn('one student history', out.getvalue())
+        self.assertFalse(SessionAttendance.objects.exists())
+
+    def test_roster_view_expands_compact_session(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework.test import APIClient
+        from .services.attendance import write_attendance
+        from .services.session_attendance import convert_attendance
+
+        today = timezone.now().date()
+        write_attendance([{'student_id': 'cs002', 'status': 'Late'}], date=today,
+                         instructor=self.instructor, timetable=self.timetable, submit=True)
+        convert_attendance(today + timedelta(days=1), delete_rows=True)
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        response = client.get(f'/api/academics/attendance/timetable/{self.timetable.timetable_id}/students/')
+        rows = {row['student_id']: row for row in response.data['students']}
+        self.assertEqual((rows['cs002']['current_status'], rows['cs002']['is_marked']), ('Late', True))
+        self.assertFalse(rows['cs001']['is_marked'])
+
+
+class AttendanceArchiveTestCase(AttendanceFixtures):
+    def _seed_closed_term(self):
+        from datetime import date
+        from .services.attendance import write_attendance
+
+        self.days = [date(2025, 1, 6), date(2025, 1, 13)]
+        for day, value in zip(self.days, ['Present', 'Absent']):
+            write_attendance([{'student_id': s.student_id, 'status': value} for s in self.students],
+                             date=day, instructor=self.instructor, timetable=self.timetable)
+
+    def _archive(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('archive_attendance', before='2025-06-01', stdout=out, **options)
+        return out.getvalue()
+
+    def test_table_archive_keeps_counters_and_reports(self):
+        from rest_framework.test import APIClient
+        from .models import ArchivedAttendance, ArchivedTerm, Attendance, AttendanceCounter, CourseAttendanceCounter
+        from .services.attendance_counters import rebuild_all_counters
+        from .services.session_attendance import student_records
+
+        self._seed_closed_term()
+        output = self._archive(batch_size=2)
+        self.assertIn('moved 6 rows', output)
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(ArchivedAttendance.objects.count(), 6)
+        self.assertEqual(ArchivedTerm.objects.get().status, ArchivedTerm.ARCHIVED)
+
+        counter = AttendanceCounter.objects.get(student_id='cs001')
+        self.assertEqual((counter.total, counter.present, counter.absent), (2, 1, 1))
+        rebuild_all_counters(['cs001'])
+        counter = CourseAttendanceCounter.objects.get(student_id='cs001', course=self.course)
+        self.assertEqual((counter.total, counter.present, counter.absent), (2, 1, 1))
+
+        self.assertEqual([r[2] for r in student_records('cs001')], ['Present', 'Absent'])
+        self.assertEqual(student_records('cs001', date_from=self.days[1]), [(self.days[1], self.course.pk, 'Absent')])
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        response = client.get('/api/academics/admin/attendance/', {'date': '2025-01-13'})
+        rows = response.data['organized_data']['Computer Science']['Semester 1']
+        self.assertEqual({row['attendance']['status'] for row in rows}, {'Absent'})
+        self.assertEqual(response.data['statistics']['absent'], 3)
+
+    def test_file_archive_dry_run_and_read_back(self):
+        import tempfile
+        from datetime import timedelta
+        from django.test import override_settings
+        from .models import ArchivedAttendance, Attendance
+        from .services.attendance_archive import archived_attendance
+
+        self._seed_closed_term()
+        with tempfile.TemporaryDirectory() as directory, override_settings(ATTENDANCE_ARCHIVE_DIR=directory):
+            self.assertIn('6 rows in 1 terms would be archived', self._archive(dry_run=True))
+            self.assertEqual(Attendance.objects.count(), 6)
+
+            self._archive(storage='file', batch_size=4)
+            self.assertFalse(Attendance.objects.exists())
+            self.assertFalse(ArchivedAttendance.objects.exists())
+            rows = archived_attendance(self.days[0], self.days[0], student_ids=['cs002'])
+            self.assertEqual([(row.status, row.student.name) for row in rows], [('Present', 'Student 2')])
+            self.assertEqual(archived_attendance(date_from=timedelta(days=1) + self.days[1]), [])
+
+    def test_pending_edit_request_keeps_term_live(self):
+        from .models import Attendance, AttendanceEditPermission
+
+        self._seed_closed_term()
+        AttendanceEditPermission.objects.create(
+            instructor=self.instructor, attendance=Attendance.objects.first(), reason='typo'
+        )
+        self.assertIn('No closed terms', self._archive())
+        self.assertEqual(Attendance.objects.count(), 6)
+
+    def test_reused_semester_archives_each_period_and_keeps_edit_history(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import ArchivedEditPermission, ArchivedTerm, Attendance, AttendanceEditPermission
+
+        self._seed_closed_term()
+        row = Attendance.objects.order_by('attendance_id').first()
+        AttendanceEditPermission.objects.create(
+            instructor=self.instructor, attendance=row, reason='typo', status='approved'
+        )
+        self.assertIn('moved 6 rows', self._archive())
+        kept = ArchivedEditPermission.objects.get()
+        self.assertEqual((kept.attendance_id, kept.status, kept.reason), (row.attendance_id, 'approved', 'typo'))
+
+        # The same semester comes round again the next year and is archived as a new term
+        self._write([{'student_id': 'cs001', 'status': 'Late'}])
+        call_command('archive_attendance', before='2025-10-01', stdout=StringIO())
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(
+            [(str(t.first_date), str(t.last_date), t.status) for t in ArchivedTerm.objects.order_by('first_date')],
+            [('2025-01-06', '2025-01-13', 'archived'), ('2025-09-01', '2025-09-01', 'archived')],
+        )
+
+
+class AdminAttendancePagingTestCase(AttendanceFixtures):
+    def _client(self):
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        return client
+
+    def test_cursor_pages_cover_every_student_once(self):
+        self._write([{'student_id': 'cs001', 'status': 'Present'}, {'student_id': 'cs002', 'status': 'Late'}])
+        client = self._client()
+        seen, statuses, cursor, pages = [], {}, None, 0
+        while True:
+            params = {'date': '2025-09-01', 'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            response = client.get('/api/academics/admin/attendance/', params)
+            self.assertEqual(response.status_code, 200)
+            if pages == 0:
+                self.assertEqual(response.data['statistics'],
+                                 {'total_students': 4, 'total_records': 2, 'present': 1, 'absent': 0, 'late': 1})
+            else:
+                self.assertIsNone(response.data['statistics'])
+            for semesters in response.data['organized_data'].values():
+                for entries in semesters.values():
+                    for entry in entries:
+                        seen.append(entry['student_id'])
+                        statuses[entry['student_id']] = entry['attendance']['status']
+            pages += 1
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(pages, 2)
+        self.assertEqual(sorted(seen), ['cs001', 'cs002', 'cs003', 'cs009'])
+        self.assertEqual((statuses['cs002'], statuses['cs003']), ('Late', 'Not Marked'))
+
+    def test_page_query_count_does_not_grow_with_students(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from students.models import Student
+
+        self._write([{'student_id': s.student_id, 'status': 'Present'} for s in self.students])
+        client = self._client()
+        with CaptureQueriesContext(connection) as small:
+            client.get('/api/academics/admin/attendance/', {'date': '2025-09-01'})
+        for i in range(10, 30):
+            Student.objects.create(student_id=f'cs{i:03d}', name=f'Extra {i}', email=f'x{i}@example.com',
+                                   department=self.department, semester=self.semester)
+        with CaptureQueriesContext(connection) as large:
+            client.get('/api/academics/admin/attendance/', {'date': '2025-09-01'})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_stream_returns_pages_then_statistics(self):
+        import json
+
+        response = self._client().get('/api/academics/admin/attendance/', {'stream': 'true', 'page_size': 3})
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1]['statistics']['total_students'], 4)
+
+    def test_bad_cursor_is_rejected(self):
+        response = self._client().get('/api/academics/admin/attendance/', {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceStatsTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        from .services.attendance_stats import _pending_days
+        cache.clear()
+        _pending_days().clear()  # days queued by rolled-back writes in earlier tests
+        super().setUp()
+
+    def _semester_stats(self, **window):
+        from .services.attendance_stats import department_stats
+
+        stats = department_stats(**window)
+        return {sem['semester_code']: sem for dept in stats for sem in dept['semesters']}
+
+    def test_grouped_stats_are_cached_until_the_next_write(self):
+        from datetime import date
+        from .services.attendance import write_attendance
+
+        self._write([{'student_id': 'cs001', 'status': 'Present'}, {'student_id': 'cs002', 'status': 'Absent'}])
+        stats = self._semester_stats()
+        self.assertEqual(stats['CS-SEM1']['total_students'], 3)
+        self.assertEqual(stats['CS-SEM1']['attendance_stats']['attendance_rate'], 50.0)
+        self.assertEqual(stats['CS-SEM2']['attendance_stats']['total_records'], 0)
+        with self.assertNumQueries(0):
+            self._semester_stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write_attendance([{'student_id': 'cs003', 'status': 'Late'}], date=date(2025, 9, 8),
+                             instructor=self.instructor, timetable=self.timetable)
+        self.assertEqual(self._semester_stats()['CS-SEM1']['attendance_stats']['late'], 1)
+
+    def test_date_window_reads_daily_buckets(self):
+        from datetime import date
+        from .models import AttendanceDailyBucket, AttendanceStatsDirtyDay
+        from .services.attendance import write_attendance
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for day, value in [(date(2025, 9, 1), 'Present'), (date(2025, 9, 8), 'Absent')]:
+                write_attendance([{'student_id': s.student_id, 'status': value} for s in self.students],
+                                 date=day, instructor=self.instructor, timetable=self.timetable)
+            # Marked only after the write commits, outside its transaction
+            self.assertEqual(AttendanceStatsDirtyDay.objects.count(), 0)
+        self.assertEqual(AttendanceStatsDirtyDay.objects.count(), 2)
+
+        window = self._semester_stats(date_from=date(2025, 9, 5), date_to=date(2025, 9, 30))
+        self.assertEqual(window['CS-SEM1']['attendance_stats']['absent'], 3)
+        self.assertEqual(window['CS-SEM1']['attendance_stats']['total_records'], 3)
+        self.assertEqual(list(AttendanceStatsDirtyDay.objects.values_list('date', flat=True)), [date(2025, 9, 1)])
+        self.assertEqual(AttendanceDailyBucket.objects.get().absent, 3)
+
+    def test_window_counts_days_held_by_another_refresh_live(self):
+        from datetime import date
+        from unittest import mock
+        from .models import AttendanceDailyBucket
+        from .services.attendance import write_attendance
+        from .services.attendance_stats import refresh_buckets
+
+        with self.captureOnCommitCallbacks(execute=True):
+            write_attendance([{'student_id': 'cs001', 'status': 'Late'}], date=date(2025, 9, 1),
+                             instructor=self.instructor, timetable=self.timetable)
+        # Another request has claimed the day: this read neither waits nor rewrites its buckets
+        with mock.patch('academics.services.attendance_stats.refresh_buckets', return_value=0):
+            window = self._semester_stats(date_from=date(2025, 9, 1), date_to=date(2025, 9, 1))
+        self.assertEqual(window['CS-SEM1']['attendance_stats']['late'], 1)
+        self.assertFalse(AttendanceDailyBucket.objects.exists())
+
+        self.assertEqual(refresh_buckets(), 1)
+        self.assertEqual(refresh_buckets(), 0)
+        self.assertEqual(AttendanceDailyBucket.objects.get().late, 1)
+
+    def test_stats_view_rejects_bad_window(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        self.assertEqual(client.get('/api/academics/admin/attendance/stats/', {'date_from': 'x'}).status_code, 400)
+        response = client.get('/api/academics/admin/attendance/stats/', {'date_from': '2025-01-01'})
+        self.assertEqual(response.data['department_stats'][0]['department_code'], 'CS')
+
+
+class AttendanceRegisterExportTestCase(AttendanceFixtures):
+    def _export(self, **params):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        return client.get('/api/academics/admin/attendance/register/export/', {'year': 2025, 'month': 9, **params})
+
+    def _seed_month(self):
+        from datetime import date
+        from .services.attendance import write_attendance
+        from .services.session_attendance import convert_attendance
+
+        self._write([{'student_id': 'cs001', 'status': 'Present'}, {'student_id': 'cs002', 'status': 'Absent'}])
+        write_attendance([{'student_id': 'cs001', 'status': 'Late'}], date=date(2025, 9, 8),
+                         instructor=self.instructor, timetable=self.timetable)
+        write_attendance([{'student_id': 'cs003', 'status': 'Present'}], date=date(2025, 9, 15),
+                         instructor=self.instructor, timetable=self.timetable, submit=True)
+        convert_attendance(date(2025, 9, 16), delete_rows=True)
+
+    def test_csv_register_matrix(self):
+        import csv
+
+        self._seed_month()
+        response = self._export(semester_id=self.semester.pk)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows[0]), 2 + 30 + 5)
+        by_id = {row[0]: row for row in rows[1:]}
+        self.assertEqual(sorted(by_id), ['cs001', 'cs002', 'cs003'])
+        self.assertEqual((by_id['cs001'][2], by_id['cs001'][9]), ('P', 'L'))
+        self.assertEqual(by_id['cs001'][-5:], ['1', '1', '0', '2', '50.0'])
+        self.assertEqual(by_id['cs003'][16], 'P')
+
+    def test_xlsx_register_is_a_valid_workbook(self):
+        import io
+        import zipfile
+
+        self._seed_month()
+        response = self._export(file_type='xlsx')
+        workbook = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 5)
+        self.assertIn('<t>cs009</t>', sheet)
+
+    def test_register_requires_month(self):
+        self.assertEqual(self._export(month=13).status_code, 400)
+        self.assertEqual(self._export(file_type='pdf').status_code, 400)
+
+
+class AttendanceReportMatrixTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _report(self, headers=None, **params):
+        from rest_framework.test import APIClient
+
+        query = {'department_id': self.department.pk, 'semester_id': self.semester.pk, 'year': 2025, 'month': 9,
+                 **params}
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        return client.get('/api/instructors/attendance/reports/', query, **(headers or {}))
+
+    def test_matrix_sends_axes_once(self):
+        from datetime import date
+        from .services.attendance import write_attendance
+
+        self._write([{'student_id': 'cs001', 'status': 'Present'}, {'student_id': 'cs002', 'status': 'Late'}])
+        write_attendance([{'student_id': 'cs001', 'status': 'Absent'}], date=date(2025, 9, 8),
+                         instructor=self.instructor, timetable=self.timetable)
+
+        response = self._report(format='matrix')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dates'], ['2025-09-01', '2025-09-08'])
+        rows = dict(zip([sid for sid, _ in response.data['students']], response.data['statuses']))
+        self.assertEqual(rows, {'cs001': 'PA', 'cs002': 'L-', 'cs003': '--'})
+
+        listing = self._report()
+        self.assertEqual(len(listing.data), 3)
+        self.assertEqual(listing.data[0]['date'], '2025-09-08')
+
+    def test_etag_revalidation(self):
+        self._write([{'student_id': 'cs001', 'status': 'Present'}])
+        etag = self._report(format='matrix')['ETag']
+        self.assertNotEqual(etag, self._report()['ETag'])
+        self.assertEqual(self._report({'HTTP_IF_NONE_MATCH': etag}, format='matrix').status_code, 304)
+
+        self._write([{'student_id': 'cs002', 'status': 'Absent'}])
+        self.assertEqual(self._report({'HTTP_IF_NONE_MATCH': etag}, format='matrix').status_code, 200)
+
+
+class EditPermissionQueueTestCase(AttendanceFixtures):
+    def _requests(self, *proposals):
+        from .models import Attendance, AttendanceEditPermission
+
+        self._write([{'student_id': s.student_id, 'status': 'Present'} for s in self.students], submit=True)
+        rows = {row.student_id: row for row in Attendance.objects.all()}
+        return [
+            AttendanceEditPermission.objects.create(
+                instructor=self.instructor, attendance=rows[student_id], reason='typo', proposed_status=proposed
+            )
+            for student_id, proposed in proposals
+        ]
+
+    def _client(self, user=None):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user or self.instructor.user)
+        return client
+
+    def _admin_client(self):
+        from django.contrib.auth import get_user_model
+
+        self.admin = get_user_model().objects.create_user(username='registrar', password='x', is_staff=True)
+        return self._client(self.admin)
+
+    def test_submitted_records_flag_pending_requests(self):
+        self._requests(('cs001', 'Absent'))
+        response = self._client().get('/api/academics/attendance/submitted/')
+        flags = {row['student_id']: row['can_request_edit'] for row in response.data['records']}
+        self.assertEqual(flags, {'cs001': False, 'cs002': True, 'cs003': True})
+
+    def test_queue_pages_with_cursor(self):
+        requests = self._requests(('cs001', 'Absent'), ('cs002', 'Late'), ('cs003', None))
+        client = self._client()
+        first = client.get('/api/academics/admin/attendance/permissions/', {'page_size': 2})
+        self.assertEqual(first.data['total_count'], 3)
+        second = client.get('/api/academics/admin/attendance/permissions/',
+                            {'page_size': 2, 'cursor': first.data['next_cursor']})
+        self.assertIsNone(second.data['next_cursor'])
+        seen = [row['id'] for row in first.data['requests'] + second.data['requests']]
+        self.assertEqual(seen, sorted((r.permission_id for r in requests), reverse=True))
+        self.assertEqual(first.data['requests'][0]['course']['code'], 'CS101')
+
+        bad = client.get('/api/academics/admin/attendance/permissions/', {'cursor': 'nope'})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_bulk_approve_applies_proposed_status(self):
+        from .models import Attendance, AttendanceCounter, AttendanceEditPermission, AttendanceStatsDirtyDay
+
+        requests = self._requests(('cs001', 'Absent'), ('cs002', None))
+        AttendanceStatsDirtyDay.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._admin_client().post('/api/academics/admin/attendance/permissions/bulk/', {
+                'permission_ids': [r.permission_id for r in requests] + [999], 'action': 'approve'
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['skipped'], [999])
+
+        rows = {row.student_id: row for row in Attendance.objects.all()}
+        self.assertEqual(rows['cs001'].status, 'Absent')
+        self.assertEqual(rows['cs002'].status, 'Present')
+        self.assertTrue(rows['cs001'].admin_approved_edit and rows['cs002'].admin_approved_edit)
+        self.assertFalse(rows['cs003'].admin_approved_edit)
+        counter = AttendanceCounter.objects.get(student_id='cs001')
+        self.assertEqual((counter.total, counter.present, counter.absent), (1, 0, 1))
+        self.assertTrue(AttendanceStatsDirtyDay.objects.exists())
+
+        reviewed = AttendanceEditPermission.objects.filter(status='approved')
+        self.assertEqual(reviewed.count(), 2)
+        self.assertTrue(all(p.reviewed_by_id == self.admin.pk and p.reviewed_at for p in reviewed))
+
+    def test_bulk_reject_leaves_attendance(self):
+        from .models import Attendance
+
+        requests = self._requests(('cs001', 'Absent'))
+        client = self._admin_client()
+        payload = {'permission_ids': [requests[0].permission_id], 'action': 'reject', 'admin_notes': 'no'}
+        response = client.post('/api/academics/admin/attendance/permissions/bulk/', payload, format='json')
+        self.assertEqual(response.data['reviewed'], [requests[0].permission_id])
+        row = Attendance.objects.get(student_id='cs001')
+        self.assertEqual((row.status, row.admin_approved_edit), ('Present', False))
+
+        again = client.post('/api/academics/admin/attendance/permissions/bulk/', payload, format='json')
+        self.assertEqual(again.data['skipped'], [requests[0].permission_id])
+        invalid = client.post('/api/academics/admin/attendance/permissions/bulk/',
+                              {**payload, 'action': 'delete'}, format='json')
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_bulk_review_is_admin_only(self):
+        from .models import Attendance, AttendanceEditPermission
+
+        requests = self._requests(('cs001', 'Absent'))
+        response = self._client().post('/api/academics/admin/attendance/permissions/bulk/', {
+            'permission_ids': [requests[0].permission_id], 'action': 'approve'
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(AttendanceEditPermission.objects.get().status, 'pending')
+        self.assertEqual(Attendance.objects.get(student_id='cs001').status, 'Present')
+
+
+class SelfCheckInTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _token(self, now):
+        from .services.self_checkin import issue_token, open_slot
+        from .services.slot_index import invalidate_slot_index
+
+        invalidate_slot_index()
+        entry = open_slot(self.timetable.pk, self.instructor.pk, now=now)
+        return issue_token(entry, now=now)[0]
+
+    def _monday(self, hour, minute):
+        from datetime import datetime, timezone as tz
+        return datetime(2025, 9, 1, hour, minute, tzinfo=tz.utc)
+
+    def test_token_only_during_window(self):
+        from .services.self_checkin import open_slot
+        from .services.slot_index import invalidate_slot_index
+
+        invalidate_slot_index()
+        self.assertIsNotNone(open_slot(self.timetable.pk, self.instructor.pk, now=self._monday(8, 50)))
+        self.assertIsNotNone(open_slot(self.timetable.pk, self.instructor.pk, now=self._monday(10, 25)))
+        self.assertIsNone(open_slot(self.timetable.pk, self.instructor.pk, now=self._monday(10, 35)))
+
+    def test_token_checks(self):
+        from datetime import timedelta
+        from .services.self_checkin import CheckInError, verify_token
+
+        now = self._monday(9, 2)
+        token = self._token(now)
+        timetable_id, semester_id, day, status_value = verify_token(token, now=now)
+        self.assertEqual((timetable_id, semester_id, str(day), status_value),
+                         (self.timetable.pk, self.semester.pk, '2025-09-01', 'Present'))
+        with self.assertRaises(CheckInError):
+            verify_token(token, now=now + timedelta(minutes=5))
+        with self.assertRaises(CheckInError):
+            verify_token(token[:-2] + 'xx', now=now)
+        late = self._token(self._monday(9, 20))
+        self.assertEqual(verify_token(late, now=self._monday(9, 20))[3], 'Late')
+
+    def test_check_ins_are_buffered_then_flushed(self):
+        from .models import Attendance, AttendanceCheckIn
+        from .services.self_checkin import CheckInError, check_in, flush_checkins
+
+        now = self._monday(9, 2)
+        token = self._token(now)
+        self._write([{'student_id': 'cs003', 'status': 'Absent'}])
+        for student_id in ('cs001', 'cs001', 'cs002', 'cs003'):
+            check_in(token, student_id, now=now)
+        with self.assertRaises(CheckInError):
+            check_in(token, 'cs009', now=now)
+        self.assertEqual(AttendanceCheckIn.objects.count(), 3)
+
+        self.assertEqual(flush_checkins(), 2)
+        self.assertFalse(AttendanceCheckIn.objects.exists())
+        statuses = dict(Attendance.objects.values_list('student_id', 'status'))
+        self.assertEqual(statuses, {'cs001': 'Present', 'cs002': 'Present', 'cs003': 'Absent'})
+
+    def test_endpoint(self):
+        from unittest import mock
+        from rest_framework.test import APIClient
+        from .models import AttendanceCheckIn
+
+        now = self._monday(9, 2)
+        token = self._token(now)
+        student_user = User.objects.create_user(username='cs001', password='pass', role='student')
+        self.students[0].user = student_user
+        self.students[0].save()
+
+        client = APIClient()
+        client.force_authenticate(student_user)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            response = client.post('/api/academics/attendance/checkin/', {'token': token}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(AttendanceCheckIn.objects.get().student_id, 'cs001')
+
+        client.force_authenticate(self.instructor.user)
+        response = client.post('/api/academics/attendance/checkin/', {'token': token}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class AttendanceComplianceTestCase(AttendanceFixtures):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        super().setUp()
+
+    def _slots(self):
+        from datetime import time
+        from .models import Timetable
+        from .services.slot_index import invalidate_slot_index
+
+        later = Timetable.objects.create(course=self.course, instructor=self.instructor, day='monday',
+                                         start_time=time(14, 0), end_time=time(15, 0))
+        Timetable.objects.create(course=self.course, instructor=self.instructor, day='tuesday',
+                                 start_time=time(9, 0), end_time=time(10, 0))
+        invalidate_slot_index()
+        return later
+
+    def _report(self, hour):
+        from datetime import datetime, timezone as tz
+        from .services.attendance_compliance import compliance_report
+        return compliance_report(now=datetime(2025, 9, 1, hour, 0, tzinfo=tz.utc))
+
+    def test_lists_unsubmitted_slots(self):
+        later = self._slots()
+        self._write([{'student_id': 'cs001', 'status': 'Present'}])
+
+        report = self._report(12)
+        self.assertEqual(report['totals'], {'scheduled': 2, 'submitted': 0, 'not_submitted': 1, 'not_marked': 1,
+                                            'overdue': 1})
+        slots = {slot['timetable_id']: slot for slot in report['departments'][0]['instructors'][0]['slots']}
+        self.assertEqual(slots[self.timetable.pk]['status'], 'not_submitted')
+        self.assertTrue(slots[self.timetable.pk]['overdue'])
+        self.assertEqual((slots[later.pk]['status'], slots[later.pk]['overdue']), ('not_marked', False))
+
+    def test_report_is_cached_briefly(self):
+        from django.core.cache import cache
+
+        later = self._slots()
+        self._write([{'student_id': 'cs001', 'status': 'Present'}], submit=True)
+        report = self._report(16)
+        self.assertEqual((report['totals']['submitted'], report['totals']['overdue']), (1, 1))
+
+        self._write([{'student_id': 'cs001', 'status': 'Present'}], timetable=later, submit=True)
+        self.assertEqual(self._report(16)['totals']['submitted'], 1)
+        cache.clear()
+        report = self._report(16)
+        self.assertEqual((report['totals']['submitted'], report['departments']), (2, []))
+
+    def test_endpoint(self):
+        from rest_framework.test import APIClient
+
+        self._slots()
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        response = client.get('/api/academics/admin/attendance/compliance/', {'date': '2025-09-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['scheduled'], 1)
+        self.assertTrue(response.data['departments'][0]['instructors'][0]['slots'][0]['overdue'])
+        self.assertEqual(client.get('/api/academics/admin/attendance/compliance/', {'date': 'x'}).status_code, 400)
+
+
+class ClassSessionTestCase(AttendanceFixtures):
+    def _generate(self, **kwargs):
+        from datetime import date
+        from .services.class_sessions import generate_class_sessions
+        return generate_class_sessions(date(2025, 9, 1), date(2025, 9, 14), **kwargs)
+
+    def _at(self, day, hour, minute=0):
+        from datetime import datetime, timezone as tz
+        return datetime(2025, 9, day, hour, minute, tzinfo=tz.utc)
+
+    def test_expands_weekly_slots(self):
+        from .models import ClassSession
+
+        self.assertEqual(self._generate(), (2, 0))
+        sessions = list(ClassSession.objects.values_list('date', 'weekday', 'starts_at', 'ends_at'))
+        self.assertEqual([(str(d), w) for d, w, _, _ in sessions], [('2025-09-01', 0), ('2025-09-08', 0)])
+        self.assertEqual((sessions[0][2], sessions[0][3]), (self._at(1, 9), self._at(1, 10)))
+        # Regenerating is idempotent
+        self.assertEqual(self._generate(), (2, 0))
+        self.assertEqual(ClassSession.objects.count(), 2)
+
+    def test_moved_slot_is_regenerated(self):
+        from unittest import mock
+        from .models import ClassSession
+
+        self._generate()
+        with mock.patch('django.utils.timezone.now', return_value=self._at(2, 12)):
+            self.timetable.day = 'wednesday'
+            self.timetable.save()
+        # Upcoming sessions are regenerated up to the end of the generated span
+        self.assertEqual(
+            [str(d) for d in ClassSession.objects.values_list('date', flat=True)],
+            ['2025-09-01', '2025-09-03', '2025-09-10'],
+        )
+
+    def test_marking_window_uses_sessions(self):
+        from datetime import time
+        from .services.class_sessions import marking_open, open_sessions, scheduled_on
+
+        self.assertTrue(marking_open(self.timetable, self._at(1, 9, 30)))
+        self._generate()
+        self.assertTrue(marking_open(self.timetable, self._at(1, 9, 30)))
+        self.assertFalse(marking_open(self.timetable, self._at(1, 10, 20)))
+        self.assertTrue(marking_open(self.timetable, self._at(1, 10, 20), before=15, after=30))
+        self.assertEqual(open_sessions(self._at(8, 9, 30), instructor_id=self.instructor.pk).count(), 1)
+
+        # A one-off move of a generated session wins over the weekly slot
+        session = self.timetable.class_sessions.get(date=self._at(8, 0).date())
+        session.starts_at, session.ends_at = self._at(8, 13), self._at(8, 14)
+        session.save()
+        self.assertFalse(marking_open(self.timetable, self._at(8, 9, 30)))
+        self.assertTrue(marking_open(self.timetable, self._at(8, 13, 30)))
+        self.assertFalse(scheduled_on(self.timetable, self._at(9, 0).date()))
+        self.assertEqual(self.timetable.start_time, time(9, 0))
+
+    def test_compliance_reads_sessions(self):
+        from django.core.cache import cache
+        from .services.attendance_compliance import compliance_report
+        from .services.class_sessions import generate_class_sessions
+
+        cache.clear()
+        generate_class_sessions(self._at(1, 0).date(), self._at(15, 0).date())
+        self.timetable.class_sessions.filter(date=self._at(8, 0).date()).delete()
+        self.assertEqual(compliance_report(now=self._at(1, 12))['totals']['scheduled'], 1)
+        self.assertEqual(compliance_report(now=self._at(8, 12))['totals']['scheduled'], 0)
+
+    def test_semesters_without_sessions_keep_the_weekly_timetable(self):
+        from datetime import time
+        from django.core.cache import cache
+        from .models import ClassSessionSpan, Course, Timetable
+        from .services.attendance_compliance import compliance_report
+        from .services.class_sessions import marking_open, scheduled_on
+
+        cache.clear()
+        other = Timetable.objects.create(
+            course=Course.objects.create(name='Data Structures', code='CS201', semester=self.other_semester),
+            instructor=self.instructor, day='monday', start_time=time(11, 0), end_time=time(12, 0),
+        )
+        self._generate(semester_ids=[self.semester.pk])
+        self.assertEqual(list(ClassSessionSpan.objects.values_list('semester_id', flat=True)), [self.semester.pk])
+        self.timetable.class_sessions.filter(date=self._at(8, 0).date()).delete()
+
+        # Only the generated semester follows its sessions; the other one still meets weekly
+        self.assertFalse(scheduled_on(self.timetable, self._at(8, 0).date()))
+        self.assertTrue(scheduled_on(other, self._at(8, 0).date()))
+        self.assertTrue(marking_open(other, self._at(8, 11, 30)))
+        self.assertEqual(compliance_report(now=self._at(8, 13))['totals']['scheduled'], 1)
+
+    def test_open_slots_follow_moved_sessions(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+        from .services.class_sessions import open_entries
+        from .services.self_checkin import open_slot
+        from .slot_attendance_views import GetInstructorSlotsView
+
+        cache.clear()
+        self._generate()
+        session = self.timetable.class_sessions.get(date=self._at(8, 0).date())
+        session.starts_at, session.ends_at = self._at(8, 13), self._at(8, 14)
+        session.save()
+        tid = self.timetable.pk
+
+        self.assertEqual(open_entries(self._at(8, 9, 30)), [])
+        self.assertEqual([e.start_time.hour for e in open_entries(self._at(8, 13, 30))], [13])
+        self.assertIsNone(open_slot(tid, self.instructor.pk, now=self._at(8, 9, 30)))
+        self.assertEqual(open_slot(tid, self.instructor.pk, now=self._at(8, 12, 50)).timetable_id, tid)
+
+        client = APIClient()
+        client.force_authenticate(self.instructor.user)
+        for hour, expected in [(9, []), (13, [tid])]:
+            with mock.patch('django.utils.timezone.now', return_value=self._at(8, hour, 30)):
+                response = client.get('/api/academics/attendance/timetable/active/',
+                                      {'instructor_id': self.instructor.pk})
+            self.assertEqual([slot['timetable_id'] for slot in response.data['active_slots']], expected)
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.instructor.user)
+        with mock.patch('django.utils.timezone.now', return_value=self._at(8, 13, 30)):
+            slots = GetInstructorSlotsView.as_view()(request).data['slots']
+        self.assertEqual([(slot['time_slot'], slot['is_active']) for slot in slots], [('13:00:00 - 14:00:00', True)])
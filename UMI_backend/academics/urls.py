@@ -3,6 +3,9 @@ from .views import (
     
     StudentResultListCreateEnhanced,
     DepartmentCourseResultsView,
+    ResultImportView,
+    SemesterCloseView,
+    CourseGradebookView,
     DepartmentCoursesView,
     StudentPromotionActionView,
 )
@@ -17,7 +20,9 @@ from .attendance_views import (
     SubmitAttendanceView,
     RequestAttendanceEditView,
     AdminAttendancePermissionsView,
-    TimetableStudentsView
+    TimetableStudentsView,
+    AttendanceIngestStatusView,
+    AttendanceSyncView
 )
 from .instructor_edit_views import (
     InstructorSubmittedAttendanceView,
@@ -26,9 +31,12 @@ from .instructor_edit_views import (
 from .simple_edit_request_view import SimpleEditRequestView
 from .admin_attendance_views import (
     AdminAttendanceView,
-    AdminAttendanceStatsView
+    AdminAttendanceStatsView,
+    AdminAttendanceComplianceView,
+    AdminAttendanceRegisterExportView
 )
-from .simple_admin_view import SimpleAdminPermissionsView
+from .checkin_views import CheckInTokenView, StudentCheckInView
+from .simple_admin_view import SimpleAdminPermissionsView, AdminAttendancePermissionsBulkView
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -42,6 +50,9 @@ urlpatterns = [
     # Enhanced result management endpoints
     path("students/<str:student_id>/results/professional/", StudentResultListCreateEnhanced.as_view()),
     path("departments/<int:department_id>/courses/<int:course_id>/results/professional/", DepartmentCourseResultsView.as_view()),
+    path("results/import/", ResultImportView.as_view()),
+    path("results/semester-close/", SemesterCloseView.as_view()),
+    path("courses/<int:course_id>/gradebook/", CourseGradebookView.as_view()),
 
     # Promotion endpoint
     path("students/<str:student_id>/promotion/professional/", StudentPromotionActionView.as_view()),
@@ -66,10 +77,17 @@ urlpatterns = [
     path("attendance/timetable/mark/", MarkTimetableAttendanceView.as_view(), name="mark-attendance"),
     path("attendance/timetable/submit/", SubmitAttendanceView.as_view(), name="submit-attendance"),
     path("attendance/timetable/<int:timetable_id>/students/", TimetableStudentsView.as_view(), name="timetable-students"),
+    path("attendance/sync/", AttendanceSyncView.as_view(), name="attendance-sync"),
+    path("attendance/ingest/<int:batch_id>/", AttendanceIngestStatusView.as_view(), name="attendance-ingest-status"),
+    path("attendance/checkin/token/", CheckInTokenView.as_view(), name="attendance-checkin-token"),
+    path("attendance/checkin/", StudentCheckInView.as_view(), name="attendance-checkin"),
     path("attendance/edit-request/", SimpleEditRequestView.as_view(), name="simple-edit-request"),
     path("attendance/submitted/", InstructorSubmittedAttendanceView.as_view(), name="instructor-submitted"),
     path("attendance/edit-requests/", InstructorEditRequestsView.as_view(), name="instructor-requests"),
     path("admin/attendance/permissions/", SimpleAdminPermissionsView.as_view(), name="admin-permissions"),
+    path("admin/attendance/permissions/bulk/", AdminAttendancePermissionsBulkView.as_view(), name="admin-permissions-bulk"),
     path("admin/attendance/", AdminAttendanceView.as_view(), name="admin-attendance"),
     path("admin/attendance/stats/", AdminAttendanceStatsView.as_view(), name="admin-attendance-stats"),
+    path("admin/attendance/compliance/", AdminAttendanceComplianceView.as_view(), name="admin-attendance-compliance"),
+    path("admin/attendance/register/export/", AdminAttendanceRegisterExportView.as_view(), name="admin-attendance-register-export"),
 ]
\ No newline at end of file
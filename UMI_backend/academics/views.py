@@ -1,5 +1,9 @@
+import hashlib
+
+from django.utils.http import parse_etags
 from rest_framework import generics, status
 from rest_framework.views import APIView
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 from django.db.models import Avg, Count, Q
 from .models import Department, Semester, Course, Attendance, Result, Scholarship
@@ -12,6 +16,11 @@ from .serializers import (
     ScholarshipSerializer,
 )
 from .permissions import IsAdminOrInstructorForResultsAttendance, IsAdminRoleOrReadOnly, AllowAnyReadOnly
+from .services.grading import active_scheme
+from .services.gradebook import GradebookError, gradebook, save_gradebook, teaches
+from .services.marks_import import MarksImportError, import_marks
+from .services.semester_results import close_departments, department_chunks
+from .services.transcripts import cgpa_summary, student_transcript
 from students.models import Student
 from students.serializers import StudentSerializer
 
@@ -36,85 +45,36 @@ class StudentResultListCreateEnhanced(generics.ListCreateAPIView):
         serializer.save(student_id=self.kwargs["student_id"])
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        """
+        The results page: the student's results with the CGPA and promotion
+        status read from their stored transcript (rebuilt when stale). The
+        ETag comes from the transcript generation and the student's derived
+        fields, so a matching If-None-Match costs a single query.
+        """
         student_id = self.kwargs["student_id"]
-        student = Student.objects.get(student_id=student_id)
-        all_results = Result.objects.filter(student_id=student_id)
-        cgpa_data = self.calculate_cgpa(all_results)
-        promotion_data = self.check_promotion_logic(student, all_results)
-        assigned_courses = student.courses.all()
+        student = Student.objects.select_related("transcript", "department", "semester").get(student_id=student_id)
+        transcript = student_transcript(student)
+        scheme = active_scheme()
+        fingerprint = "|".join(str(part) for part in [
+            student.pk, transcript.built_generation, transcript.updated_at.isoformat(),
+            student.attendance_percentage, student.gpa, student.cgpa, scheme.scheme_id, scheme.version,
+            request.META.get("QUERY_STRING", ""),
+        ])
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-        response_data = {
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        response = Response({
             "student": StudentSerializer(student).data,
             "results": serializer.data,
-            "assigned_courses": CourseSerializer(assigned_courses, many=True).data,
-            "cgpa": cgpa_data,
-            "promotion_status": promotion_data,
-        }
-        return Response(response_data)
-
-    def calculate_cgpa(self, results):
-        if not results:
-            return {"cgpa": 0.0, "total_credits": 0, "grade_points": 0}
-        total_grade_points = 0
-        total_credits = 0
-        for result in results:
-            credits = getattr(result, "course_credits", 3)
-            grade_points = self.grade_to_points(result.grade)
-            total_grade_points += grade_points * credits
-            total_credits += credits
-        cgpa = total_grade_points / total_credits if total_credits > 0 else 0
-        return {"cgpa": round(cgpa, 2), "total_credits": total_credits, "grade_points": total_grade_points}
-
-    def grade_to_points(self, grade):
-        grade_map = {
-            "A+": 4.0, "A": 4.0, "A-": 3.7,
-            "B+": 3.3, "B": 3.0, "B-": 2.7,
-            "C+": 2.3, "C": 2.0, "C-": 1.7,
-            "D+": 1.3, "D": 1.0,
-            "F": 0.0,
-        }
-        return grade_map.get(grade.upper(), 0.0)
-
-    def check_promotion_logic(self, student, results):
-        """Promotion/Dropping logic (without fee system)"""
-        final_results = results.filter(exam_type__icontains="final")
-        if not final_results:
-            return {"status": "pending", "message": "No final results available"}
-
-        failed_count = 0
-        for result in final_results.order_by("-exam_date"):
-            if result.grade.upper() == "F":
-                failed_count += 1
-                if failed_count >= 3:
-                    return {
-                        "status": "dropped",
-                        "message": "Student dropped due to 3 consecutive failures",
-                        "action": "drop_student",
-                    }
-            else:
-                failed_count = 0
-
-        # Promotion logic
-        current_semester = student.semester
-        if current_semester:
-            try:
-                current_num = int(current_semester.name.split()[-1])
-                next_semester = Semester.objects.filter(
-                    department=student.department,
-                    name=f"Semester {current_num + 1}",
-                ).first()
-                if next_semester:
-                    return {
-                        "status": "promote",
-                        "message": f"Promote to {next_semester.name}",
-                        "next_semester_id": next_semester.semester_id,
-                        "action": "promote_student",
-                    }
-            except (ValueError, TypeError):
-                pass
-        return {"status": "current", "message": "Student remains in current semester"}
+            "assigned_courses": CourseSerializer(student.courses.all(), many=True).data,
+            "cgpa": cgpa_summary(transcript),
+            "semesters": transcript.semesters,
+            "promotion_status": transcript.promotion,
+        })
+        response["ETag"] = etag
+        return response
 
 
 # 🏛 Department → Courses List
@@ -176,6 +136,104 @@ class DepartmentCourseResultsView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+# 📥 Bulk Marks Import View
+class ResultImportView(APIView):
+    permission_classes = [IsAdminOrInstructorForResultsAttendance]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def post(self, request):
+        """
+        Import marks from a CSV uploaded as ``file`` (or posted as ``csv``
+        text). Instructors may only import for courses they teach. Nothing is
+        written when any row is invalid; ``dry_run`` only validates.
+        """
+        upload = request.FILES.get("file")
+        source = upload.read() if upload else request.data.get("csv")
+        if not source:
+            return Response({"error": "Upload a CSV file as 'file'"}, status=status.HTTP_400_BAD_REQUEST)
+        instructor = None
+        if not (request.user.is_staff or request.user.is_superuser):
+            instructor = request.user.instructor_profile
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        try:
+            summary = import_marks(source, instructor=instructor, dry_run=dry_run)
+        except (MarksImportError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        summary["dry_run"] = dry_run
+        if summary["errors"]:
+            return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+# 🎓 Semester Close View
+class SemesterCloseView(APIView):
+    permission_classes = [IsAdminRoleOrReadOnly]
+
+    def post(self, request):
+        """
+        Close every semester of ``department_id``, or just ``semester_id``, in
+        bulk: GPA, CGPA and academic history for each student with all finals
+        in, promotion for those who passed. ``dry_run`` only counts.
+        """
+        department_id = request.data.get("department_id")
+        semester_id = request.data.get("semester_id")
+        if not department_id and not semester_id:
+            return Response({"error": "department_id or semester_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            chunks = department_chunks(
+                [int(department_id)] if department_id else None, [int(semester_id)] if semester_id else None
+            )
+        except (TypeError, ValueError):
+            return Response({"error": "department_id and semester_id must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not chunks:
+            return Response({"error": "No matching semesters"}, status=status.HTTP_404_NOT_FOUND)
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        summaries = close_departments(chunks, dry_run=dry_run)
+        return Response({
+            "dry_run": dry_run,
+            "completed": sum(summary["completed"] for summary in summaries),
+            "promoted": sum(summary["promoted"] for summary in summaries),
+            "departments": summaries,
+        })
+
+
+# 📒 Course Gradebook View
+class CourseGradebookView(APIView):
+    permission_classes = [IsAdminOrInstructorForResultsAttendance]
+
+    def _instructor(self, request):
+        """None for admins, who may open any course's gradebook."""
+        if request.user.is_staff or request.user.is_superuser:
+            return None
+        return request.user.instructor_profile
+
+    def get(self, request, course_id):
+        """The whole course's component marks as a students x components matrix."""
+        try:
+            course = Course.objects.get(course_id=course_id)
+            instructor = self._instructor(request)
+            if instructor is not None and not teaches(instructor, course):
+                return Response({"error": f"You do not teach {course.code}"}, status=status.HTTP_403_FORBIDDEN)
+            return Response(gradebook(course))
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def patch(self, request, course_id):
+        """Apply ``cells``, a sparse list of edited {student_id, component, value}, in one transaction."""
+        try:
+            course = Course.objects.get(course_id=course_id)
+            instructor = self._instructor(request)
+            if instructor is not None and not teaches(instructor, course):
+                return Response({"error": f"You do not teach {course.code}"}, status=status.HTTP_403_FORBIDDEN)
+            created, updated = save_gradebook(course, request.data.get("cells") or [], instructor=instructor)
+            return Response({"created": created, "updated": updated, **gradebook(course)})
+        except Course.DoesNotExist:
+            return Response({"error": "Course not found"}, status=status.HTTP_404_NOT_FOUND)
+        except GradebookError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 # 🚀 Student Promotion View
 class StudentPromotionActionView(APIView):
     permission_classes = [IsAdminRoleOrReadOnly]
@@ -3,10 +3,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
-from .attendance_serializers import StudentSerializer, BulkAttendanceSerializer
+from .attendance_serializers import BulkAttendanceSerializer
 from .permissions import IsInstructorForDepartment
 from students.models import Student
 from academics.models import Attendance, Department, Semester
+from academics.services.attendance import write_attendance
+from academics.services.rosters import semester_roster
 from .models import Instructor
 
 
@@ -59,9 +61,21 @@ class DepartmentStudentsView(APIView):
         try:
             department = Department.objects.get(department_id=department_id)
             semester = Semester.objects.get(semester_id=semester_id, department=department)
-            students = Student.objects.filter(department=department, semester=semester)
-            serializer = StudentSerializer(students, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Same shape as StudentSerializer, built from the cached semester roster
+            students = [
+                {
+                    'student_id': student.student_id,
+                    'name': student.name,
+                    'email': student.email,
+                    'department': department.department_id,
+                    'semester': semester.semester_id,
+                    'department_name': department.name,
+                    'semester_name': semester.name,
+                }
+                for student in semester_roster(semester.semester_id)
+                if student.department_id == department.department_id
+            ]
+            return Response(students, status=status.HTTP_200_OK)
         except (Department.DoesNotExist, Semester.DoesNotExist):
             return Response({"error": "Department or Semester not found"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -106,33 +120,17 @@ class BulkAttendanceView(APIView):
                         "error": "Attendance already submitted for today. Contact admin to make changes."
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-            created_attendances = []
-            for attendance_data in attendances_data:
-                student_id = attendance_data['student_id']
-                status_value = attendance_data['status']
-
-                try:
-                    student = Student.objects.get(pk=student_id)
-                    attendance, created = Attendance.objects.update_or_create(
-                        student=student,
-                        date=attendance_date,
-                        defaults={
-                            'status': status_value,
-                            'instructor': instructor,
-                            'marked_by': instructor,
-                            'can_edit': True,
-                            'is_submitted': False
-                        }
-                    )
-                    created_attendances.append({
-                        'student_id': student.student_id,
-                        'student_name': student.name,
-                        'status': attendance.status,
-                        'created': created
-                    })
-                except Student.DoesNotExist:
-                    return Response({"error": f"Student with id {student_id} not found"},
-                                   status=status.HTTP_404_NOT_FOUND)
+            try:
+                result = write_attendance(
+                    attendances_data,
+                    date=attendance_date,
+                    instructor=instructor,
+                    overwrite_locked=True,
+                    strict=True,
+                )
+            except Student.DoesNotExist as e:
+                return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+            created_attendances = result.rows
 
             return Response({
                 "message": f"Attendance marked for {len(created_attendances)} students",
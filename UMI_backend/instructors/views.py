@@ -4,7 +4,11 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from django.utils import timezone
+from django.utils.http import parse_etags
+import hashlib
 import logging
 
 from .models import Instructor
@@ -343,12 +347,24 @@ class InstructorDashboardDataView(APIView):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class RegisterMatrixRenderer(JSONRenderer):
+    """Selected by ``?format=matrix``; the compact register payload is still plain JSON."""
+    format = 'matrix'
+
+
 class AttendanceReportsView(APIView):
     """
     GET /api/instructors/attendance/reports/
-    Get attendance reports for students by department, semester, year, and month
+    Get attendance reports for students by department, semester, year, and month.
+
+    ``format=matrix`` sends the roster and date axis once and one status
+    string per student (one code per date). Both formats carry an ETag
+    and answer a matching If-None-Match with 304.
     """
     # permission_classes = [IsAuthenticated]  # Temporarily disabled for testing
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, RegisterMatrixRenderer]
+    MATRIX_CODES = {'Present': 'P', 'Absent': 'A', 'Late': 'L'}
+    NOT_MARKED = '-'
 
     def get(self, request):
         try:
@@ -361,35 +377,63 @@ class AttendanceReportsView(APIView):
                 return Response({'error': 'department_id, semester_id, year, and month are required'}, status=status.HTTP_400_BAD_REQUEST)
 
             # Import here to avoid circular imports
-            from instructors.models import AttendanceRecord
-            from datetime import datetime
+            from academics.services.attendance_register import month_marks, month_range, register_fingerprint
+            from academics.services.rosters import semester_roster
 
-            # Create date range for the month
-            start_date = datetime(int(year), int(month), 1)
-            if int(month) == 12:
-                end_date = datetime(int(year) + 1, 1, 1)
+            try:
+                start_date, end_date = month_range(year, month)
+                roster = [
+                    entry for entry in semester_roster(int(semester_id))
+                    if str(entry.department_id) == str(department_id)
+                ]
+            except ValueError:
+                return Response({'error': 'Invalid semester_id, year or month'}, status=status.HTTP_400_BAD_REQUEST)
+            matrix = request.accepted_renderer.format == 'matrix'
+
+            # Validators: the month's row count/latest write plus the roster, no rows serialized
+            fingerprint = '|'.join([
+                'matrix' if matrix else 'list', department_id, semester_id, start_date.isoformat(),
+                register_fingerprint(start_date, end_date, department_id, semester_id),
+                ','.join(f"{entry.student_id}:{entry.name}" for entry in roster),
+            ])
+            etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            marks = month_marks(start_date, end_date, department_id, semester_id)
+            if matrix:
+                dates = sorted({day for days in marks.values() for day in days})
+                data = {
+                    'format': 'matrix',
+                    'month': start_date.strftime('%Y-%m'),
+                    'dates': [day.isoformat() for day in dates],
+                    'codes': {**{code: label for label, code in self.MATRIX_CODES.items()}, self.NOT_MARKED: 'Not Marked'},
+                    'students': [[entry.student_id, entry.name] for entry in roster],
+                    'statuses': [
+                        ''.join(
+                            self.MATRIX_CODES.get(marks.get(entry.student_id, {}).get(day), self.NOT_MARKED)
+                            for day in dates
+                        )
+                        for entry in roster
+                    ],
+                }
             else:
-                end_date = datetime(int(year), int(month) + 1, 1)
-
-            # Get attendance records for the specified period
-            attendance_records = AttendanceRecord.objects.filter(
-                student__department_id=department_id,
-                student__semester_id=semester_id,
-                date__gte=start_date,
-                date__lt=end_date
-            ).select_related('student')
-
-            # Format the data
-            records_data = []
-            for record in attendance_records:
-                records_data.append({
-                    'student_id': record.student.student_id,
-                    'student_name': record.student.name,
-                    'date': record.date.isoformat(),
-                    'status': record.status
-                })
-
-            return Response(records_data)
+                names = {entry.student_id: entry.name for entry in roster}
+                data = [
+                    {
+                        'student_id': student_id,
+                        'student_name': names.get(student_id, student_id),
+                        'date': day.isoformat(),
+                        'status': status_value
+                    }
+                    for student_id, days in marks.items()
+                    for day, status_value in days.items()
+                ]
+                data.sort(key=lambda record: record['date'], reverse=True)
+
+            response = Response(data)
+            response['ETag'] = etag
+            return response
 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -6,8 +6,9 @@ from django.db.models import Avg, Count, Q, Max, Min
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Student
-from academics.models import Result, Course, Department, Semester, Attendance
+from academics.models import Result, Course, Department, Semester, Attendance, CourseAttendanceCounter
 from .services.analysis import generate_performance_notes
+from academics.services.session_attendance import student_records
 
 
 @api_view(['GET'])
@@ -57,52 +58,16 @@ def student_analytics_dashboard(request):
                 "exam_date": result.exam_date.strftime('%Y-%m-%d') if result.exam_date else None
             })
         
-        # Attendance Analytics - Real Data
+        # Attendance Analytics - read from the maintained per-course counters
         attendance_data = []
-        from academics.models import SlotAttendance
-        
-        # Get real attendance from SlotAttendance model
-        slot_attendance = SlotAttendance.objects.filter(student=student)
-        
-        if slot_attendance.exists():
-            # Group by course
-            course_attendance = {}
-            for record in slot_attendance:
-                course_name = record.course.name if record.course else "Unknown Course"
-                if course_name not in course_attendance:
-                    course_attendance[course_name] = {'total': 0, 'present': 0}
-                
-                course_attendance[course_name]['total'] += 1
-                if record.status == 'present':
-                    course_attendance[course_name]['present'] += 1
-            
-            for course_name, data in course_attendance.items():
-                percentage = (data['present'] / data['total'] * 100) if data['total'] > 0 else 0
-                attendance_data.append({
-                    "course": course_name,
-                    "total_classes": data['total'],
-                    "present_classes": data['present'],
-                    "attendance_percentage": round(percentage, 2)
-                })
-        else:
-            # Fallback to old Attendance model if SlotAttendance is empty
-            if student.semester:
-                courses = Course.objects.filter(semester=student.semester)
-                for course in courses:
-                    attendance_records = Attendance.objects.filter(
-                        student=student,
-                        course=course
-                    )
-                    total_classes = attendance_records.count()
-                    present_classes = attendance_records.filter(status='present').count()
-                    attendance_percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
-                    
-                    attendance_data.append({
-                        "course": course.name,
-                        "total_classes": total_classes,
-                        "present_classes": present_classes,
-                        "attendance_percentage": round(attendance_percentage, 2)
-                    })
+        course_counters = CourseAttendanceCounter.objects.filter(student=student).select_related('course')
+        for counter in course_counters:
+            attendance_data.append({
+                "course": counter.course.name,
+                "total_classes": counter.total,
+                "present_classes": counter.present,
+                "attendance_percentage": counter.attendance_rate
+            })
         
         # Performance Insights
         performance_notes = generate_performance_notes(student)
@@ -124,34 +89,20 @@ def student_analytics_dashboard(request):
                         "trend": "improving" if len(course_results) > 1 else "stable"
                     })
         
-        # Monthly Attendance Trend - Real Data
+        # Monthly Attendance Trend - Attendance rows and compacted sessions, read once
         monthly_attendance = []
-        from academics.models import SlotAttendance
-        
+        windows = []
         for i in range(6):  # Last 6 months
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start + timedelta(days=30)
-            
-            # Try SlotAttendance first
-            month_slot_attendance = SlotAttendance.objects.filter(
-                student=student,
-                date__range=[month_start, month_end]
-            )
-            
-            if month_slot_attendance.exists():
-                total = month_slot_attendance.count()
-                present = month_slot_attendance.filter(status='present').count()
-            else:
-                # Fallback to old Attendance model
-                month_attendance = Attendance.objects.filter(
-                    student=student,
-                    date__range=[month_start, month_end]
-                )
-                total = month_attendance.count()
-                present = month_attendance.filter(status='present').count()
-            
+            month_start = (timezone.now().replace(day=1) - timedelta(days=30*i)).date()
+            windows.append((month_start, month_start + timedelta(days=30)))
+        records = student_records(student.student_id, date_from=windows[-1][0], date_to=windows[0][1])
+
+        for month_start, month_end in windows:
+            month_records = [record for record in records if month_start <= record[0] <= month_end]
+            total = len(month_records)
+            present = sum(1 for record in month_records if record[2] == Attendance.PRESENT)
             percentage = (present / total * 100) if total > 0 else 0
-            
+
             monthly_attendance.append({
                 "month": month_start.strftime('%b %Y'),
                 "percentage": round(percentage, 2),